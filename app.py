@@ -0,0 +1,445 @@
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+from urllib.parse import parse_qs, unquote, urlsplit
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(RAIZ, "backend"))
+
+from analizadorGLC import AnalizadorEarley
+from automataComandos import AutomataComandos
+from motorLaberinto import GENERADORES, generar
+from protocoloWebSocket import (CIERRE, TEXTO, ErrorProtocolo, clave_aceptacion, codificar_trama,
+                                leer_mensaje)
+from registroPartidas import ORIGEN_LABERINTO, ORIGEN_WEB, abrir_registro
+from servidorEstaticos import CACHE_RECURSOS, ServidorEstaticos
+from sesionMontyHall import RegistroSesiones
+
+DIRECTORIO_FRONTEND = os.path.join(RAIZ, "frontend")
+PAGINA_INICIO = "/frontend/templates/index.html"
+RUTA_WEBSOCKET = "/ws"
+RUTA_LABERINTO = "/laberinto"
+RUTA_AUTOMATA = "/automata/comandos"
+RUTA_GLC = "/glc/analizar"
+# Largo máximo (en caracteres) de una frase enviada al analizador
+MAX_FRASE_GLC = 500
+# Lado máximo (en celdas) de un laberinto pedido por HTTP
+MAX_LADO_LABERINTO = 2000
+# Celdas máximas por algoritmo, para que generar, calcular pistas y codificar quede cerca de
+# medio segundo (medido con motorLaberinto.medir: ~0.5 s Kruskal a 1000x1000, ~0.3 s el
+# backtracker a 500x500). Un 2000x2000 tarda de 1.5 a 5 s, así que no se sirve por HTTP.
+MAX_CELDAS_LABERINTO = {"kruskal": 1000 * 1000, "backtracker": 500 * 500}
+# Interfaz que abre el WebSocket (/ws?origen=...), para el historial de partidas
+ORIGENES_WEBSOCKET = {"web": ORIGEN_WEB, "laberinto": ORIGEN_LABERINTO}
+
+# Cada cuánto se envían las estadísticas globales a todos los navegadores (segundos)
+INTERVALO_DIFUSION = 0.25
+# Si un cliente acumula más bytes sin enviar, se le saltan las difusiones hasta que se ponga al día
+LIMITE_BUFFER_CLIENTE = 256 * 1024
+# Tamaño máximo de la cabecera HTTP de una petición
+MAX_CABECERA = 16 * 1024
+
+RAZONES = {
+    101: "Switching Protocols",
+    200: "OK",
+    204: "No Content",
+    206: "Partial Content",
+    302: "Found",
+    304: "Not Modified",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    416: "Range Not Satisfiable",
+    500: "Internal Server Error",
+}
+
+
+class PeticionHTTP:
+    """Línea de petición y cabeceras (en minúsculas) de una petición HTTP"""
+
+    def __init__(self, metodo, ruta, version, cabeceras):
+        self.metodo = metodo
+        self.ruta = ruta
+        self.version = version
+        self.cabeceras = cabeceras
+
+    @property
+    def mantener_conexion(self):
+        conexion = self.cabeceras.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return conexion == "keep-alive"
+        return conexion != "close"
+
+
+async def leer_peticion(lector):
+    """Leer la cabecera de una petición; None si el cliente cerró la conexión"""
+    try:
+        cabecera = await lector.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise ValueError("Cabecera demasiado grande")
+    lineas = cabecera.decode("latin-1").split("\r\n")
+    try:
+        metodo, ruta, version = lineas[0].split(" ", 2)
+    except ValueError:
+        raise ValueError("Línea de petición inválida")
+    cabeceras = {}
+    for linea in lineas[1:]:
+        if ":" in linea:
+            nombre, valor = linea.split(":", 1)
+            cabeceras[nombre.strip().lower()] = valor.strip()
+    return PeticionHTTP(metodo, ruta, version, cabeceras)
+
+
+def escribir_respuesta(escritor, estado, cabeceras=None, cuerpo=b"", mantener_conexion=True):
+    """Escribir una respuesta HTTP/1.1 completa"""
+    lineas = [f"HTTP/1.1 {estado} {RAZONES.get(estado, '')}"]
+    cabeceras = dict(cabeceras or {})
+    cabeceras.setdefault("Content-Length", str(len(cuerpo)))
+    cabeceras.setdefault("Connection", "keep-alive" if mantener_conexion else "close")
+    # Un valor None quita la cabecera (por ejemplo Content-Length en el 101 del WebSocket)
+    lineas.extend(f"{nombre}: {valor}" for nombre, valor in cabeceras.items() if valor is not None)
+    escritor.write(("\r\n".join(lineas) + "\r\n\r\n").encode("latin-1") + cuerpo)
+
+
+def _puerta(valor):
+    """Índice de puerta de un mensaje: solo enteros de 0 a 2 (ni booleanos, ni Infinity)"""
+    if isinstance(valor, bool) or not isinstance(valor, int) or not 0 <= valor <= 2:
+        raise ValueError(f"Puerta inválida: {valor!r}")
+    return valor
+
+
+class ServidorMontyHall:
+    """Servidor asyncio de archivos estáticos y partidas de Monty Hall por WebSocket
+
+    Cada navegador conectado es una sesión del RegistroSesiones; el premio y la puerta que
+    abre el presentador se deciden en el servidor. Todas las conexiones las atiende un único
+    bucle de eventos, sin un hilo por cliente.
+    """
+
+    def __init__(self, semilla=None):
+        self.registro = RegistroSesiones(semilla)
+        # escritor -> id de sesión de cada WebSocket abierto
+        self.clientes = {}
+        # Totales de todas las partidas: [ganadas, partidas] por estrategia
+        self.totales = {"mantener": [0, 0], "cambiar": [0, 0]}
+        # Historial en disco de todas las partidas; si existe, las estadísticas globales son las
+        # de toda la historia y no solo las de este proceso
+        # Sin vaciado automático: el fsync lo hace difundir() en un hilo, fuera del bucle
+        self.historial = abrir_registro(vaciado_automatico=False)
+        self._hay_cambios = False
+        # Autómata de comandos de voz, compilado una vez y servido como tabla JSON
+        self.automata_comandos = json.dumps(AutomataComandos().exportar(), separators=(",", ":")).encode("utf-8")
+        # Analizador de órdenes compuestas; su caché de columnas aprovecha los resultados parciales
+        self.analizador_glc = AnalizadorEarley()
+        self.estaticos = ServidorEstaticos(DIRECTORIO_FRONTEND, "/frontend/",
+                                           prefijos_recursos=("/frontend/resources/",))
+
+    # --- HTTP ---
+
+    async def atender(self, lector, escritor):
+        """Atender una conexión: peticiones HTTP sucesivas o un WebSocket"""
+        try:
+            while True:
+                try:
+                    peticion = await leer_peticion(lector)
+                except ValueError:
+                    escribir_respuesta(escritor, 400, mantener_conexion=False)
+                    break
+                if peticion is None:
+                    break
+
+                if (urlsplit(peticion.ruta).path == RUTA_WEBSOCKET
+                        and peticion.cabeceras.get("upgrade", "").lower() == "websocket"):
+                    await self._websocket(lector, escritor, peticion)
+                    break
+
+                await self._http(escritor, peticion)
+                await escritor.drain()
+                if not peticion.mantener_conexion:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _http(self, escritor, peticion):
+        mantener = peticion.mantener_conexion
+        if peticion.metodo not in ("GET", "HEAD"):
+            escribir_respuesta(escritor, 405, {"Allow": "GET, HEAD"}, mantener_conexion=mantener)
+            return
+
+        if urlsplit(peticion.ruta).path == "/":
+            escribir_respuesta(escritor, 302, {"Location": PAGINA_INICIO}, mantener_conexion=mantener)
+            return
+
+        if urlsplit(peticion.ruta).path == RUTA_LABERINTO:
+            await self._laberinto(escritor, peticion)
+            return
+
+        if urlsplit(peticion.ruta).path == RUTA_AUTOMATA:
+            cuerpo = self.automata_comandos
+            escribir_respuesta(escritor, 200, {"Content-Type": "application/json", "Cache-Control": CACHE_RECURSOS,
+                                               "Content-Length": str(len(cuerpo))},
+                               b"" if peticion.metodo == "HEAD" else cuerpo, mantener)
+            return
+
+        if urlsplit(peticion.ruta).path == RUTA_GLC:
+            self._glc(escritor, peticion)
+            return
+
+        respuesta = self.estaticos.responder(peticion.metodo, unquote(urlsplit(peticion.ruta).path),
+                                             peticion.cabeceras)
+        if respuesta is None:
+            escribir_respuesta(escritor, 404, {"Content-Type": "text/plain; charset=utf-8"},
+                               "No encontrado".encode("utf-8"), mantener)
+            return
+
+        escribir_respuesta(escritor, respuesta.estado, respuesta.cabeceras, respuesta.cuerpo, mantener)
+        if respuesta.ruta_archivo is not None and respuesta.cantidad:
+            # El cuerpo va del archivo al socket con sendfile, sin pasar por Python
+            await escritor.drain()
+            with open(respuesta.ruta_archivo, "rb") as archivo:
+                await asyncio.get_running_loop().sendfile(escritor.transport, archivo,
+                                                          respuesta.desde, respuesta.cantidad)
+
+    async def _laberinto(self, escritor, peticion):
+        """Generar un laberinto y enviarlo en el formato binario de motorLaberinto
+
+        Parámetros: filas, columnas, algoritmo, semilla, ciclos y pistas=1 para incluir la
+        dirección hacia la meta de cada celda. El número de celdas está acotado por algoritmo
+        (MAX_CELDAS_LABERINTO) para que la respuesta no tarde más de un segundo.
+        """
+        mantener = peticion.mantener_conexion
+        parametros = {nombre: valores[-1] for nombre, valores in parse_qs(urlsplit(peticion.ruta).query).items()}
+        try:
+            filas = int(parametros.get("filas", 10))
+            columnas = int(parametros.get("columnas", 10))
+            algoritmo = parametros.get("algoritmo", "backtracker")
+            semilla = int(parametros["semilla"]) if "semilla" in parametros else None
+            ciclos = float(parametros.get("ciclos", 0))
+            pistas = parametros.get("pistas") == "1"
+            if not (1 <= filas <= MAX_LADO_LABERINTO and 1 <= columnas <= MAX_LADO_LABERINTO):
+                raise ValueError(f"El lado debe estar entre 1 y {MAX_LADO_LABERINTO}")
+            if algoritmo not in GENERADORES or not 0 <= ciclos <= 1:
+                raise ValueError("Parámetros de laberinto inválidos")
+            if semilla is not None and semilla < 0:
+                raise ValueError("La semilla no puede ser negativa")
+            if filas * columnas > MAX_CELDAS_LABERINTO.get(algoritmo, MAX_LADO_LABERINTO ** 2):
+                raise ValueError(f"Con {algoritmo} el laberinto puede tener hasta "
+                                 f"{MAX_CELDAS_LABERINTO[algoritmo]} celdas")
+        except ValueError as e:
+            escribir_respuesta(escritor, 400, {"Content-Type": "text/plain; charset=utf-8"},
+                               str(e).encode("utf-8"), mantener)
+            return
+
+        acepta_gzip = "gzip" in peticion.cabeceras.get("accept-encoding", "")
+
+        def construir():
+            laberinto = generar(filas, columnas, algoritmo, semilla, ciclos)
+            datos = laberinto.codificar(pistas)
+            return gzip.compress(datos, compresslevel=6, mtime=0) if acepta_gzip else datos
+
+        # Los laberintos grandes tardan: se generan fuera del bucle para no frenar los WebSocket
+        try:
+            cuerpo = await asyncio.get_running_loop().run_in_executor(None, construir)
+        except Exception as e:
+            # Un error del generador no debe dejar al cliente sin respuesta
+            estado = 400 if isinstance(e, ValueError) else 500
+            escribir_respuesta(escritor, estado, {"Content-Type": "text/plain; charset=utf-8"},
+                               str(e).encode("utf-8"), mantener)
+            return
+        cabeceras = {"Content-Type": "application/octet-stream", "Cache-Control": "no-store",
+                     "Content-Length": str(len(cuerpo))}
+        if acepta_gzip:
+            cabeceras["Content-Encoding"] = "gzip"
+        escribir_respuesta(escritor, 200, cabeceras, b"" if peticion.metodo == "HEAD" else cuerpo, mantener)
+
+    def _glc(self, escritor, peticion):
+        """Analizar una frase con la gramática de órdenes y devolver sus acciones en JSON
+
+        Parámetro: texto. El análisis tarda menos de un milisegundo, así que se hace en el bucle.
+        """
+        mantener = peticion.mantener_conexion
+        texto = parse_qs(urlsplit(peticion.ruta).query).get("texto", [""])[-1]
+        if len(texto) > MAX_FRASE_GLC:
+            escribir_respuesta(escritor, 400, {"Content-Type": "text/plain; charset=utf-8"},
+                               f"La frase supera {MAX_FRASE_GLC} caracteres".encode("utf-8"), mantener)
+            return
+        cuerpo = json.dumps(self.analizador_glc.analizar(texto).como_dict(), separators=(",", ":")).encode("utf-8")
+        escribir_respuesta(escritor, 200, {"Content-Type": "application/json", "Cache-Control": "no-store",
+                                           "Content-Length": str(len(cuerpo))},
+                           b"" if peticion.metodo == "HEAD" else cuerpo, mantener)
+
+    # --- WebSocket ---
+
+    async def _websocket(self, lector, escritor, peticion):
+        clave = peticion.cabeceras.get("sec-websocket-key")
+        origen = ORIGENES_WEBSOCKET.get(parse_qs(urlsplit(peticion.ruta).query).get("origen", ["web"])[-1])
+        if not clave or origen is None:
+            escribir_respuesta(escritor, 400, mantener_conexion=False)
+            return
+        escribir_respuesta(escritor, 101, {
+            "Upgrade": "websocket",
+            "Connection": "Upgrade",
+            "Sec-WebSocket-Accept": clave_aceptacion(clave),
+            "Content-Length": None,
+        })
+        await escritor.drain()
+
+        id_sesion = self.registro.crear()
+        self.clientes[escritor] = id_sesion
+        self._hay_cambios = True
+        try:
+            escritor.write(codificar_trama(json.dumps(self._estado(id_sesion))))
+            await escritor.drain()
+            while True:
+                opcode, datos = await leer_mensaje(lector, escritor)
+                if opcode == CIERRE:
+                    escritor.write(codificar_trama(datos[:2], CIERRE))
+                    break
+                if opcode != TEXTO:
+                    continue
+                respuesta = self._procesar(id_sesion, datos, origen)
+                escritor.write(codificar_trama(json.dumps(respuesta)))
+                await escritor.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ErrorProtocolo):
+            pass
+        finally:
+            del self.clientes[escritor]
+            self.registro.eliminar(id_sesion)
+            self._hay_cambios = True
+
+    def _estado(self, id_sesion, id_mensaje=None):
+        """Estado de una sesión tal como lo ve el navegador"""
+        sesion = self.registro.sesion(id_sesion)
+        revelada = sesion.terminado
+        return {
+            "tipo": "estado",
+            "id": id_mensaje,
+            "estado": sesion.estado,
+            "eleccion": sesion.eleccion if sesion.eleccion >= 0 else None,
+            "abierta": sesion.abierta if sesion.abierta >= 0 else None,
+            "final": sesion.final if revelada else None,
+            "gana": sesion.final == sesion.premio if revelada else None,
+            # El contenido de las puertas solo se envía al revelar, para no adelantar el premio
+            "contenido": [sesion.contenido(p) for p in range(3)] if revelada else None,
+            "ganadas": sesion.ganadas,
+            "perdidas": sesion.perdidas,
+        }
+
+    def _procesar(self, id_sesion, datos, origen=ORIGEN_WEB):
+        """Aplicar una acción del navegador: elegir, decidir o reiniciar
+
+        La partida se guarda en el historial con el origen de la conexión (la página del juego
+        o el laberinto); el resultado siempre sale de la sesión, nunca del navegador.
+        """
+        id_mensaje = None
+        try:
+            mensaje = json.loads(datos)
+            id_mensaje = mensaje.get("id")
+            accion = mensaje.get("accion")
+            if accion == "elegir":
+                self.registro.elegir(id_sesion, _puerta(mensaje["puerta"]))
+                # El navegador muestra la cabra del presentador y luego pregunta si cambiar
+                self.registro.anunciar_apertura(id_sesion)
+            elif accion == "decidir":
+                cambiar = bool(mensaje["cambiar"])
+                final, gana = self.registro.decidir(id_sesion, cambiar)
+                sesion = self.registro.sesion(id_sesion)
+                self._usar_historial(lambda historial: historial.agregar(
+                    sesion.eleccion, sesion.abierta, final, cambiar, gana, origen))
+                total = self.totales["cambiar" if cambiar else "mantener"]
+                total[0] += gana
+                total[1] += 1
+                self._hay_cambios = True
+            elif accion == "reiniciar":
+                self.registro.reiniciar(id_sesion)
+            else:
+                raise ValueError(f"Acción desconocida: {accion!r}")
+        except (ValueError, KeyError, TypeError, AttributeError, OverflowError) as e:
+            return {"tipo": "error", "id": id_mensaje, "mensaje": str(e)}
+        return self._estado(id_sesion, id_mensaje)
+
+    def _usar_historial(self, accion):
+        """Aplicar la acción al historial y devolver su resultado, o None si no hay historial
+
+        Si el historial falla (disco lleno, archivo borrado...) se abandona y el juego sigue
+        sin él, con los totales del proceso.
+        """
+        historial = self.historial
+        if historial is None:
+            return None
+        try:
+            return accion(historial)
+        except OSError as e:
+            print(f"Aviso: sin registro de partidas ({e})")
+            self.historial = None
+            historial.abandonar()
+            return None
+
+    # --- Difusión ---
+
+    def mensaje_global(self):
+        # Resumen incremental: no relee el archivo, solo cuenta lo agregado por otros procesos
+        resumen = self._usar_historial(lambda historial: historial.resumen().como_dict())
+        if resumen is not None:
+            mantener, cambiar = resumen["mantener"], resumen["cambiar"]
+        else:
+            mantener = {"ganadas": self.totales["mantener"][0], "partidas": self.totales["mantener"][1]}
+            cambiar = {"ganadas": self.totales["cambiar"][0], "partidas": self.totales["cambiar"][1]}
+        return {"tipo": "global", "jugadores": len(self.clientes), "mantener": mantener, "cambiar": cambiar}
+
+    async def difundir(self):
+        """Enviar las estadísticas globales a todos los navegadores cuando cambian
+
+        Los cambios se agrupan por intervalo, así el costo no crece con el número de jugadas,
+        y la trama se codifica una sola vez para todos los clientes.
+        """
+        while True:
+            await asyncio.sleep(INTERVALO_DIFUSION)
+            # Las partidas llegan al disco por lotes o al cumplir el intervalo; el write y el
+            # fsync van en un hilo para no frenar a los demás clientes
+            bucle = asyncio.get_running_loop()
+            await bucle.run_in_executor(None, self._usar_historial,
+                                        lambda historial: historial.vaciar(solo_vencido=True))
+            if not self._hay_cambios:
+                continue
+            self._hay_cambios = False
+            trama = codificar_trama(json.dumps(self.mensaje_global()))
+            for escritor in list(self.clientes):
+                transporte = escritor.transport
+                if transporte.is_closing() or transporte.get_write_buffer_size() > LIMITE_BUFFER_CLIENTE:
+                    continue
+                escritor.write(trama)
+
+
+async def iniciar_servidor(host="127.0.0.1", puerto=8000, semilla=None):
+    """Crear el servidor y su tarea de difusión; devuelve (servidor asyncio, ServidorMontyHall)"""
+    juego = ServidorMontyHall(semilla)
+    servidor = await asyncio.start_server(juego.atender, host, puerto, limit=MAX_CABECERA, backlog=4096)
+    juego.tarea_difusion = asyncio.create_task(juego.difundir())
+    return servidor, juego
+
+
+async def main(host, puerto):
+    servidor, _ = await iniciar_servidor(host, puerto)
+    print(f"Servidor Monty Hall en http://{host}:{puerto}{PAGINA_INICIO}")
+    async with servidor:
+        await servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor del juego Monty Hall")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    argumentos = parser.parse_args()
+    try:
+        asyncio.run(main(argumentos.host, argumentos.puerto))
+    except KeyboardInterrupt:
+        pass
@@ -1,32 +1,61 @@
+import os
+import time
+
+_inicio_importacion = time.perf_counter()
+
 import tkinter
 from tkinter import *
 from tkinter import messagebox, simpledialog
-from PIL import Image, ImageTk
-import random
-import pygame
-from introMontyHall import reproducir_video
+from cacheImagenes import cache_imagenes
+from fotogramasGif import FotogramasGif
+from manifiestoRecursos import ruta_variante
+from animaciones import PlanificadorAnimaciones
+from metricas import metricas
+from reglasMontyHall import PUERTAS, CARRO
+from registroPartidas import ORIGEN_TK, abrir_registro
+from sesionMontyHall import SesionMontyHall, ESPERANDO_ELECCION
+
+# OpenCV (intro) y pygame (sonidos) se importan solo cuando se necesitan
+TIEMPO_IMPORTACION = time.perf_counter() - _inicio_importacion
 
 
 class MontyHall_interfaz:
     def __init__(self, ventana_principal):
         self.ventana_principal = ventana_principal
-        # Rutas de imágenes
-        self.ruta_imagen_puerta_animada = "files/Puerta_abierta.png"
-        self.ruta_imagen_puerta_estatica = "files/Puerta_estatica.png"
-        self.ruta_imagen_cabra = "files/Cabra.gif"
-        self.ruta_imagen_carro = "files/carro.gif"
-        self.ruta_imagen_presentador = "files/Presentador1.jpeg"
-
-        # Estado del juego
-        self.puerta_seleccionada = None
-        self.animacion_actual = None
-        self.juego_terminado = False
-        self.ganadas = 0
-        self.perdidas = 0
-        # Inicializar el juego
-        self._inicializar_juego()
-
-        # Preparar fotogramas de animación
+        # Rutas de imágenes: las variantes ya redimensionadas por optimizarRecursos.py si
+        # existen, si no los originales
+        self.ruta_imagen_puerta_animada = ruta_variante("files", "puerta_abierta", (133, 266),
+                                                        respaldo="files/Puerta_abierta.png")
+        self.ruta_imagen_puerta_estatica = ruta_variante("files", "puerta_estatica", (133, 266),
+                                                         respaldo="files/Puerta_estatica.png")
+        self.ruta_imagen_cabra = ruta_variante("files", "cabra", (133, 266), respaldo="files/Cabra.gif")
+        self.ruta_imagen_carro = ruta_variante("files", "carro", (133, 266), respaldo="files/carro.gif")
+        self.ruta_imagen_presentador = ruta_variante("files", "presentador1", (100, 150),
+                                                     respaldo="files/Presentador1.jpeg")
+        self.ruta_imagen_presentador_perdida = ruta_variante("files", "presentador2", (100, 150),
+                                                             respaldo="files/Presentador2.jpeg")
+        self.ruta_imagen_fondo = ruta_variante("files", "fondo", (800, 600), respaldo="files/Fondo.jpg")
+        # Fotogramas de GIF ya redimensionados, para no repetir LANCZOS en cada inicio
+        self.directorio_cache_fotogramas = "files/.cache"
+
+        # Efectos de sonido: se decodifican una vez, después de mostrar la ventana, y se
+        # reproducen sin leer el disco al hacer clic
+        self.rutas_sonidos = {
+            "puerta": r"files/OpenDoor.MP3",
+            "ganar": r"files/Win.MP3",
+            "perder": r"files/Fail.MP3",
+        }
+        self.sonidos = None
+        self.tiempos_inicio = {}
+
+        # Estado del juego: la ventana es solo un cliente de la sesión
+        self.puertas = list(PUERTAS)
+        self.sesion = SesionMontyHall.nueva()
+        self.animaciones = None
+        # Historial de todas las partidas (Tk, web y laberinto), que sobrevive a la ventana
+        self.historial = abrir_registro()
+
+        # Preparar fotogramas de animación (se decodifican al mostrarse por primera vez)
         self.fotogramas_cabra = self._cargar_fotogramas(self.ruta_imagen_cabra)
         self.fotogramas_carro = self._cargar_fotogramas(self.ruta_imagen_carro)
 
@@ -34,121 +63,96 @@ class MontyHall_interfaz:
         # Rutas de los archivos de video y audio
         ruta_video = r"files/TrailerMontyGameVideo.mp4"
         ruta_audio = r"files/TrailerMontyGameAudio.MP3"
-        # Función para reproducir video y audio (debes implementarla)
-        reproducir_video(ruta_video, ruta_audio)
+        # Fotogramas horneados al tamaño de la ventana: las repeticiones casi no usan CPU
+        ruta_cache = r"files/.cache/TrailerMontyGameVideo_800x600.fotogramas"
+        # OpenCV se carga solo cuando se pide la introducción
+        from introMontyHall import reproducir_video
+        reproducir_video(ruta_video, ruta_audio, ruta_cache=ruta_cache)
 
     def _inicializar_juego(self):
         """Inicializar los elementos del juego Monty Hall"""
-        # Definir puertas
-        self.puertas = ['A', 'B', 'C']
-
-        # Asignar premio aleatoriamente
-        self.premio = random.randint(0, 2)
-
-        # Inicializar premios
-        self.back = ['Cabra', 'Cabra', 'Cabra']
-        self.back[self.premio] = 'Carro'
-
-        # Crear diccionario de premios por puerta
-        self.picks = dict(zip(self.puertas, self.back))
-
-        # Resetear estado del juego
-        self.puerta_seleccionada = None
-        self.juego_terminado = False
+        # Colocar un premio nuevo y volver a esperar la elección (las estadísticas se conservan)
+        self.sesion.reiniciar()
 
+    @metricas.cronometrar("ventana.cargar_fotogramas")
     def _cargar_fotogramas(self, ruta):
-        """Cargar y redimensionar fotogramas de un GIF"""
+        """Preparar la secuencia perezosa de fotogramas redimensionados de un GIF"""
         ancho_deseado = 133
         altura_deseada = 266
-        fotogramas = []
-
-        try:
-            # Abrir el archivo GIF
-            gif_imagen = Image.open(ruta)
-
-            while True:
-                # Redimensionar el fotograma actual
-                fotograma_redimensionado = gif_imagen.copy().resize((ancho_deseado, altura_deseada),
-                                                                    Image.Resampling.LANCZOS)
-                # Convertir el fotograma a un objeto compatible con Tkinter
-                fotogramas.append(ImageTk.PhotoImage(fotograma_redimensionado))
-                # Avanzar al siguiente fotograma
-                gif_imagen.seek(len(fotogramas))
-
-        except EOFError:
-            # Fin de los fotogramas
-            pass
-        except Exception as e:
-            print(f"Error al cargar fotogramas de {ruta}: {e}")
+        # El fotograma 0 se decodifica al mostrarse y el resto en un hilo de fondo
+        return FotogramasGif(ruta, (ancho_deseado, altura_deseada),
+                             directorio_cache=self.directorio_cache_fotogramas)
 
-        return fotogramas
-
-    def _detener_animacion(self):
-        """Detener la animación actual"""
-        if self.animacion_actual is not None:
-            self.v1.after_cancel(self.animacion_actual)
-            self.animacion_actual = None
+    def _detener_animacion(self, label=None):
+        """Detener la animación de una puerta, o de todas si no se indica ninguna"""
+        if self.animaciones is not None:
+            self.animaciones.detener(label)
 
     def _calcular_porcentaje(self):
         """Calcular porcentaje de victorias"""
-        total_juegos = self.ganadas + self.perdidas
-        return (self.ganadas / total_juegos * 100) if total_juegos > 0 else 0
-
-    def _animar_puerta(self, label, fotogramas, indice=0):
-        """Animar una puerta con los fotogramas dados"""
-        if label.winfo_exists():
-            frame_actual = fotogramas[indice]
-            label.config(image=frame_actual)
-            indice = (indice + 1) % len(fotogramas)
+        return self.sesion.porcentaje
 
-            self._detener_animacion()
+    def _usar_historial(self, accion):
+        """Aplicar la acción al historial y devolver su resultado, o None si no hay historial
 
-            self.animacion_actual = self.v1.after(300, self._animar_puerta, label, fotogramas, indice)
-        else:
-            print("La etiqueta ha sido destruida.")
+        Si el historial falla (disco lleno, archivo borrado...) se abandona y la ventana sigue sin él.
+        """
+        historial = self.historial
+        if historial is None:
+            return None
+        try:
+            return accion(historial)
+        except Exception as e:
+            print(f"Aviso: sin registro de partidas ({e})")
+            self.historial = None
+            try:
+                historial.abandonar()
+            except OSError:
+                pass
+            return None
+
+    def _texto_estadisticas(self):
+        """Estadísticas de esta ventana y, si hay historial, las de todas las partidas"""
+        texto = (f"Ganadas: {self.sesion.ganadas} | Perdidas: {self.sesion.perdidas} | "
+                 f"% de victorias: {self._calcular_porcentaje():.2f}%")
+        resumen = self._usar_historial(lambda historial: historial.resumen())
+        if resumen is not None:
+            texto += (f"\nHistórico ({resumen.partidas()} partidas): cambiar "
+                      f"{resumen.porcentaje(cambio=True):.2f}% | mantener {resumen.porcentaje(cambio=False):.2f}%")
+        return texto
+
+    @metricas.cronometrar("ventana.animar_puerta")
+    def _animar_puerta(self, label, fotogramas):
+        """Animar una puerta con los fotogramas dados"""
+        # El planificador de la ventana anima todas las puertas con un solo after()
+        # y respeta la duración propia de cada fotograma del GIF
+        self.animaciones.animar(label, fotogramas)
 
     def _mostrar_premio(self, puerta_letra):
         """Mostrar el premio detrás de la puerta"""
         label = getattr(self, f'label_puerta{self.puertas.index(puerta_letra) + 1}')
 
         # Seleccionar fotogramas según el premio
-        if self.picks[puerta_letra] == 'Carro':
+        if self.sesion.contenido(self.puertas.index(puerta_letra)) == CARRO:
             fotogramas = self.fotogramas_carro
         else:
             fotogramas = self.fotogramas_cabra
 
-        # Detener cualquier animación que esté corriendo
-        self._detener_animacion()
-
-        # Reemplazar la imagen de la puerta por la del premio
-        premio_img = fotogramas[0]  # Seleccionar la primera imagen del premio
-        label.config(image=premio_img)
-
-        # Si hay una animación, puedes iniciar la animación del premio
-        if len(fotogramas) > 1:
-            self._animar_puerta(label, fotogramas)
+        # Reemplazar la imagen de la puerta por la del premio y animarla; las demás puertas
+        # abiertas siguen animándose
+        self._animar_puerta(label, fotogramas)
 
     def _cambiar_puerta(self, puerta_seleccionada, label):
         """Lógica para cambiar la puerta seleccionada"""
-        ruta_audio_ganar = r"files/Win.MP3"
-        ruta_audio_perder = r"files/Fail.MP3"
-        ruta_audio_door = r"files/OpenDoor.MP3"
-
         # Si el juego ya terminó, preguntar si quiere jugar de nuevo
-        if self.juego_terminado:
+        if self.sesion.terminado:
             respuesta = messagebox.askyesno("Juego Terminado", "¿Deseas jugar de nuevo?")
             if respuesta:
                 self._inicializar_juego()
                 self._restablecer_puertas()
 
                 # Cambiar la imagen del presentador de vuelta a Presentador1
-                presentador_imagen = Image.open("files/Presentador1.jpeg")
-                presentador_imagen = presentador_imagen.resize((100, 150))  # Ajustar el tamaño si es necesario
-                presentador_imagen_tk = ImageTk.PhotoImage(presentador_imagen)
-
-                # Actualizar la imagen en el canvas
-                self.canvas.create_image(10, 450, image=presentador_imagen_tk, anchor="nw")
-                self.canvas.presentador_imagen_tk = presentador_imagen_tk  # Evitar que la imagen sea recolectada por el GC
+                self._mostrar_presentador(self.ruta_imagen_presentador)
 
             else:
                 # Mensaje de despedida con estadísticas
@@ -156,10 +160,22 @@ class MontyHall_interfaz:
                 despedida = (
                     "Gracias por jugar, ¡BAY BAY!\n\n"
                     f"Estadísticas finales:\n"
-                    f"Ganadas: {self.ganadas}\n"
-                    f"Perdidas: {self.perdidas}\n"
+                    f"Ganadas: {self.sesion.ganadas}\n"
+                    f"Perdidas: {self.sesion.perdidas}\n"
                     f"Porcentaje final de victorias: {porcentaje_ganadas:.2f}%"
                 )
+                # Lo escrito hasta ahora queda en disco antes de cerrar la ventana
+                self._usar_historial(lambda historial: historial.vaciar())
+                resumen = self._usar_historial(lambda historial: historial.resumen())
+                if resumen is not None:
+                    despedida += (
+                        f"\n\nHistórico de todas las partidas: {resumen.partidas()}\n"
+                        f"Ganadas: {resumen.ganadas()} | Perdidas: {resumen.perdidas()}\n"
+                        f"Cambiando: {resumen.porcentaje(cambio=True):.2f}% de victorias "
+                        f"en {resumen.partidas(cambio=True)} partidas\n"
+                        f"Manteniendo: {resumen.porcentaje(cambio=False):.2f}% de victorias "
+                        f"en {resumen.partidas(cambio=False)} partidas"
+                    )
                 messagebox.showinfo("Estadísticas", despedida)
                 # Cerrar la ventana de Monty Hall
                 self.v1.destroy()
@@ -171,79 +187,54 @@ class MontyHall_interfaz:
         puerta_letra = self.puertas[puerta_seleccionada - 1]
 
         # Primera selección de puerta
-        if self.puerta_seleccionada is None:
+        if self.sesion.estado == ESPERANDO_ELECCION:
             # Mensaje inicial
             messagebox.showinfo("Monty Hall", f"Has seleccionado la puerta {puerta_letra}")
 
-            # Recordar puerta seleccionada
-            self.puerta_seleccionada = puerta_letra
-
-            # Encontrar una puerta para abrir (que no sea la seleccionada y no tenga el premio)
-            puertas_disponibles = [p for p in self.puertas if p != puerta_letra and self.picks[p] == 'Cabra']
-            abrir_puerta = random.choice(puertas_disponibles)
+            # Registrar la elección; el presentador abre una puerta que no es la seleccionada
+            # y no tiene el premio
+            abrir_puerta = self.puertas[self.sesion.elegir(puerta_seleccionada - 1)]
 
-            pygame.mixer.music.load(ruta_audio_door)  # Cargar audio de ganar
-            pygame.mixer.music.play()  # Reproducir audio
+            self._reproducir_sonido("puerta")  # Reproducir audio de abrir puerta
 
             label = getattr(self, f'label_puerta{self.puertas.index(abrir_puerta) + 1}')
 
             # Seleccionar fotogramas según el contenido (siempre será cabra para el presentador)
             fotogramas = self.fotogramas_cabra
 
-            # Detener cualquier animación que esté corriendo
-            self._detener_animacion()
-
-            # Reemplazar la imagen de la puerta por la del premio (caballo o cabra)
-            premio_img = fotogramas[0]  # Seleccionar la primera imagen del premio
-            label.config(image=premio_img)
-
-            # Iniciar la animación si tiene más de un fotograma
-            if len(fotogramas) > 1:
-                self._animar_puerta(label, fotogramas)
+            # Reemplazar la imagen de la puerta por la del premio (caballo o cabra) y animarla
+            self._animar_puerta(label, fotogramas)
 
             # Mensaje del presentador sobre la puerta abierta
             messagebox.showinfo("Monty Hall",
-                                f"El presentador abrió la puerta {abrir_puerta} y mostró una {self.picks[abrir_puerta]}.")
+                                f"El presentador abrió la puerta {abrir_puerta} y mostró una "
+                                f"{self.sesion.contenido(self.puertas.index(abrir_puerta))}.")
+            self.sesion.anunciar_apertura()
 
             # Preguntar si desea cambiar de puerta
             cambiar = messagebox.askyesno("Monty Hall", "¿Deseas cambiar de puerta?")
 
-            # Si cambia, seleccionar la otra puerta
-            if cambiar:
-                otras_puertas = [p for p in self.puertas if p != puerta_letra and p != abrir_puerta]
-                puerta_letra = otras_puertas[0]
-                puerta_seleccionada = self.puertas.index(puerta_letra) + 1
+            # Si cambia, la sesión toma la otra puerta y revela el resultado
+            final, gana = self.sesion.decidir(cambiar)
+            puerta_letra = self.puertas[final]
+            self._usar_historial(lambda historial: historial.agregar(
+                self.sesion.eleccion, self.sesion.abierta, final, cambiar, gana, ORIGEN_TK))
 
             # Mostrar premio
             self._mostrar_premio(puerta_letra)
 
             # Mostrar resultado final
-            r = self.picks[puerta_letra]
-            if r == 'Carro':
-                pygame.mixer.music.load(ruta_audio_ganar)  # Cargar audio de ganar
-                pygame.mixer.music.play()  # Reproducir audio
+            r = self.sesion.contenido(final)
+            if gana:
+                self._reproducir_sonido("ganar")  # Reproducir audio de ganar
                 messagebox.showinfo("¡Felicidades!", f"Tu premio es: {r}\n¡Ganaste el carro!")
-                self.ganadas += 1  # Incrementar victorias
             else:
                 # Cambiar la imagen del presentador a la imagen de perder
-                presentador_imagen = Image.open("files/Presentador2.jpeg")
-                presentador_imagen = presentador_imagen.resize((100, 150))  # Ajustar el tamaño si es necesario
-                presentador_imagen_tk = ImageTk.PhotoImage(presentador_imagen)
-
-                # Actualizar la imagen en el canvas
-                self.canvas.create_image(10, 450, image=presentador_imagen_tk, anchor="nw")
-                self.canvas.presentador_imagen_tk = presentador_imagen_tk  # Evitar que la imagen sea recolectada por el GC
+                self._mostrar_presentador(self.ruta_imagen_presentador_perdida)
 
-                pygame.mixer.music.load(ruta_audio_perder)  # Cargar audio de perder
-                pygame.mixer.music.play()  # Reproducir audio
+                self._reproducir_sonido("perder")  # Reproducir audio de perder
                 messagebox.showinfo("Lo siento", f"Tu premio es: {r}\nNo ganaste el carro.")
-                self.perdidas += 1  # Incrementar derrotas
-            porcentaje = self._calcular_porcentaje()
-            self.label_estadisticas.config(
-                text=f"Ganadas: {self.ganadas} | Perdidas: {self.perdidas} | % de victorias: {porcentaje:.2f}%")
-
-            # Marcar juego como terminado
-            self.juego_terminado = True
+            self.label_estadisticas.config(text=self._texto_estadisticas())
 
     def _restablecer_puertas(self):
         """Restablecer las puertas a su estado inicial"""
@@ -265,24 +256,35 @@ class MontyHall_interfaz:
         self.label_puerta2.config(cursor="hand2")
         self.label_puerta3.config(cursor="hand2")
 
+    def _reproducir_sonido(self, nombre):
+        """Reproducir un efecto si el banco de sonidos ya terminó de cargarse"""
+        if self.sonidos is not None:
+            self.sonidos.reproducir(nombre)
+
+    def _mostrar_presentador(self, ruta):
+        """Cambiar la imagen del presentador usando la caché de imágenes"""
+        presentador_imagen_tk = cache_imagenes.obtener(ruta, (100, 150))
+        self.canvas.itemconfig(self.presentador_img, image=presentador_imagen_tk)
+        # La caché mantiene viva la imagen mientras esté en pantalla
+        cache_imagenes.retener("presentador", presentador_imagen_tk)
+
     def mostrar_perdida(self):
         """Actualizar la imagen del presentador cuando el jugador pierde"""
         # Cambiar la imagen del presentador a la de perder
-        presentador_imagen_perdida = Image.open("files/Presentador2.jpeg")
-        presentador_imagen_perdida = presentador_imagen_perdida.resize((100, 150))  # Ajustar tamaño si es necesario
-        presentador_imagen_perdida_tk = ImageTk.PhotoImage(presentador_imagen_perdida)
-
-        # Actualizar la imagen en el canvas
-        pos_x_presentador = 10
-        pos_y_presentador = 450  # Puedes ajustar esta posición si es necesario
-        self.canvas.create_image(pos_x_presentador, pos_y_presentador, image=presentador_imagen_perdida_tk, anchor="nw")
-        self.canvas.presentador_imagen_perdida_tk = presentador_imagen_perdida_tk  # Evitar que sea recolectada por el GC
+        self._mostrar_presentador(self.ruta_imagen_presentador_perdida)
 
         # Mostrar un mensaje de que el jugador ha perdido
         messagebox.showinfo("Monty Hall", "¡Perdiste! El presentador ahora cambia de imagen.")
 
     def abrir_ventana(self):
-        """Abrir la ventana de Monty Hall"""
+        """Abrir la ventana de Monty Hall
+
+        Primero se construye y muestra el esqueleto de la ventana; las imágenes y los sonidos se
+        cargan después, de a un recurso por vez, para no bloquear el primer cuadro.
+        """
+        self._inicio_ventana = time.perf_counter()
+        self.tiempos_inicio = {"importacion": TIEMPO_IMPORTACION, "decodificacion": 0.0}
+
         # Ocultar la ventana principal
         self.ventana_principal.withdraw()
 
@@ -290,6 +292,8 @@ class MontyHall_interfaz:
         self.v1 = Toplevel(self.ventana_principal)
         self.v1.title("Monty Hall - Selecciona una puerta")
         self.v1.geometry("600x400")
+        # Un único reloj de animación para todas las puertas de esta ventana
+        self.animaciones = PlanificadorAnimaciones(self.v1)
         # Obtener el tamaño de la pantalla
         pantalla_ancho = self.v1.winfo_screenwidth()
         pantalla_alto = self.v1.winfo_screenheight()
@@ -307,75 +311,118 @@ class MontyHall_interfaz:
         # Crear el Canvas
         self.canvas = Canvas(self.v1, width=800, height=600)
         self.canvas.pack(fill="both", expand=True)
-        fondo_imagen = Image.open("files/Fondo.jpg")
-        fondo_imagen = fondo_imagen.resize((800, 600))  # Ajustar tamaño de la imagen si es necesario
-        fondo_imagen_tk = ImageTk.PhotoImage(fondo_imagen)
-
-        # Cargar imagen del presentador
-        presentador_imagen = Image.open("files/Presentador1.jpeg")
-        presentador_imagen = presentador_imagen.resize((100, 150))  # Ajustar el tamaño si es necesario
-        presentador_imagen_tk = ImageTk.PhotoImage(presentador_imagen)
-
-        # Colocar la imagen de fondo en el canvas
-        self.canvas.create_image(0, 0, image=fondo_imagen_tk, anchor="nw")
-        self.canvas.fondo_imagen_tk = fondo_imagen_tk
-
-        # Ajustar las coordenadas de la imagen del presentador
-        pos_x_presentador = 10
-        pos_y_presentador = 450  # Ajusta esta posición según lo necesites
-        self.canvas.create_image(pos_x_presentador, pos_y_presentador, image=presentador_imagen_tk, anchor="nw")
-        self.canvas.presentador_imagen_tk = presentador_imagen_tk  # Necesario para evitar que la imagen sea recolectada por el GC
-
-        # Cargar imágenes de las puertas
-        self.puerta1 = ImageTk.PhotoImage(Image.open(self.ruta_imagen_puerta_estatica).resize((133, 266)))
-        self.puerta2 = ImageTk.PhotoImage(Image.open(self.ruta_imagen_puerta_estatica).resize((133, 266)))
-        self.puerta3 = ImageTk.PhotoImage(Image.open(self.ruta_imagen_puerta_estatica).resize((133, 266)))
 
         # Posicionar las puertas
-        x1, y1 = 133, 133  # Nueva posición para puerta 1
-        x2, y2 = 333, 133  # Nueva posición para puerta 2
-        x3, y3 = 532, 133  # Nueva posición para puerta 3
-        self.puerta1_img = self.canvas.create_image(x1, y1, image=self.puerta1, anchor="nw")
-        self.puerta2_img = self.canvas.create_image(x2, y2, image=self.puerta2, anchor="nw")
-        self.puerta3_img = self.canvas.create_image(x3, y3, image=self.puerta3, anchor="nw")
+        self.posiciones_puertas = [(133, 133), (333, 133), (532, 133)]
 
         # Crear botón de Regresar
         boton_regresar = Button(self.v1, text="Regresar al Menú", command=self._regresar)
         boton_regresar.place(x=350, y=540)
 
-        # Crear etiquetas de puertas
-        self.label_puerta1 = Label(self.v1, image=self.puerta1, cursor="hand2")
-        self.label_puerta1.place(x=133, y=133)
-        self.label_puerta1.bind("<Button-1>", lambda e: self._cambiar_puerta(1, self.label_puerta1))
-
-        self.label_puerta2 = Label(self.v1, image=self.puerta2, cursor="hand2")
-        self.label_puerta2.place(x=333, y=133)
-        self.label_puerta2.bind("<Button-1>", lambda e: self._cambiar_puerta(2, self.label_puerta2))
-
-        self.label_puerta3 = Label(self.v1, image=self.puerta3, cursor="hand2")
-        self.label_puerta3.place(x=532, y=133)
-        self.label_puerta3.bind("<Button-1>", lambda e: self._cambiar_puerta(3, self.label_puerta3))
-
         # Etiquetas de las puertas A, B y C sobre las puertas
-        self.etiqueta_puerta1 = Label(self.v1, text="A", font=("Arial", 12, "bold"))
-        # Centro de la puerta 1 (x1 + ancho de la puerta / 2) y centrado de la etiqueta
-        self.etiqueta_puerta1.place(x=x1 + 133 / 2 - 15, y=y1 - 20)  # Ajustar '15' para que esté centrado
+        for numero, (x, y) in enumerate(self.posiciones_puertas, start=1):
+            etiqueta = Label(self.v1, text=self.puertas[numero - 1], font=("Arial", 12, "bold"))
+            # Centro de la puerta (x + ancho de la puerta / 2) y centrado de la etiqueta
+            etiqueta.place(x=x + 133 / 2 - 15, y=y - 20)  # Ajustar '15' para que esté centrado
+            setattr(self, f"etiqueta_puerta{numero}", etiqueta)
+
+        self.label_estadisticas = Label(self.v1, text=self._texto_estadisticas(), font=("Arial", 10))
+        self.label_estadisticas.place(x=266, y=490)
+
+        # Cargar los recursos cuando la ventana ya se haya dibujado
+        self._pasos_carga = [self._cargar_fondo, self._cargar_presentador, self._cargar_puertas,
+                             self._cargar_sonidos]
+        self.canvas.bind("<Map>", self._al_mostrar_ventana)
+
+    def _al_mostrar_ventana(self, evento):
+        """Primer cuadro visible: registrar el tiempo y empezar la carga de recursos"""
+        self.canvas.unbind("<Map>")
+        self.tiempos_inicio["primer_cuadro"] = time.perf_counter() - self._inicio_ventana
+        metricas.registrar("ventana.primer_cuadro", self.tiempos_inicio["primer_cuadro"])
+        self.v1.after(1, self._cargar_siguiente_recurso)
+
+    def _cargar_siguiente_recurso(self):
+        """Cargar un recurso y ceder el control a Tkinter antes del siguiente"""
+        try:
+            if not self.v1.winfo_exists():
+                return
+        except TclError:
+            return
 
-        self.etiqueta_puerta2 = Label(self.v1, text="B", font=("Arial", 12, "bold"))
-        # Centro de la puerta 2 (x2 + ancho de la puerta / 2) y centrado de la etiqueta
-        self.etiqueta_puerta2.place(x=x2 + 133 / 2 - 15, y=y2 - 20)  # Ajustar '15' para que esté centrado
+        if self._pasos_carga:
+            paso = self._pasos_carga.pop(0)
+            inicio = time.perf_counter()
+            try:
+                paso()
+            except Exception as e:
+                # Un recurso que falla (sin audio, archivo dañado...) no detiene la carga del resto
+                print(f"Error al cargar {paso.__name__.lstrip('_')}: {e}")
+            duracion = time.perf_counter() - inicio
+            self.tiempos_inicio["decodificacion"] += duracion
+            metricas.registrar(f"ventana.{paso.__name__.lstrip('_')}", duracion)
+            self.v1.after(1, self._cargar_siguiente_recurso)
+            return
 
-        self.etiqueta_puerta3 = Label(self.v1, text="C", font=("Arial", 12, "bold"))
-        # Centro de la puerta 3 (x3 + ancho de la puerta / 2) y centrado de la etiqueta
-        self.etiqueta_puerta3.place(x=x3 + 133 / 2 - 15, y=y3 - 20)  # Ajustar '15' para que esté centrado
+        self.tiempos_inicio["ventana_lista"] = time.perf_counter() - self._inicio_ventana
+        metricas.registrar("ventana.lista", self.tiempos_inicio["ventana_lista"])
+        if os.environ.get("MONTYHALL_TIEMPOS_INICIO"):
+            print(self.reporte_inicio())
 
         # Mostrar mensaje inicial de selección de puerta
         messagebox.showinfo("Monty Hall", "Selecciona una puerta entre A, B y C")
-        self.label_estadisticas = Label(self.v1, text="Ganadas: 0 | Perdidas: 0 | % de victorias: 0.00%",
-                                        font=("Arial", 10))
-        self.label_estadisticas.place(x=266, y=500)
+
+    def reporte_inicio(self):
+        """Resumen de los tiempos de arranque de la ventana en milisegundos"""
+        t = self.tiempos_inicio
+        return (f"Inicio Monty Hall: importación {t.get('importacion', 0) * 1000:.1f} ms | "
+                f"primer cuadro visible {t.get('primer_cuadro', 0) * 1000:.1f} ms | "
+                f"decodificación de recursos {t.get('decodificacion', 0) * 1000:.1f} ms | "
+                f"ventana lista {t.get('ventana_lista', 0) * 1000:.1f} ms")
+
+    def _cargar_fondo(self):
+        fondo_imagen_tk = cache_imagenes.obtener(self.ruta_imagen_fondo, (800, 600))
+
+        # Colocar la imagen de fondo en el canvas, detrás de todo lo demás
+        fondo = self.canvas.create_image(0, 0, image=fondo_imagen_tk, anchor="nw")
+        self.canvas.tag_lower(fondo)
+        cache_imagenes.retener("fondo", fondo_imagen_tk)
+
+    def _cargar_presentador(self):
+        # Cargar imagen del presentador
+        presentador_imagen_tk = cache_imagenes.obtener(self.ruta_imagen_presentador, (100, 150))
+
+        # Ajustar las coordenadas de la imagen del presentador
+        pos_x_presentador = 10
+        pos_y_presentador = 450  # Ajusta esta posición según lo necesites
+        self.presentador_img = self.canvas.create_image(pos_x_presentador, pos_y_presentador,
+                                                        image=presentador_imagen_tk, anchor="nw")
+        cache_imagenes.retener("presentador", presentador_imagen_tk)
+
+    def _cargar_puertas(self):
+        # Cargar imágenes de las puertas (las tres comparten la misma imagen decodificada)
+        self.puerta1 = cache_imagenes.obtener(self.ruta_imagen_puerta_estatica, (133, 266))
+        self.puerta2 = self.puerta1
+        self.puerta3 = self.puerta1
+
+        for numero, (x, y) in enumerate(self.posiciones_puertas, start=1):
+            imagen = getattr(self, f"puerta{numero}")
+            setattr(self, f"puerta{numero}_img", self.canvas.create_image(x, y, image=imagen, anchor="nw"))
+
+            # Crear etiquetas de puertas
+            label = Label(self.v1, image=imagen, cursor="hand2")
+            label.place(x=x, y=y)
+            label.bind("<Button-1>", lambda e, n=numero, l=label: self._cambiar_puerta(n, l))
+            setattr(self, f"label_puerta{numero}", label)
+
+    def _cargar_sonidos(self):
+        # pygame se importa aquí para no retrasar la apertura de la ventana
+        from sonidos import BancoSonidos
+        if self.sonidos is None:
+            self.sonidos = BancoSonidos(self.rutas_sonidos)
+        self.sonidos.cargar()
 
     def _regresar(self):
+        self._usar_historial(lambda historial: historial.vaciar())
         # Regresar a la ventana principal
         self.ventana_principal.deiconify()
-        self.v1.destroy()
\ No newline at end of file
+        self.v1.destroy()
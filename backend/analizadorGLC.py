@@ -0,0 +1,458 @@
+import os
+import random
+import time
+
+from automataComandos import normalizar
+
+RUTA_GRAMATICA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ordenes.glc")
+VACIA = "ε"
+# Nodos máximos del trie de columnas memorizadas; al pasarse se vacía entero
+MAX_NODOS_CACHE = 200_000
+
+
+class ErrorGramatica(ValueError):
+    pass
+
+
+def _es_no_terminal(simbolo):
+    return simbolo[:1].isalpha() and simbolo.isupper()
+
+
+def _valor_literal(texto):
+    if texto == "true":
+        return True
+    if texto == "false":
+        return False
+    try:
+        return int(texto)
+    except ValueError:
+        return texto
+
+
+class Gramatica:
+    """Gramática cargada de un archivo .glc, con las producciones numeradas para el Earley"""
+
+    def __init__(self, texto):
+        self.lados_izquierdos = []
+        self.lados_derechos = []
+        self.etiquetas = []
+        self.por_no_terminal = {}
+        actual = None
+        for numero, linea in enumerate(texto.splitlines(), 1):
+            linea = linea.split("#", 1)[0].strip()
+            if not linea:
+                continue
+            if linea.startswith("|"):
+                if actual is None:
+                    raise ErrorGramatica(f"Línea {numero}: alternativa sin regla")
+                alternativas = linea[1:]
+            else:
+                actual, flecha, alternativas = linea.partition("->")
+                actual = actual.strip()
+                if not flecha or not _es_no_terminal(actual):
+                    raise ErrorGramatica(f"Línea {numero}: se esperaba 'NO_TERMINAL -> ...'")
+            for alternativa in alternativas.split("|"):
+                simbolos, _, etiqueta = alternativa.partition("=>")
+                simbolos = simbolos.split()
+                if simbolos == [VACIA]:
+                    simbolos = []
+                elif not simbolos:
+                    raise ErrorGramatica(f"Línea {numero}: alternativa vacía (usar {VACIA})")
+                self._agregar(actual, simbolos, etiqueta.split())
+        if not self.lados_izquierdos:
+            raise ErrorGramatica("La gramática no tiene reglas")
+        self.inicial = self.lados_izquierdos[0]
+        indefinidos = {simbolo for derecho in self.lados_derechos for simbolo in derecho
+                       if _es_no_terminal(simbolo) and simbolo not in self.por_no_terminal}
+        if indefinidos:
+            raise ErrorGramatica(f"No terminales sin reglas: {', '.join(sorted(indefinidos))}")
+        self.anulables = self._anulables()
+
+    @classmethod
+    def desde_archivo(cls, ruta=RUTA_GRAMATICA):
+        with open(ruta, encoding="utf-8") as archivo:
+            return cls(archivo.read())
+
+    def _agregar(self, izquierdo, simbolos, etiqueta):
+        self.por_no_terminal.setdefault(izquierdo, []).append(len(self.lados_izquierdos))
+        self.lados_izquierdos.append(izquierdo)
+        self.lados_derechos.append(tuple(simbolos))
+        self.etiquetas.append(tuple(_valor_literal(parte) for parte in etiqueta) or None)
+
+    def _anulables(self):
+        anulables = set()
+        cambio = True
+        while cambio:
+            cambio = False
+            for izquierdo, derecho in zip(self.lados_izquierdos, self.lados_derechos):
+                if izquierdo not in anulables and all(simbolo in anulables for simbolo in derecho):
+                    anulables.add(izquierdo)
+                    cambio = True
+        return anulables
+
+    def generar(self, rng, simbolo=None, profundidad=8):
+        """Frase aleatoria del lenguaje (para armar corpus de prueba)"""
+        simbolo = simbolo or self.inicial
+        if not _es_no_terminal(simbolo):
+            return [simbolo]
+        producciones = self.por_no_terminal[simbolo]
+        if profundidad <= 0:
+            # Sin profundidad, preferir alternativas sin recursión
+            directas = [p for p in producciones if simbolo not in self.lados_derechos[p]]
+            producciones = directas or producciones
+        produccion = rng.choice(producciones)
+        return [palabra for parte in self.lados_derechos[produccion]
+                for palabra in self.generar(rng, parte, profundidad - 1)]
+
+
+class _Columna:
+    """Ítems de Earley de una posición
+
+    Los ítems con el punto al principio no se guardan uno por uno: dependen solo de qué no
+    terminales se predijeron, así que basta con el conjunto `predichos` y las tablas de la
+    gramática. Los demás ítems se indexan por el símbolo que esperan.
+    """
+
+    __slots__ = ("posicion", "items", "esperan", "predichos", "completos", "hijos")
+
+    def __init__(self, posicion):
+        self.posicion = posicion
+        # Ítem: (producción, punto, origen), con punto > 0 (o producción vacía)
+        self.items = set()
+        # símbolo siguiente (terminal o no terminal) -> ítems que lo esperan
+        self.esperan = {}
+        # No terminales predichos en esta posición (cerrado por predicción)
+        self.predichos = set()
+        # no terminal -> orígenes de los ítems completos que terminan aquí
+        self.completos = {}
+        # Trie de prefijos: token -> columna siguiente ya calculada
+        self.hijos = {}
+
+
+class ResultadoAnalisis:
+    def __init__(self, tokens, completo, prefijo_valido, acciones):
+        self.tokens = tokens
+        self.completo = completo
+        self.prefijo_valido = prefijo_valido
+        self.acciones = acciones
+
+    def __repr__(self):
+        return (f"ResultadoAnalisis(completo={self.completo}, prefijo_valido={self.prefijo_valido}, "
+                f"acciones={self.acciones})")
+
+    def como_dict(self):
+        return {"tokens": self.tokens, "completo": self.completo, "prefijo_valido": self.prefijo_valido,
+                "acciones": [list(accion) for accion in self.acciones]}
+
+
+class AnalizadorEarley:
+    """Analizador de Earley con memoria de columnas por prefijo de tokens
+
+    Cada columna depende solo de los tokens anteriores, así que las columnas se guardan en
+    un trie: una frase que repite el comienzo de otra (los resultados parciales del
+    reconocimiento de voz, o la misma orden dicha de nuevo) solo calcula las columnas de
+    los tokens nuevos.
+    """
+
+    def __init__(self, gramatica=None):
+        self.gramatica = gramatica or Gramatica.desde_archivo()
+        g = self.gramatica
+        self._derechos = g.lados_derechos
+        self._izquierdos = g.lados_izquierdos
+        self._largos = [len(derecho) for derecho in g.lados_derechos]
+        self._es_nt = {simbolo: _es_no_terminal(simbolo)
+                       for derecho in g.lados_derechos for simbolo in derecho}
+        # Producciones por primer símbolo, para los ítems implícitos de `predichos`
+        self._empiezan_con = {}
+        for produccion, derecho in enumerate(g.lados_derechos):
+            if derecho:
+                self._empiezan_con.setdefault(derecho[0], []).append(produccion)
+        # Cierre de la predicción de cada no terminal, calculado una vez
+        self._cierres = {no_terminal: self._cierre(no_terminal) for no_terminal in g.por_no_terminal}
+        # Ítems explícitos que agrega cada predicción: producciones vacías (ya completas) y
+        # saltos sobre un primer símbolo anulable (Aycock-Horspool)
+        self._explicitos = {
+            no_terminal: [(p, 0) for x in cierre for p in g.por_no_terminal[x] if not g.lados_derechos[p]]
+            + [(p, 1) for x in cierre for p in g.por_no_terminal[x]
+               if g.lados_derechos[p] and g.lados_derechos[p][0] in g.anulables]
+            for no_terminal, cierre in self._cierres.items()}
+        # No terminales con alguna producción que empieza con un terminal: si están predichos,
+        # la columna tiene un ítem implícito que espera una palabra
+        self._predicen_terminal = frozenset(
+            g.lados_izquierdos[p] for p, derecho in enumerate(g.lados_derechos)
+            if derecho and not _es_no_terminal(derecho[0]))
+        self._raiz = None
+        self._nodos = 0
+        self.aciertos_cache = 0
+        self.columnas_calculadas = 0
+        self.limpiar_cache()
+
+    def _cierre(self, no_terminal):
+        cierre = {no_terminal}
+        pendientes = [no_terminal]
+        while pendientes:
+            for produccion in self.gramatica.por_no_terminal[pendientes.pop()]:
+                for simbolo in self.gramatica.lados_derechos[produccion]:
+                    if _es_no_terminal(simbolo) and simbolo not in cierre:
+                        cierre.add(simbolo)
+                        pendientes.append(simbolo)
+                    if simbolo not in self.gramatica.anulables:
+                        break
+        return frozenset(cierre)
+
+    def limpiar_cache(self):
+        """Olvidar las columnas memorizadas; la columna 0 es siempre la misma y se conserva"""
+        if self._raiz is None:
+            raiz = _Columna(0)
+            self._raiz = self._cerrar(raiz, [], [], predecir=self.gramatica.inicial)
+        self._raiz.hijos = {}
+        self._nodos = 1
+
+    def _esperando(self, columna, simbolo):
+        """Ítems de la columna que esperan el símbolo: los explícitos y los implícitos"""
+        explicitos = columna.esperan.get(simbolo, ())
+        predichos = columna.predichos
+        if not predichos:
+            return explicitos
+        izquierdos = self._izquierdos
+        implicitos = [(p, 0, columna.posicion) for p in self._empiezan_con.get(simbolo, ())
+                      if izquierdos[p] in predichos]
+        return [*explicitos, *implicitos] if explicitos else implicitos
+
+    def _contiene(self, columna, item):
+        produccion, punto, origen = item
+        if punto == 0 and item not in columna.items:
+            return origen == columna.posicion and self._izquierdos[produccion] in columna.predichos
+        return item in columna.items
+
+    # --- Earley ---
+
+    def _cerrar(self, columna, iniciales, columnas, predecir=None):
+        """Predicción y compleción hasta que no aparezcan ítems nuevos en la columna"""
+        derechos = self._derechos
+        largos = self._largos
+        es_nt = self._es_nt
+        anulables = self.gramatica.anulables
+        posicion = columna.posicion
+        items = columna.items
+        esperan = columna.esperan
+        predichos = columna.predichos
+        completos = columna.completos
+        pendientes = []
+
+        def predecir_no_terminal(no_terminal):
+            # Los ítems con el punto al principio quedan implícitos en `predichos`
+            nuevos = self._cierres[no_terminal] - predichos
+            if not nuevos:
+                return
+            predichos.update(nuevos)
+            for produccion, punto in self._explicitos[no_terminal]:
+                if self._izquierdos[produccion] in nuevos:
+                    agregar((produccion, punto, posicion))
+
+        def agregar(item):
+            if item not in items:
+                items.add(item)
+                pendientes.append(item)
+
+        if predecir is not None:
+            predecir_no_terminal(predecir)
+        for item in iniciales:
+            agregar(item)
+        while pendientes:
+            item = pendientes.pop()
+            produccion, punto, origen = item
+            if punto == largos[produccion]:
+                # Compleción: avanzar a los que esperaban este no terminal desde el origen
+                izquierdo = self._izquierdos[produccion]
+                origenes = completos.get(izquierdo)
+                if origenes is None:
+                    origenes = completos[izquierdo] = set()
+                if origen in origenes:
+                    continue
+                origenes.add(origen)
+                anterior = columna if origen == posicion else columnas[origen]
+                for esperando in self._esperando(anterior, izquierdo):
+                    agregar((esperando[0], esperando[1] + 1, esperando[2]))
+                continue
+            simbolo = derechos[produccion][punto]
+            lista = esperan.get(simbolo)
+            if lista is None:
+                esperan[simbolo] = [item]
+            else:
+                lista.append(item)
+            if es_nt[simbolo]:
+                if simbolo not in predichos:
+                    predecir_no_terminal(simbolo)
+                # Aycock-Horspool: un no terminal anulable se puede saltar directamente
+                if simbolo in anulables or posicion in completos.get(simbolo, ()):
+                    agregar((produccion, punto + 1, origen))
+        return columna
+
+    def _columnas(self, tokens):
+        """Columnas 0..n para los tokens, reutilizando las del trie"""
+        columnas = [self._raiz]
+        for posicion, token in enumerate(tokens):
+            anterior = columnas[-1]
+            siguiente = anterior.hijos.get(token)
+            if siguiente is not None:
+                self.aciertos_cache += 1
+                columnas.append(siguiente)
+                continue
+            # Los tokens vienen en minúsculas, así que nunca chocan con un no terminal
+            escaneados = [(p, punto + 1, origen) for p, punto, origen in self._esperando(anterior, token)]
+            siguiente = self._cerrar(_Columna(posicion + 1), escaneados, columnas)
+            self.columnas_calculadas += 1
+            if self._nodos >= MAX_NODOS_CACHE:
+                self.limpiar_cache()
+                # Las columnas de esta frase siguen siendo válidas aunque ya no estén en el trie
+            else:
+                anterior.hijos[token] = siguiente
+                self._nodos += 1
+            columnas.append(siguiente)
+            if not siguiente.items:
+                # Prefijo imposible: las columnas siguientes también quedarían vacías
+                columnas.extend(_Columna(resto) for resto in range(posicion + 2, len(tokens) + 1))
+                break
+        return columnas
+
+    def _espera_terminal(self, columna):
+        """True si algún ítem de la columna espera una palabra: la frase todavía puede seguir"""
+        if not columna.predichos.isdisjoint(self._predicen_terminal):
+            return True
+        return any(not self._es_nt[simbolo] for simbolo in columna.esperan)
+
+    # --- Árbol y semántica ---
+
+    def _derivar(self, no_terminal, inicio, fin, columnas, tokens, memoria, en_curso):
+        """Valor semántico del primer árbol de no_terminal sobre tokens[inicio:fin]"""
+        clave = (no_terminal, inicio, fin)
+        if clave in memoria:
+            return memoria[clave]
+        if clave in en_curso:
+            return None
+        en_curso.add(clave)
+        resultado = None
+        for produccion in self.gramatica.por_no_terminal[no_terminal]:
+            if not self._contiene(columnas[fin], (produccion, self._largos[produccion], inicio)):
+                continue
+            hijos = self._emparejar(produccion, self._largos[produccion], inicio, fin, columnas, tokens,
+                                    memoria, en_curso)
+            if hijos is not None:
+                resultado = (self._evaluar(produccion, hijos),)
+                break
+        en_curso.discard(clave)
+        memoria[clave] = resultado
+        return resultado
+
+    def _emparejar(self, produccion, punto, inicio, fin, columnas, tokens, memoria, en_curso):
+        """Valores de los hijos de la producción hasta `punto`, que cubren tokens[inicio:fin]"""
+        if punto == 0:
+            return [] if inicio == fin else None
+        simbolo = self._derechos[produccion][punto - 1]
+        anterior = (produccion, punto - 1, inicio)
+        if not self._es_nt[simbolo]:
+            if fin > inicio and tokens[fin - 1] == simbolo and self._contiene(columnas[fin - 1], anterior):
+                resto = self._emparejar(produccion, punto - 1, inicio, fin - 1, columnas, tokens, memoria,
+                                        en_curso)
+                if resto is not None:
+                    return resto + [None]
+            return None
+        for medio in sorted(columnas[fin].completos.get(simbolo, ())):
+            if medio < inicio or not self._contiene(columnas[medio], anterior):
+                continue
+            valor = self._derivar(simbolo, medio, fin, columnas, tokens, memoria, en_curso)
+            if valor is None:
+                continue
+            resto = self._emparejar(produccion, punto - 1, inicio, medio, columnas, tokens, memoria, en_curso)
+            if resto is not None:
+                return resto + [valor[0]]
+        return None
+
+    def _evaluar(self, produccion, hijos):
+        etiqueta = self.gramatica.etiquetas[produccion]
+        acciones = [accion for valor in hijos if isinstance(valor, list) for accion in valor]
+        if etiqueta is None:
+            valores = [valor for valor in hijos if valor is not None]
+            if len(valores) == 1:
+                return valores[0]
+            return acciones
+        if etiqueta == ("repetir",):
+            veces = 1
+            for valor in hijos:
+                if isinstance(valor, int) and not isinstance(valor, bool):
+                    veces *= valor
+            return acciones * veces
+        if len(etiqueta) == 1 and isinstance(etiqueta[0], int):
+            return etiqueta[0]
+        return [etiqueta]
+
+    # --- API ---
+
+    def analizar_tokens(self, tokens):
+        tokens = list(tokens)
+        columnas = self._columnas(tokens)
+        final = columnas[-1]
+        completo = 0 in final.completos.get(self.gramatica.inicial, ())
+        acciones = []
+        if completo:
+            valor = self._derivar(self.gramatica.inicial, 0, len(tokens), columnas, tokens, {}, set())
+            if valor is not None:
+                acciones = valor[0] if isinstance(valor[0], list) else []
+        # Un prefijo sirve si ya es una orden o si alguna palabra más lo puede continuar; tener
+        # ítems no basta (pueden estar todos completos o esperar un no terminal improductivo)
+        prefijo_valido = completo or self._espera_terminal(final)
+        return ResultadoAnalisis(tokens, completo, prefijo_valido, acciones)
+
+    def analizar(self, texto):
+        """Analizar una frase: acciones si es una orden completa, y si todavía puede serlo"""
+        return self.analizar_tokens(normalizar(texto).decode("ascii").split())
+
+
+def corpus(gramatica, cantidad, semilla=0):
+    rng = random.Random(semilla)
+    return [" ".join(gramatica.generar(rng)) for _ in range(cantidad)]
+
+
+def medir(cantidad=20_000, semilla=0):
+    """Tiempo por análisis con el trie vacío, por resultado parcial y con el trie caliente"""
+    analizador = AnalizadorEarley()
+    frases = corpus(analizador.gramatica, cantidad, semilla)
+    largo_medio = sum(len(frase.split()) for frase in frases) / len(frases)
+    print(f"Corpus: {len(frases)} órdenes generadas, {largo_medio:.1f} palabras de media")
+    completos = sum(analizador.analizar(frase).completo for frase in frases)
+
+    def sin_cache():
+        for frase in frases:
+            analizador.limpiar_cache()
+            inicio = time.perf_counter()
+            analizador.analizar(frase)
+            yield time.perf_counter() - inicio
+
+    def parciales():
+        # Como llegan los resultados intermedios del reconocimiento de voz: un token más cada vez
+        analizador.limpiar_cache()
+        for frase in frases:
+            palabras = frase.split()
+            for fin in range(1, len(palabras) + 1):
+                inicio = time.perf_counter()
+                analizador.analizar_tokens(palabras[:fin])
+                yield time.perf_counter() - inicio
+
+    def caliente():
+        for frase in frases:
+            inicio = time.perf_counter()
+            analizador.analizar(frase)
+            yield time.perf_counter() - inicio
+
+    for nombre, tiempos in (("sin caché", sin_cache), ("por parcial", parciales), ("caché caliente", caliente)):
+        valores = sorted(tiempos())
+        media = sum(valores) / len(valores)
+        print(f"{nombre:<15} n={len(valores):>7} | media {media * 1e6:7.1f} µs | "
+              f"p50 {valores[len(valores) // 2] * 1e6:7.1f} µs | p99 {valores[int(len(valores) * 0.99)] * 1e6:7.1f} µs")
+    print(f"Órdenes reconocidas completas: {completos} de {len(frases)} | columnas calculadas: "
+          f"{analizador.columnas_calculadas}, reutilizadas: {analizador.aciertos_cache}")
+
+
+if __name__ == "__main__":
+    medir()
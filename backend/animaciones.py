@@ -0,0 +1,124 @@
+import time
+from tkinter import TclError
+
+from metricas import metricas
+
+# Espera mínima entre ticks, para no saturar el bucle de Tkinter con GIFs muy rápidos
+TICK_MINIMO_MS = 10
+
+
+class _Sprite:
+    """Estado de animación de una etiqueta"""
+
+    __slots__ = ("label", "fotogramas", "indice", "proximo")
+
+    def __init__(self, label, fotogramas, ahora):
+        self.label = label
+        self.fotogramas = fotogramas
+        self.indice = 0
+        # Momento (en ms) en que toca avanzar al siguiente fotograma
+        self.proximo = ahora + fotogramas.duracion(0)
+
+
+class PlanificadorAnimaciones:
+    """Reloj de fotogramas único por ventana que anima cualquier número de etiquetas
+
+    Un solo after() atiende a todas las etiquetas; cada una avanza según la duración propia de
+    sus fotogramas y solo se llama a label.config cuando el fotograma realmente cambia.
+    """
+
+    def __init__(self, ventana):
+        self.ventana = ventana
+        self._sprites = {}
+        self._tick = None
+        # Momento (en ms) para el que se programó el tick pendiente
+        self._programado = None
+        # Al destruir la ventana se cancela el tick pendiente
+        ventana.bind("<Destroy>", self._al_destruir, add="+")
+
+    @staticmethod
+    def _ahora():
+        return time.perf_counter() * 1000
+
+    def animar(self, label, fotogramas):
+        """Mostrar el primer fotograma en la etiqueta y animarla si el GIF tiene más"""
+        label.config(image=fotogramas[0])
+        if not fotogramas.animado:
+            self._sprites.pop(label, None)
+            return
+        self._sprites[label] = _Sprite(label, fotogramas, self._ahora())
+        self._programar()
+
+    def detener(self, label=None):
+        """Detener la animación de una etiqueta, o de todas si no se indica ninguna"""
+        if label is None:
+            self._sprites.clear()
+        else:
+            self._sprites.pop(label, None)
+        if not self._sprites:
+            self._cancelar()
+
+    def _cancelar(self):
+        if self._tick is not None:
+            try:
+                self.ventana.after_cancel(self._tick)
+            except TclError:
+                pass
+            self._tick = None
+
+    def _programar(self):
+        """Programar el próximo tick para el sprite que antes necesite avanzar"""
+        self._cancelar()
+        if not self._sprites:
+            return
+        proximo = min(sprite.proximo for sprite in self._sprites.values())
+        ahora = self._ahora()
+        espera = max(TICK_MINIMO_MS, int(proximo - ahora))
+        self._programado = ahora + espera
+        try:
+            self._tick = self.ventana.after(espera, self._avanzar)
+        except TclError:
+            # La ventana ya no existe
+            self._sprites.clear()
+
+    def _avanzar(self):
+        self._tick = None
+        ahora = self._ahora()
+        # Qué tan tarde llegó el tick respecto al after() pedido
+        metricas.registrar("animacion.retraso_tick", (ahora - self._programado) / 1000)
+        with metricas.medir("animacion.tick"):
+            self._avanzar_sprites(ahora)
+        self._programar()
+
+    def _avanzar_sprites(self, ahora):
+        """Cambiar de fotograma las etiquetas a las que ya les toca"""
+        for label, sprite in list(self._sprites.items()):
+            try:
+                if not label.winfo_exists():
+                    del self._sprites[label]
+                    continue
+            except TclError:
+                del self._sprites[label]
+                continue
+            if ahora < sprite.proximo:
+                continue
+
+            fotogramas = sprite.fotogramas
+            indice = fotogramas.siguiente(sprite.indice)
+            if indice != sprite.indice:
+                label.config(image=fotogramas[indice])
+                sprite.indice = indice
+                metricas.contar("animacion.cambios_fotograma")
+            # Avanzar sobre el horario previsto para no acumular retraso; si hubo un atraso
+            # grande (ventana bloqueada por un diálogo) se reinicia desde ahora
+            sprite.proximo += fotogramas.duracion(indice)
+            if sprite.proximo < ahora:
+                sprite.proximo = ahora + fotogramas.duracion(indice)
+
+    def _al_destruir(self, evento):
+        if evento.widget is self.ventana:
+            self._sprites.clear()
+            self._cancelar()
+
+    def __len__(self):
+        return len(self._sprites)
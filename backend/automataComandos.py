@@ -0,0 +1,329 @@
+import random
+import time
+import unicodedata
+
+# Vocabulario: frase (ya normalizada) -> comando. Los comandos son tuplas listas para JSON:
+# ("puerta", índice), ("cambiar", bool), ("cerrar",), ("mover", dx, dy) y ("pista",)
+VOCABULARIO = {
+    "puerta a": ("puerta", 0),
+    "puerta b": ("puerta", 1),
+    "puerta c": ("puerta", 2),
+    "puerta uno": ("puerta", 0),
+    "puerta dos": ("puerta", 1),
+    "puerta tres": ("puerta", 2),
+    "primera puerta": ("puerta", 0),
+    "segunda puerta": ("puerta", 1),
+    "tercera puerta": ("puerta", 2),
+    "cambiar": ("cambiar", True),
+    "cambio": ("cambiar", True),
+    "cambia": ("cambiar", True),
+    "otra puerta": ("cambiar", True),
+    "mantener": ("cambiar", False),
+    "mantengo": ("cambiar", False),
+    "me quedo": ("cambiar", False),
+    "quedarme": ("cambiar", False),
+    "cerrar": ("cerrar",),
+    "cierra": ("cerrar",),
+    "salir": ("cerrar",),
+    "izquierda": ("mover", -1, 0),
+    "derecha": ("mover", 1, 0),
+    "arriba": ("mover", 0, -1),
+    "sube": ("mover", 0, -1),
+    "subir": ("mover", 0, -1),
+    "abajo": ("mover", 0, 1),
+    "baja": ("mover", 0, 1),
+    "bajar": ("mover", 0, 1),
+    "pista": ("pista",),
+    "ayuda": ("pista",),
+}
+
+ESPACIO = ord(" ")
+# Separa transcripciones dentro de un lote; el autómata lo trata como un límite de palabra
+SEPARADOR = ord("\n")
+# Todo lo que no es letra o dígito ASCII queda como espacio después de normalizar
+_A_ESPACIOS = bytes(b if chr(b).isascii() and chr(b).isalnum() else ESPACIO for b in range(256))
+# Igual, pero conservando el separador (para normalizar un lote entero de una vez)
+_A_ESPACIOS_LOTE = bytes(SEPARADOR if b == SEPARADOR else c for b, c in enumerate(_A_ESPACIOS))
+
+
+def normalizar(texto):
+    """Minúsculas, sin acentos y con las palabras separadas por un solo espacio, como bytes ASCII"""
+    return b" ".join(_sin_acentos(texto).translate(_A_ESPACIOS).split())
+
+
+def _sin_acentos(texto):
+    return unicodedata.normalize("NFD", texto.lower()).encode("ascii", "ignore")
+
+
+def _normalizar_lote(textos):
+    """Transcripciones unidas por " \n " con cada paso de normalización hecho una sola vez
+
+    No se colapsan los espacios repetidos: el autómata ya los trata como uno solo.
+    """
+    unidas = " \n ".join(texto.replace("\n", " ") for texto in textos)
+    return _sin_acentos(unidas).translate(_A_ESPACIOS_LOTE)
+
+
+class AutomataComandos:
+    """AFD mínimo que reconoce todas las frases del vocabulario en una sola pasada
+
+    Se construye un Aho-Corasick sobre las frases rodeadas de espacios (así solo coinciden
+    palabras completas: "puerta a" no aparece dentro de "puerta abierta"), se completa como
+    AFD sobre clases de bytes y se minimiza por refinamiento de particiones (Moore). La
+    tabla final está indexada por byte, y los estados con salida van al final para que la
+    pasada solo pregunte `estado >= limite` en cada carácter.
+    """
+
+    def __init__(self, vocabulario=None):
+        self.vocabulario = dict(VOCABULARIO if vocabulario is None else vocabulario)
+        patrones = []
+        for frase, comando in self.vocabulario.items():
+            normalizada = normalizar(frase)
+            if not normalizada:
+                raise ValueError(f"Frase vacía en el vocabulario: {frase!r}")
+            patrones.append((b" " + normalizada + b" ", tuple(comando)))
+
+        # Clases de bytes: cada letra usada en alguna frase tiene la suya; el resto de letras
+        # y dígitos comparten una; el espacio y el separador van aparte
+        letras = sorted({b for patron, _ in patrones for b in patron if b != ESPACIO})
+        clase_de = [0] * 256
+        for b in range(256):
+            if _A_ESPACIOS[b] != ESPACIO:
+                clase_de[b] = 1
+        clase_de[ESPACIO] = 2
+        clase_de[SEPARADOR] = 3
+        for indice, b in enumerate(letras):
+            clase_de[b] = 4 + indice
+        n_clases = 4 + len(letras)
+
+        transiciones, salidas = self._aho_corasick(patrones, clase_de, n_clases)
+        transiciones, salidas, inicio = self._minimizar(transiciones, salidas, n_clases)
+        self._compilar(transiciones, salidas, inicio, clase_de, n_clases)
+
+    @staticmethod
+    def _aho_corasick(patrones, clase_de, n_clases):
+        """Trie con enlaces de fallo, completado como AFD; el estado 0 es la raíz"""
+        hijos = [{}]
+        salidas = [[]]
+        for patron, comando in patrones:
+            estado = 0
+            for b in patron:
+                clase = clase_de[b]
+                if clase not in hijos[estado]:
+                    hijos.append({})
+                    salidas.append([])
+                    hijos[estado][clase] = len(hijos) - 1
+                estado = hijos[estado][clase]
+            salidas[estado].append((len(patron), comando))
+
+        transiciones = [None] * len(hijos)
+        fallo = [0] * len(hijos)
+        transiciones[0] = [hijos[0].get(clase, 0) for clase in range(n_clases)]
+        cola = list(hijos[0].values())
+        for estado in cola:
+            fallo[estado] = 0
+        # Recorrido en anchura: el fallo de un estado ya está completo al visitarlo
+        for estado in cola:
+            fila = list(transiciones[fallo[estado]])
+            for clase, hijo in hijos[estado].items():
+                fila[clase] = hijo
+                if estado != 0:
+                    fallo[hijo] = transiciones[fallo[estado]][clase]
+                cola.append(hijo)
+            transiciones[estado] = fila
+            # Las frases que terminan en el estado de fallo también terminan aquí
+            salidas[estado] = salidas[estado] + salidas[fallo[estado]]
+        # Con varias frases terminando en el mismo carácter, primero la más larga
+        salidas = [tuple(comando for _, comando in sorted(lista, key=lambda par: -par[0]))
+                   for lista in salidas]
+
+        # Espacios repetidos: después de un espacio, otro no cambia nada. Si el estado tiene
+        # salida se pasa a una copia sin ella, para no repetir el comando por cada espacio
+        espacio = clase_de[ESPACIO]
+        for estado in range(len(hijos)):
+            for clase, hijo in hijos[estado].items():
+                if clase != espacio:
+                    continue
+                if salidas[hijo]:
+                    copia = list(transiciones[hijo])
+                    transiciones.append(copia)
+                    salidas.append(())
+                    copia[espacio] = len(transiciones) - 1
+                    transiciones[hijo][espacio] = len(transiciones) - 1
+                else:
+                    transiciones[hijo][espacio] = hijo
+        return transiciones, salidas
+
+    @staticmethod
+    def _minimizar(transiciones, salidas, n_clases):
+        """Moore: estados con la misma salida y transiciones a los mismos bloques se fusionan"""
+        bloques = {}
+        bloque = [bloques.setdefault(salida, len(bloques)) for salida in salidas]
+        while True:
+            firmas = {}
+            nuevo = [firmas.setdefault((bloque[estado], tuple(bloque[destino] for destino in fila)), len(firmas))
+                     for estado, fila in enumerate(transiciones)]
+            if len(firmas) == len(set(bloque)):
+                break
+            bloque = nuevo
+        n_estados = len(set(bloque))
+        minimas = [None] * n_estados
+        salidas_minimas = [()] * n_estados
+        for estado, fila in enumerate(transiciones):
+            if minimas[bloque[estado]] is None:
+                minimas[bloque[estado]] = [bloque[destino] for destino in fila]
+                salidas_minimas[bloque[estado]] = salidas[estado]
+        return minimas, salidas_minimas, bloque[0]
+
+    def _compilar(self, transiciones, salidas, inicio, clase_de, n_clases):
+        """Tabla plana por byte; los estados con salida y el separador quedan al final"""
+        # Separador: copia del estado al que se llega leyendo un espacio desde el inicio,
+        # marcada para que la pasada cuente transcripciones
+        tras_espacio = transiciones[inicio][clase_de[ESPACIO]]
+        transiciones = transiciones + [list(transiciones[tras_espacio])]
+        salidas = list(salidas) + [None]
+        separador = len(transiciones) - 1
+        for fila in transiciones:
+            fila[clase_de[SEPARADOR]] = separador
+
+        orden = sorted(range(len(transiciones)), key=lambda estado: salidas[estado] is None or bool(salidas[estado]))
+        posicion = {estado: indice for indice, estado in enumerate(orden)}
+        self.n_estados = len(orden)
+        self.n_clases = n_clases
+        self.clases = clase_de
+        # Tabla por clases (para exportar) y por bytes con desplazamientos (para la pasada)
+        self.transiciones = [[posicion[fila[clase]] for clase in range(n_clases)]
+                             for fila in (transiciones[estado] for estado in orden)]
+        self.salidas = [salidas[estado] for estado in orden]
+        self.inicio = posicion[inicio]
+        self.separador = posicion[separador]
+        self.limite = min((posicion[estado] for estado in range(len(transiciones))
+                           if salidas[estado] is None or salidas[estado]), default=self.n_estados)
+        self._tabla = [destino << 8 for fila in self.transiciones for destino in (fila[clase] for clase in clase_de)]
+        # Desplazamientos de la tabla (estado << 8) que superan el límite
+        self._limite_tabla = self.limite << 8
+
+    # --- Reconocimiento ---
+
+    def _pasada(self, datos, resultados):
+        """Recorrer los bytes normalizados agregando comandos a resultados[indice de transcripción]"""
+        tabla = self._tabla
+        limite = self._limite_tabla
+        salidas = self.salidas
+        separador = self.separador
+        estado = self.inicio << 8
+        indice = 0
+        actuales = resultados[0]
+        for b in datos:
+            estado = tabla[estado + b]
+            if estado >= limite:
+                fila = estado >> 8
+                if fila == separador:
+                    indice += 1
+                    actuales = resultados[indice]
+                else:
+                    actuales.extend(salidas[fila])
+        return resultados
+
+    def reconocer(self, texto):
+        """Comandos de una transcripción, en el orden en que aparecen"""
+        return self._pasada(b" " + _sin_acentos(texto).translate(_A_ESPACIOS) + b" ", [[]])[0]
+
+    def reconocer_lote(self, textos):
+        """Comandos de varias transcripciones con una sola pasada sobre todas juntas"""
+        textos = list(textos)
+        if not textos:
+            return []
+        return self._pasada(b" " + _normalizar_lote(textos) + b" ", [[] for _ in textos])
+
+    def procesar_flujo(self, transcripciones, tamano_lote=256):
+        """Generador de (transcripción, comandos) para un flujo, procesado por lotes"""
+        lote = []
+        for texto in transcripciones:
+            lote.append(texto)
+            if len(lote) >= tamano_lote:
+                yield from zip(lote, self.reconocer_lote(lote))
+                lote = []
+        if lote:
+            yield from zip(lote, self.reconocer_lote(lote))
+
+    def exportar(self):
+        """Autómata compilado en JSON para que el navegador haga la misma pasada"""
+        return {
+            "clases": self.clases,
+            "transiciones": self.transiciones,
+            "salidas": {str(estado): [list(comando) for comando in salida]
+                        for estado, salida in enumerate(self.salidas) if salida},
+            "inicio": self.inicio,
+            "separador": self.separador,
+        }
+
+
+def reconocer_ingenuo(texto, vocabulario=VOCABULARIO):
+    """Lo que hacía laberinto.html: un `in` por frase sobre la transcripción en minúsculas"""
+    texto = texto.strip().lower()
+    return [comando for frase, comando in vocabulario.items() if frase in texto]
+
+
+def transcripciones_sinteticas(cantidad, semilla=0):
+    """Frases de relleno con comandos intercalados, mayúsculas y acentos como los de la voz"""
+    rng = random.Random(semilla)
+    relleno = ["quiero", "la", "por favor", "ahora", "vamos", "eh", "creo que", "mejor", "muévete",
+               "un poco", "más", "sí", "no", "después", "ya", "otra vez", "¿puedes?", "Ándale"]
+    frases = list(VOCABULARIO)
+    acentos = str.maketrans("aeiou", "áéíóú")
+    textos = []
+    for _ in range(cantidad):
+        palabras = [rng.choice(relleno) for _ in range(rng.randint(2, 8))]
+        for _ in range(rng.randint(0, 3)):
+            frase = rng.choice(frases)
+            if rng.random() < 0.3:
+                frase = frase.translate(acentos)
+            if rng.random() < 0.3:
+                frase = frase.upper()
+            palabras.insert(rng.randrange(len(palabras) + 1), frase)
+        textos.append(" ".join(palabras))
+    return textos
+
+
+def vocabulario_ampliado(sinonimos_extra, semilla=0):
+    """VOCABULARIO más sinónimos inventados, para ver cómo escala cada método con el tamaño"""
+    rng = random.Random(semilla)
+    vocabulario = dict(VOCABULARIO)
+    comandos = list(VOCABULARIO.values())
+    while len(vocabulario) < len(VOCABULARIO) + sinonimos_extra:
+        palabra = "".join(rng.choice("abcdefghijlmnoprstuvz") for _ in range(rng.randint(4, 10)))
+        vocabulario[palabra] = rng.choice(comandos)
+    return vocabulario
+
+
+def medir(cantidad=100_000, semilla=0, sinonimos_extra=(0, 100, 1000)):
+    """Transcripciones por segundo: `in` por frase contra el autómata, una a una y por lotes"""
+    textos = transcripciones_sinteticas(cantidad, semilla)
+    for extra in sinonimos_extra:
+        vocabulario = vocabulario_ampliado(extra, semilla)
+        inicio = time.perf_counter()
+        automata = AutomataComandos(vocabulario)
+        compilado = time.perf_counter() - inicio
+        print(f"Vocabulario de {len(vocabulario)} frases -> {automata.n_estados} estados, "
+              f"{automata.n_clases} clases de bytes, compilado en {compilado * 1000:.1f} ms")
+
+        resultados = {}
+        for nombre, funcion in (
+                ("ingenuo (in)", lambda: [reconocer_ingenuo(texto, vocabulario) for texto in textos]),
+                ("autómata", lambda: [automata.reconocer(texto) for texto in textos]),
+                ("autómata por lotes", lambda: automata.reconocer_lote(textos))):
+            inicio = time.perf_counter()
+            resultados[nombre] = funcion()
+            segundos = time.perf_counter() - inicio
+            print(f"    {nombre:<20} {cantidad / segundos:>12,.0f} transcripciones/s")
+
+        assert resultados["autómata"] == resultados["autómata por lotes"]
+        distintas = sum(sorted(a) != sorted(b)
+                        for a, b in zip(resultados["ingenuo (in)"], resultados["autómata"]))
+        print(f"    el ingenuo difiere en {distintas} de {cantidad} "
+              f"(acentos, mayúsculas, repeticiones, palabras parciales)")
+
+
+if __name__ == "__main__":
+    medir()
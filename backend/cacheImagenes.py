@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+from metricas import metricas
+
+# Memoria máxima por defecto para imágenes decodificadas (en bytes, RGBA sin comprimir)
+MAX_BYTES = 32 * 1024 * 1024
+
+
+class CacheImagenes:
+    """Caché LRU de imágenes decodificadas y redimensionadas, compartida por todo el proceso
+
+    La clave es (ruta, tamaño, remuestreo). Además guarda las referencias que Tkinter necesita
+    para que una imagen en pantalla no sea recolectada por el GC.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        # Imágenes en uso por la interfaz: nombre -> PhotoImage
+        self._retenidas = {}
+        self._candado = threading.Lock()
+
+    @staticmethod
+    def _tamano_en_bytes(imagen):
+        ancho, alto = imagen.size
+        return ancho * alto * 4
+
+    def _cargar(self, ruta, tamano, remuestreo):
+        """Decodificar y redimensionar una imagen desde disco"""
+        with metricas.medir("imagen.decodificar"):
+            imagen = Image.open(ruta)
+            imagen.load()
+        if tamano is not None and imagen.size != tuple(tamano):
+            with metricas.medir("imagen.redimensionar"):
+                if remuestreo is None:
+                    imagen = imagen.resize(tamano)
+                else:
+                    imagen = imagen.resize(tamano, remuestreo)
+        return imagen
+
+    def obtener_pil(self, ruta, tamano=None, remuestreo=None):
+        """Imagen de PIL ya redimensionada, decodificándola solo la primera vez"""
+        return self._obtener(ruta, tamano, remuestreo)[0]
+
+    def obtener(self, ruta, tamano=None, remuestreo=None):
+        """PhotoImage compartido para (ruta, tamaño, remuestreo)
+
+        Debe llamarse desde el hilo de Tkinter, porque ahí se crea el PhotoImage.
+        """
+        entrada = self._obtener(ruta, tamano, remuestreo)
+        if entrada[1] is None:
+            with metricas.medir("imagen.photoimage"):
+                entrada[1] = ImageTk.PhotoImage(entrada[0])
+        return entrada[1]
+
+    def _obtener(self, ruta, tamano, remuestreo):
+        clave = (ruta, tuple(tamano) if tamano is not None else None, remuestreo)
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                metricas.contar("imagen.aciertos_cache")
+                return entrada
+            self.fallos += 1
+            metricas.contar("imagen.fallos_cache")
+
+        # Decodificar fuera del candado para no bloquear a otros hilos
+        imagen = self._cargar(ruta, clave[1], remuestreo)
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                entrada = [imagen, None]
+                self._entradas[clave] = entrada
+                self.bytes_usados += self._tamano_en_bytes(imagen)
+                self._desalojar()
+            return entrada
+
+    def _desalojar(self):
+        """Sacar las entradas menos usadas hasta respetar el límite de memoria"""
+        # Siempre se conserva la entrada recién agregada, aunque supere el límite por sí sola
+        while self.bytes_usados > self.max_bytes and len(self._entradas) > 1:
+            _, (imagen, _) = self._entradas.popitem(last=False)
+            self.bytes_usados -= self._tamano_en_bytes(imagen)
+
+    def retener(self, nombre, foto):
+        """Mantener viva una imagen mostrada en pantalla bajo un nombre
+
+        Reemplaza la imagen anterior con el mismo nombre, que ya puede ser liberada.
+        """
+        self._retenidas[nombre] = foto
+        return foto
+
+    def liberar(self, nombre):
+        """Soltar la referencia de una imagen que ya no está en pantalla"""
+        self._retenidas.pop(nombre, None)
+
+    def limpiar(self):
+        """Vaciar la caché y las referencias retenidas"""
+        with self._candado:
+            self._entradas.clear()
+            self.bytes_usados = 0
+        self._retenidas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+# Caché única para todo el proceso
+cache_imagenes = CacheImagenes()
+
+
+def obtener_imagen(ruta, tamano=None, remuestreo=None):
+    """Atajo para pedir un PhotoImage a la caché del proceso"""
+    return cache_imagenes.obtener(ruta, tamano, remuestreo)
@@ -0,0 +1,147 @@
+import math
+import os
+import struct
+
+import cv2
+import numpy as np
+
+# Cabecera fija del archivo de fotogramas horneados: firma, versión, fps, ancho y alto
+# guardados (solo la zona del video, sin las barras negras), ancho y alto de la ventana,
+# número de fotogramas, segundos horneados, tamaño y mtime del video fuente
+FIRMA = b"MHFR"
+VERSION = 3
+FORMATO_CABECERA = "<4sHdIIIIIdQq"
+TAMANO_CABECERA = 64
+
+# Segundos que se hornean por defecto: los mismos que reproduce la intro
+DURACION_POR_DEFECTO = 20
+# Tope del archivo horneado. La intro por defecto (20 s a 30 fps de un video 16:9 en 800x600,
+# es decir 800x450 sin las barras) ocupa unos 650 MB y cabe a escala completa; solo ventanas
+# o duraciones mayores se guardan más pequeñas y se vuelven a agrandar al mostrarlas
+LIMITE_BYTES = 1024 * 1024 * 1024
+
+
+def geometria_letterbox(frame_ancho, frame_alto, ancho_ventana, alto_ventana):
+    """Tamaño escalado y posición para centrar el video dentro de la ventana"""
+    escala = min(ancho_ventana / frame_ancho, alto_ventana / frame_alto)
+    nuevo_ancho = int(frame_ancho * escala)
+    nuevo_alto = int(frame_alto * escala)
+    x0 = (ancho_ventana - nuevo_ancho) // 2
+    y0 = (alto_ventana - nuevo_alto) // 2
+    return nuevo_ancho, nuevo_alto, x0, y0
+
+
+def _firma_fuente(ruta_video):
+    estado = os.stat(ruta_video)
+    return estado.st_size, estado.st_mtime_ns
+
+
+def _leer_cabecera(ruta_cache):
+    with open(ruta_cache, "rb") as archivo:
+        datos = archivo.read(TAMANO_CABECERA)
+    if len(datos) != TAMANO_CABECERA:
+        raise ValueError("Cabecera incompleta")
+    (firma, version, fps, ancho, alto, ancho_ventana, alto_ventana, n_frames, duracion,
+     tamano_fuente, mtime_fuente) = struct.unpack_from(FORMATO_CABECERA, datos)
+    if firma != FIRMA or version != VERSION:
+        raise ValueError("No es un archivo de fotogramas horneados")
+    return fps, ancho, alto, (ancho_ventana, alto_ventana), n_frames, duracion, (tamano_fuente, mtime_fuente)
+
+
+def cache_valida(ruta_cache, ruta_video, ancho_ventana, alto_ventana, duracion=DURACION_POR_DEFECTO):
+    """True si la caché existe, corresponde al mismo video y ventana y cubre la duración pedida"""
+    try:
+        fps, ancho, alto, ventana, n_frames, horneados, fuente = _leer_cabecera(ruta_cache)
+        esperado = TAMANO_CABECERA + n_frames * alto * ancho * 3
+        return (fuente == _firma_fuente(ruta_video)
+                and ventana == (ancho_ventana, alto_ventana)
+                and horneados >= duracion
+                and os.path.getsize(ruta_cache) == esperado)
+    except (OSError, ValueError, struct.error):
+        return False
+
+
+def tamano_guardado(n_frames, ancho, alto, limite_bytes=LIMITE_BYTES):
+    """Ancho y alto con que se guardan fotogramas de ancho x alto para no pasar de limite_bytes"""
+    bytes_completos = max(1, n_frames) * ancho * alto * 3
+    escala = min(1.0, math.sqrt(limite_bytes / bytes_completos))
+    return max(1, int(ancho * escala)), max(1, int(alto * escala))
+
+
+def hornear_video(ruta_video, ruta_cache, ancho_ventana=800, alto_ventana=600, duracion=DURACION_POR_DEFECTO,
+                  limite_bytes=LIMITE_BYTES):
+    """Decodificar el video una vez y guardar cada fotograma ya escalado a la ventana
+
+    Se guarda solo la zona que ocupa el video dentro de la ventana; las barras negras las
+    pone quien lo muestra. Solo se hornean los primeros `duracion` segundos, y si no caben
+    en limite_bytes se guardan a una escala menor. Devuelve el número de fotogramas escritos.
+    """
+    cap = cv2.VideoCapture(ruta_video)
+    if not cap.isOpened():
+        raise OSError(f"No se puede abrir el video en {ruta_video}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    tamano_fuente, mtime_fuente = _firma_fuente(ruta_video)
+    maximo = int(fps * duracion)
+    en_video = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    if en_video > 0:
+        maximo = min(maximo, en_video)
+    ret, frame = cap.read()
+    if ret:
+        frame_alto, frame_ancho = frame.shape[:2]
+        zona_ancho, zona_alto, _, _ = geometria_letterbox(frame_ancho, frame_alto, ancho_ventana, alto_ventana)
+    else:
+        maximo = 0
+        zona_ancho, zona_alto = ancho_ventana, alto_ventana
+    ancho, alto = tamano_guardado(maximo, zona_ancho, zona_alto, limite_bytes)
+    n_frames = 0
+
+    directorio = os.path.dirname(ruta_cache)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    temporal = f"{ruta_cache}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, "wb") as archivo:
+            # Se reserva la cabecera y se completa al final, cuando se conoce el número de fotogramas
+            archivo.write(b"\0" * TAMANO_CABECERA)
+            while n_frames < maximo:
+                if n_frames:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                archivo.write(np.ascontiguousarray(cv2.resize(frame, (ancho, alto))).data)
+                n_frames += 1
+
+            cabecera = struct.pack(FORMATO_CABECERA, FIRMA, VERSION, fps, ancho, alto, ancho_ventana,
+                                   alto_ventana, n_frames, duracion, tamano_fuente, mtime_fuente)
+            archivo.seek(0)
+            archivo.write(cabecera.ljust(TAMANO_CABECERA, b"\0"))
+        os.replace(temporal, ruta_cache)
+    finally:
+        cap.release()
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    return n_frames
+
+
+def abrir_cache(ruta_cache):
+    """Mapear en memoria los fotogramas horneados
+
+    Devuelve (fps, fotogramas), donde fotogramas[i] es una vista sin copia de forma
+    (alto, ancho, 3) con la zona del video, sin las barras negras: se centra en la ventana
+    con geometria_letterbox (y se agranda si se horneó a escala reducida).
+    """
+    fps, ancho, alto, _, n_frames, _, _ = _leer_cabecera(ruta_cache)
+    if n_frames == 0:
+        return fps, np.zeros((0, alto, ancho, 3), dtype=np.uint8)
+    fotogramas = np.memmap(ruta_cache, dtype=np.uint8, mode="r", offset=TAMANO_CABECERA,
+                           shape=(n_frames, alto, ancho, 3))
+    return fps, fotogramas
+
+
+def cargar_o_hornear(ruta_video, ruta_cache, ancho_ventana=800, alto_ventana=600, duracion=DURACION_POR_DEFECTO):
+    """Abrir la caché de fotogramas, horneándola antes si falta o quedó desactualizada"""
+    if not cache_valida(ruta_cache, ruta_video, ancho_ventana, alto_ventana, duracion):
+        print(f"Preparando fotogramas de {ruta_video} para {ancho_ventana}x{alto_ventana}...")
+        hornear_video(ruta_video, ruta_cache, ancho_ventana, alto_ventana, duracion)
+    return abrir_cache(ruta_cache)
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import threading
+
+from PIL import Image, ImageTk
+
+from manifiestoRecursos import DURACION_POR_DEFECTO
+from metricas import metricas
+
+# Los navegadores tratan las duraciones menores a DURACION_MINIMA como DURACION_CORTA;
+# se imita ese comportamiento (en milisegundos)
+DURACION_MINIMA = 20
+DURACION_CORTA = 100
+
+
+class FotogramasGif:
+    """Secuencia perezosa de fotogramas de un GIF redimensionados para Tkinter
+
+    El primer fotograma se decodifica al pedirlo; el resto lo decodifica un hilo de fondo la
+    primera vez que se pide uno posterior. El hilo solo produce imágenes de PIL; los PhotoImage
+    se crean en el hilo de Tkinter al pedir cada fotograma.
+    """
+
+    def __init__(self, ruta, tamano=(133, 266), remuestreo=Image.Resampling.LANCZOS, directorio_cache=None):
+        self.ruta = ruta
+        self.tamano = tuple(tamano)
+        self.remuestreo = remuestreo
+        self.directorio_cache = directorio_cache
+
+        # Fotogramas decodificados (PIL) y sus duraciones, en orden
+        self._imagenes = []
+        self._duraciones = []
+        # PhotoImage creados en el hilo de Tkinter, por índice
+        self._fotos = {}
+        self._completo = False
+        self._error = None
+        self._hilo = None
+        self._condicion = threading.Condition()
+
+    # --- Decodificación ---
+
+    def _redimensionar(self, gif_imagen):
+        with metricas.medir("gif.decodificar"):
+            imagen = gif_imagen.convert("RGBA")
+        # Las variantes de optimizarRecursos.py ya vienen al tamaño pedido
+        if imagen.size == tuple(self.tamano):
+            return imagen
+        with metricas.medir("gif.redimensionar"):
+            return imagen.resize(self.tamano, self.remuestreo)
+
+    @staticmethod
+    def _duracion(gif_imagen):
+        duracion = gif_imagen.info.get("duration") or DURACION_POR_DEFECTO
+        return duracion if duracion >= DURACION_MINIMA else DURACION_CORTA
+
+    def _decodificar_primero(self):
+        """Decodificar solo el fotograma 0, o todos desde la caché en disco si existe"""
+        if self._leer_cache():
+            return
+        try:
+            with Image.open(self.ruta) as gif_imagen:
+                imagen = self._redimensionar(gif_imagen)
+                duracion = self._duracion(gif_imagen)
+                animado = getattr(gif_imagen, "is_animated", False)
+        except Exception as e:
+            print(f"Error al cargar fotogramas de {self.ruta}: {e}")
+            imagen = Image.new("RGBA", self.tamano)
+            duracion = DURACION_POR_DEFECTO
+            animado = False
+        with self._condicion:
+            if not self._imagenes:
+                self._imagenes.append(imagen)
+                self._duraciones.append(duracion)
+            if not animado:
+                self._completo = True
+            self._condicion.notify_all()
+
+    def _decodificar_resto(self):
+        """Hilo de fondo: decodificar los fotogramas que faltan"""
+        try:
+            with Image.open(self.ruta) as gif_imagen:
+                indice = 0
+                while True:
+                    with self._condicion:
+                        ya_decodificado = indice < len(self._imagenes)
+                    if not ya_decodificado:
+                        imagen = self._redimensionar(gif_imagen)
+                        duracion = self._duracion(gif_imagen)
+                        with self._condicion:
+                            self._imagenes.append(imagen)
+                            self._duraciones.append(duracion)
+                            self._condicion.notify_all()
+                    indice += 1
+                    try:
+                        gif_imagen.seek(indice)
+                    except EOFError:
+                        break
+        except Exception as e:
+            print(f"Error al cargar fotogramas de {self.ruta}: {e}")
+            self._error = e
+        with self._condicion:
+            self._completo = True
+            self._condicion.notify_all()
+        if self._error is None:
+            self._escribir_cache()
+
+    def _asegurar_primero(self):
+        with self._condicion:
+            if self._imagenes or self._completo:
+                return
+        self._decodificar_primero()
+
+    def _asegurar_hilo(self):
+        with self._condicion:
+            if self._completo or self._hilo is not None:
+                return
+            self._hilo = threading.Thread(target=self._decodificar_resto, daemon=True,
+                                          name=f"fotogramas-{os.path.basename(self.ruta)}")
+        self._hilo.start()
+
+    def _imagen(self, indice):
+        """Imagen de PIL del fotograma, esperando al hilo si todavía no está lista"""
+        self._asegurar_primero()
+        if indice == 0:
+            return self._imagenes[0]
+        self._asegurar_hilo()
+        with self._condicion:
+            self._condicion.wait_for(lambda: indice < len(self._imagenes) or self._completo)
+            if indice >= len(self._imagenes):
+                raise IndexError(indice)
+            return self._imagenes[indice]
+
+    # --- Interfaz de secuencia usada por la ventana ---
+
+    def __getitem__(self, indice):
+        """PhotoImage del fotograma indicado (llamar desde el hilo de Tkinter)"""
+        foto = self._fotos.get(indice)
+        if foto is None:
+            imagen = self._imagen(indice)
+            with metricas.medir("gif.photoimage"):
+                foto = ImageTk.PhotoImage(imagen)
+            self._fotos[indice] = foto
+        return foto
+
+    @property
+    def animado(self):
+        """True si el GIF tiene más de un fotograma"""
+        self._asegurar_primero()
+        with self._condicion:
+            return len(self._imagenes) > 1 or not self._completo
+
+    def duracion(self, indice):
+        """Duración en milisegundos del fotograma indicado, según el propio GIF"""
+        self._imagen(indice)
+        return self._duraciones[indice]
+
+    def siguiente(self, indice):
+        """Índice del próximo fotograma ya decodificado, sin bloquear el hilo de Tkinter
+
+        Si el siguiente todavía se está decodificando se repite el actual; al llegar al
+        final se vuelve al primero.
+        """
+        self._asegurar_hilo()
+        with self._condicion:
+            if indice + 1 < len(self._imagenes):
+                return indice + 1
+            return 0 if self._completo else indice
+
+    def __len__(self):
+        """Número de fotogramas (espera a que termine la decodificación)"""
+        self._asegurar_primero()
+        self._asegurar_hilo()
+        with self._condicion:
+            self._condicion.wait_for(lambda: self._completo)
+            return len(self._imagenes)
+
+    # --- Caché en disco de fotogramas ya redimensionados ---
+
+    def _ruta_cache(self):
+        if self.directorio_cache is None:
+            return None
+        try:
+            estado = os.stat(self.ruta)
+        except OSError:
+            return None
+        firma = f"{os.path.abspath(self.ruta)}|{estado.st_size}|{estado.st_mtime_ns}|{self.tamano}|{int(self.remuestreo)}"
+        nombre = hashlib.sha1(firma.encode("utf-8")).hexdigest()
+        return os.path.join(self.directorio_cache, f"{nombre}.fotogramas")
+
+    def _leer_cache(self):
+        """Cargar todos los fotogramas desde la caché en disco; False si no hay caché válida"""
+        ruta_cache = self._ruta_cache()
+        if ruta_cache is None or not os.path.exists(ruta_cache):
+            return False
+        try:
+            with open(ruta_cache, "rb") as archivo:
+                cabecera = json.loads(archivo.readline())
+                ancho, alto = cabecera["tamano"]
+                bytes_por_fotograma = ancho * alto * 4
+                imagenes = []
+                for _ in cabecera["duraciones"]:
+                    datos = archivo.read(bytes_por_fotograma)
+                    if len(datos) != bytes_por_fotograma:
+                        return False
+                    imagenes.append(Image.frombytes("RGBA", (ancho, alto), datos))
+        except (OSError, ValueError, KeyError):
+            return False
+        with self._condicion:
+            self._imagenes[:] = imagenes
+            self._duraciones[:] = cabecera["duraciones"]
+            self._completo = True
+            self._condicion.notify_all()
+        return True
+
+    def _escribir_cache(self):
+        """Guardar los fotogramas redimensionados para que los próximos inicios no usen LANCZOS"""
+        ruta_cache = self._ruta_cache()
+        if ruta_cache is None:
+            return
+        try:
+            os.makedirs(self.directorio_cache, exist_ok=True)
+            temporal = f"{ruta_cache}.{os.getpid()}.tmp"
+            with open(temporal, "wb") as archivo:
+                cabecera = {"tamano": list(self.tamano), "duraciones": self._duraciones}
+                archivo.write(json.dumps(cabecera).encode("utf-8") + b"\n")
+                for imagen in self._imagenes:
+                    archivo.write(imagen.tobytes())
+            os.replace(temporal, ruta_cache)
+        except OSError as e:
+            print(f"No se pudo guardar la caché de {self.ruta}: {e}")
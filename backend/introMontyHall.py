@@ -1,73 +1,264 @@
+import queue
+import threading
+import time
+
 import cv2
+import numpy as np
 import pygame
-import time
 
-def reproducir_video(ruta_video, ruta_audio, ancho_ventana=800, alto_ventana=600, duracion=20):
-    # Inicializa pygame para audio
-    pygame.mixer.init()
+from cacheIntro import cargar_o_hornear, geometria_letterbox
+from metricas import metricas
 
-    # Reproduce el archivo de audio
-    pygame.mixer.music.load(ruta_audio)
-    pygame.mixer.music.play(loops=0, start=0.0)  # Reproducir desde el inicio
+# Fotogramas decodificados que pueden esperar en la cola antes de mostrarse
+TAMANO_COLA = 8
+# FPS usados si el contenedor del video no los declara
+FPS_POR_DEFECTO = 30
 
-    # Abre el video
-    cap = cv2.VideoCapture(ruta_video)
 
-    if not cap.isOpened():
-        print(f"Error: No se puede abrir el video en {ruta_video}")
-        return
+class EstadisticasReproduccion:
+    """Resumen de una reproducción: fotogramas mostrados, descartados y desfase audio/video"""
 
-    # Configura la ventana de OpenCV
-    cv2.namedWindow('Video y Audio', cv2.WINDOW_NORMAL)
-    cv2.resizeWindow('Video y Audio', ancho_ventana, alto_ventana)
+    def __init__(self):
+        self.mostrados = 0
+        self.descartados = 0
+        # Diferencia (video - audio) en segundos al mostrar el último fotograma
+        self.desfase = 0.0
+        self._ultimo = None
 
-    # Fotogramas por segundo del video
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    total_frames = int(fps * duracion)  # Total de frames a mostrar
+    def fotograma_mostrado(self, desfase):
+        """Contar un fotograma en pantalla; con métricas, registrar su intervalo y desfase"""
+        self.mostrados += 1
+        self.desfase = desfase
+        if metricas.activo:
+            ahora = time.perf_counter()
+            if self._ultimo is not None:
+                # La dispersión de este intervalo es el jitter de fotogramas
+                metricas.registrar("video.intervalo", ahora - self._ultimo)
+            self._ultimo = ahora
+            metricas.registrar("video.desfase_av", abs(desfase))
+
+    def __repr__(self):
+        return (f"EstadisticasReproduccion(mostrados={self.mostrados}, descartados={self.descartados}, "
+                f"desfase={self.desfase * 1000:.1f} ms)")
 
-    start_time = time.time()  # Tiempo de inicio
 
+def _decodificar(cap, total_frames, ancho_ventana, alto_ventana, cola, libres, detener):
+    """Hilo de decodificación: lee, redimensiona y centra cada fotograma en un lienzo reutilizado"""
+    geometria = None
     for frame_idx in range(total_frames):
-        ret, frame = cap.read()
+        if detener.is_set():
+            break
+        with metricas.medir("video.leer"):
+            ret, frame = cap.read()
         if not ret:
             print("Fin del video antes de tiempo.")
             break
 
-        # Redimensiona el frame para que se ajuste a las dimensiones deseadas
-        frame_alto, frame_ancho, _ = frame.shape
-        escala_x = ancho_ventana / frame_ancho
-        escala_y = alto_ventana / frame_alto
-        escala = min(escala_x, escala_y)
-
-        nuevo_ancho = int(frame_ancho * escala)
-        nuevo_alto = int(frame_alto * escala)
-        frame_redimensionado = cv2.resize(frame, (nuevo_ancho, nuevo_alto))
-
-        # Crear un lienzo negro para centrar el video
-        lienzo = cv2.copyMakeBorder(
-            frame_redimensionado,
-            top=(alto_ventana - nuevo_alto) // 2,
-            bottom=(alto_ventana - nuevo_alto) // 2,
-            left=(ancho_ventana - nuevo_ancho) // 2,
-            right=(ancho_ventana - nuevo_ancho) // 2,
-            borderType=cv2.BORDER_CONSTANT,
-            value=(0, 0, 0)  # Negro
-        )
-
-        # Muestra el video
+        if geometria is None:
+            frame_alto, frame_ancho = frame.shape[:2]
+            geometria = geometria_letterbox(frame_ancho, frame_alto, ancho_ventana, alto_ventana)
+        nuevo_ancho, nuevo_alto, x0, y0 = geometria
+
+        # Los bordes negros del lienzo nunca se tocan, solo se escribe la zona central
+        lienzo = libres.get()
+        with metricas.medir("video.redimensionar"):
+            reducido = cv2.resize(frame, (nuevo_ancho, nuevo_alto))
+        with metricas.medir("video.borde"):
+            lienzo[y0:y0 + nuevo_alto, x0:x0 + nuevo_ancho] = reducido
+
+        while not detener.is_set():
+            try:
+                cola.put((frame_idx, lienzo), timeout=0.1)
+                break
+            except queue.Full:
+                pass
+    cola.put(None)
+
+
+def _mostrar(lienzo):
+    with metricas.medir("video.imshow"):
         cv2.imshow('Video y Audio', lienzo)
 
-        # Controla el tiempo para mantener la sincronización
-        elapsed_time = time.time() - start_time
-        tiempo_por_frame = 1 / fps
-        sleep_time = max(0, tiempo_por_frame - elapsed_time % tiempo_por_frame)
-        time.sleep(sleep_time)
 
-        # Permite cerrar la ventana con la tecla 'q'
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+def _esperar_tecla(espera_ms):
+    """cv2.waitKey registrando cuánto se pasó del tiempo pedido"""
+    if not metricas.activo:
+        return cv2.waitKey(espera_ms)
+    inicio = time.perf_counter()
+    tecla = cv2.waitKey(espera_ms)
+    metricas.registrar("video.exceso_espera", time.perf_counter() - inicio - espera_ms / 1000)
+    return tecla
+
+
+def _iniciar_audio(ruta_audio):
+    """Reproducir el audio y devolver el reloj de reproducción en segundos"""
+    pygame.mixer.music.load(ruta_audio)
+    pygame.mixer.music.play(loops=0, start=0.0)  # Reproducir desde el inicio
+    inicio = time.perf_counter()
+
+    def reloj():
+        """Posición actual del audio en segundos; reloj de pared si el audio ya no suena"""
+        posicion = pygame.mixer.music.get_pos()
+        if posicion < 0:
+            return time.perf_counter() - inicio
+        return posicion / 1000
+
+    return reloj
+
+
+def _reproducir_desde_cache(fotogramas, fps, total_frames, ancho_ventana, alto_ventana, ruta_audio, estadisticas):
+    """Mostrar fotogramas horneados: el índice sale directamente del reloj de audio"""
+    total_frames = min(total_frames, len(fotogramas))
+    # La caché guarda solo la zona del video: se copia al centro de un lienzo negro del tamaño
+    # de la ventana, así OpenCV no lo estira y las barras nunca se vuelven a escribir
+    lienzo = np.zeros((alto_ventana, ancho_ventana, 3), dtype=np.uint8)
+    alto_guardado, ancho_guardado = fotogramas.shape[1:3]
+    nuevo_ancho, nuevo_alto, x0, y0 = geometria_letterbox(ancho_guardado, alto_guardado, ancho_ventana, alto_ventana)
+    zona = lienzo[y0:y0 + nuevo_alto, x0:x0 + nuevo_ancho]
+    escalar = (nuevo_ancho, nuevo_alto) != (ancho_guardado, alto_guardado)
+    reloj = _iniciar_audio(ruta_audio)
+    anterior = -1
+
+    while True:
+        frame_idx = int(reloj() * fps)
+        if frame_idx >= total_frames:
+            break
+        if frame_idx <= anterior:
+            # El audio aún no llega al siguiente fotograma: esperar sin adelantarlo
+            espera_ms = int(((anterior + 1) / fps - reloj()) * 1000)
+            if _esperar_tecla(max(1, espera_ms)) & 0xFF == ord('q'):
+                break
+            continue
+        # Los fotogramas saltados por ir detrás del audio cuentan como descartados
+        estadisticas.descartados += max(0, frame_idx - anterior - 1)
+
+        # Vista sin copia sobre el archivo mapeado en memoria; solo se agranda si se horneó reducida
+        fotograma = fotogramas[frame_idx]
+        with metricas.medir("video.borde"):
+            zona[...] = cv2.resize(fotograma, (nuevo_ancho, nuevo_alto)) if escalar else fotograma
+        _mostrar(lienzo)
+        estadisticas.fotograma_mostrado(frame_idx / fps - reloj())
+        anterior = frame_idx
+
+        # Esperar hasta el siguiente fotograma atendiendo eventos; 'q' cierra la ventana
+        espera_ms = int(((frame_idx + 1) / fps - reloj()) * 1000)
+        if _esperar_tecla(max(1, espera_ms)) & 0xFF == ord('q'):
             break
 
+
+def _reproducir_decodificando(cap, total_frames, tiempo_por_frame, ancho_ventana, alto_ventana, ruta_audio,
+                              estadisticas):
+    """Decodificar en un hilo y mostrar al ritmo del audio, descartando fotogramas atrasados"""
+    # Lienzos negros preasignados una sola vez y reciclados entre el decodificador y la pantalla
+    libres = queue.Queue()
+    for _ in range(TAMANO_COLA + 2):
+        libres.put(np.zeros((alto_ventana, ancho_ventana, 3), dtype=np.uint8))
+    cola = queue.Queue(maxsize=TAMANO_COLA)
+    detener = threading.Event()
+
+    decodificador = threading.Thread(
+        target=_decodificar,
+        args=(cap, total_frames, ancho_ventana, alto_ventana, cola, libres, detener),
+        daemon=True,
+    )
+    decodificador.start()
+
+    # Esperar el primer fotograma antes de arrancar el audio para que ambos empiecen juntos
+    siguiente = cola.get()
+    reloj = _iniciar_audio(ruta_audio)
+    mostrado = None
+
+    while siguiente is not None:
+        frame_idx, lienzo = siguiente
+        tiempo_frame = frame_idx * tiempo_por_frame
+        ahora = reloj()
+
+        if tiempo_frame + tiempo_por_frame < ahora:
+            # El fotograma llegó tarde respecto al audio: se descarta sin mostrarlo
+            estadisticas.descartados += 1
+            libres.put(lienzo)
+        else:
+            # Esperar hasta que el audio alcance el fotograma, atendiendo eventos de la ventana
+            espera_ms = int((tiempo_frame - ahora) * 1000)
+            tecla = _esperar_tecla(max(1, espera_ms)) & 0xFF
+
+            # Muestra el video
+            _mostrar(lienzo)
+            estadisticas.fotograma_mostrado(tiempo_frame - reloj())
+
+            # El lienzo anterior ya no está en pantalla, vuelve a estar disponible
+            if mostrado is not None:
+                libres.put(mostrado)
+            mostrado = lienzo
+
+            # Permite cerrar la ventana con la tecla 'q'
+            if tecla == ord('q') or cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+        siguiente = cola.get()
+
+    # Detener el decodificador y liberar lo que haya quedado en la cola
+    detener.set()
+    while decodificador.is_alive():
+        try:
+            if cola.get(timeout=0.1) is None:
+                break
+        except queue.Empty:
+            pass
+        if libres.empty():
+            libres.put(np.zeros((alto_ventana, ancho_ventana, 3), dtype=np.uint8))
+    decodificador.join()
+
+
+def reproducir_video(ruta_video, ruta_audio, ancho_ventana=800, alto_ventana=600, duracion=20, ruta_cache=None):
+    """Reproducir el video de introducción sincronizado con su audio
+
+    Si se indica ruta_cache, los primeros `duracion` segundos se hornean una vez al tamaño que
+    ocupan en la ventana (o menores, si no caben en el tope de cacheIntro) y las siguientes
+    reproducciones solo leen el archivo mapeado en memoria.
+    """
+    # Inicializa pygame para audio
+    pygame.mixer.init()
+
+    fotogramas = None
+    cap = None
+    if ruta_cache is not None:
+        try:
+            fps, fotogramas = cargar_o_hornear(ruta_video, ruta_cache, ancho_ventana, alto_ventana, duracion)
+        except (OSError, ValueError) as e:
+            print(f"No se pudo usar la caché de fotogramas ({e}), se decodificará el video")
+
+    if fotogramas is None:
+        # Abre el video
+        cap = cv2.VideoCapture(ruta_video)
+
+        if not cap.isOpened():
+            print(f"Error: No se puede abrir el video en {ruta_video}")
+            return None
+
+        # Fotogramas por segundo del video
+        fps = cap.get(cv2.CAP_PROP_FPS) or FPS_POR_DEFECTO
+
+    fps = fps or FPS_POR_DEFECTO
+    total_frames = int(fps * duracion)  # Total de frames a mostrar
+
+    # Configura la ventana de OpenCV
+    cv2.namedWindow('Video y Audio', cv2.WINDOW_NORMAL)
+    cv2.resizeWindow('Video y Audio', ancho_ventana, alto_ventana)
+
+    estadisticas = EstadisticasReproduccion()
+    if fotogramas is not None:
+        _reproducir_desde_cache(fotogramas, fps, total_frames, ancho_ventana, alto_ventana, ruta_audio,
+                                estadisticas)
+    else:
+        _reproducir_decodificando(cap, total_frames, 1 / fps, ancho_ventana, alto_ventana, ruta_audio,
+                                  estadisticas)
+        cap.release()
+
     # Detiene la reproducción del audio y cierra todo
     pygame.mixer.music.stop()
-    cap.release()
     cv2.destroyAllWindows()
+
+    print(f"Reproducción terminada: {estadisticas.descartados} fotogramas descartados, "
+          f"desfase A/V de {estadisticas.desfase * 1000:.1f} ms")
+    return estadisticas
@@ -0,0 +1,41 @@
+import json
+import os
+from functools import lru_cache
+
+# Nombre del manifiesto que genera optimizarRecursos.py dentro del directorio de variantes
+NOMBRE_MANIFIESTO = "manifiesto.json"
+DIRECTORIO_VARIANTES = "optimizados"
+# Duración de un fotograma de GIF que no la declara (en milisegundos); la usan tanto la
+# ventana al animar como optimizarRecursos.py al reescribir los GIF, para que vayan al mismo ritmo
+DURACION_POR_DEFECTO = 300
+
+
+@lru_cache(maxsize=None)
+def cargar_manifiesto(directorio_recursos):
+    """Leer el manifiesto de variantes; diccionario vacío si todavía no se generó"""
+    ruta = os.path.join(directorio_recursos, DIRECTORIO_VARIANTES, NOMBRE_MANIFIESTO)
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            return json.load(archivo).get("recursos", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def ruta_variante(directorio_recursos, nombre, tamano, ajuste="estirar", formatos=("png", "jpeg", "gif"),
+                  respaldo=None):
+    """Ruta del archivo ya redimensionado para un recurso lógico
+
+    Busca en el manifiesto una variante con ese tamaño y ajuste en alguno de los formatos
+    (en orden de preferencia). Si no hay, devuelve respaldo, normalmente el archivo original.
+    """
+    recurso = cargar_manifiesto(directorio_recursos).get(nombre)
+    if recurso is None:
+        return respaldo
+    for formato in formatos:
+        for variante in recurso["variantes"]:
+            if (variante["formato"] == formato and variante["ajuste"] == ajuste
+                    and tuple(variante["tamano"]) == tuple(tamano)):
+                ruta = os.path.join(directorio_recursos, DIRECTORIO_VARIANTES, variante["archivo"])
+                if os.path.exists(ruta):
+                    return ruta
+    return respaldo
@@ -0,0 +1,201 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# MONTYHALL_METRICAS=1 muestra las métricas al salir; con una ruta las guarda ahí en JSON
+VARIABLE_ENTORNO = "MONTYHALL_METRICAS"
+# Subdivisiones de cada potencia de dos del histograma: error relativo menor al 13%
+SUBDIVISIONES = 8
+
+
+class Histograma:
+    """Histograma log-lineal de duraciones en microsegundos
+
+    Cada potencia de dos se parte en SUBDIVISIONES cubetas iguales; registrar un valor es
+    una cuenta de enteros y un incremento, sin ordenar ni guardar las muestras.
+    """
+
+    __slots__ = ("cubetas", "cantidad", "total", "minimo", "maximo")
+
+    def __init__(self):
+        self.cubetas = {}
+        self.cantidad = 0
+        self.total = 0.0
+        self.minimo = None
+        self.maximo = None
+
+    @staticmethod
+    def _cubeta(microsegundos):
+        valor = int(microsegundos)
+        if valor < SUBDIVISIONES * 2:
+            return valor
+        # Los bits altos del valor: la potencia de dos y la subdivisión dentro de ella
+        bits = valor.bit_length() - SUBDIVISIONES.bit_length()
+        return bits * SUBDIVISIONES + (valor >> bits)
+
+    @staticmethod
+    def _limite(cubeta):
+        """Valor más alto (en µs) que cae en la cubeta"""
+        if cubeta < SUBDIVISIONES * 2:
+            return cubeta
+        bits, resto = divmod(cubeta, SUBDIVISIONES)
+        return ((resto + SUBDIVISIONES + 1) << (bits - 1)) - 1
+
+    def registrar(self, segundos):
+        microsegundos = segundos * 1e6
+        if microsegundos < 0:
+            microsegundos = 0.0
+        cubeta = self._cubeta(microsegundos)
+        self.cubetas[cubeta] = self.cubetas.get(cubeta, 0) + 1
+        self.cantidad += 1
+        self.total += microsegundos
+        if self.minimo is None or microsegundos < self.minimo:
+            self.minimo = microsegundos
+        if self.maximo is None or microsegundos > self.maximo:
+            self.maximo = microsegundos
+
+    def percentil(self, porcentaje):
+        """Cota superior del percentil, en µs"""
+        if not self.cantidad:
+            return 0.0
+        objetivo = self.cantidad * porcentaje / 100
+        acumulado = 0
+        for cubeta in sorted(self.cubetas):
+            acumulado += self.cubetas[cubeta]
+            if acumulado >= objetivo:
+                return min(float(self._limite(cubeta)), self.maximo)
+        return self.maximo
+
+    def como_dict(self):
+        return {
+            "cantidad": self.cantidad,
+            "media_us": self.total / self.cantidad if self.cantidad else 0.0,
+            "min_us": self.minimo or 0.0,
+            "p50_us": self.percentil(50),
+            "p90_us": self.percentil(90),
+            "p99_us": self.percentil(99),
+            "max_us": self.maximo or 0.0,
+        }
+
+
+class _Cronometro:
+    __slots__ = ("metricas", "nombre", "inicio")
+
+    def __init__(self, metricas, nombre):
+        self.metricas = metricas
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metricas.registrar(self.nombre, time.perf_counter() - self.inicio)
+
+
+class _SinMedir:
+    """Contexto vacío que se devuelve cuando las métricas están apagadas"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+_SIN_MEDIR = _SinMedir()
+
+
+class Metricas:
+    """Contadores e histogramas de tiempos de los caminos calientes de la interfaz
+
+    Apagadas, cada gancho cuesta una comparación; encendidas, una llamada a perf_counter y
+    un incremento en el histograma. Los hilos de decodificación registran junto con el de
+    Tkinter, así que las escrituras van bajo un candado.
+    """
+
+    def __init__(self, activo=False):
+        self.activo = activo
+        self.contadores = {}
+        self.histogramas = {}
+        self._candado = threading.Lock()
+
+    def activar(self, activo=True):
+        self.activo = activo
+
+    def reiniciar(self):
+        with self._candado:
+            self.contadores.clear()
+            self.histogramas.clear()
+
+    def contar(self, nombre, cantidad=1):
+        if not self.activo:
+            return
+        with self._candado:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    def registrar(self, nombre, segundos):
+        """Agregar una duración (en segundos) al histograma del nombre"""
+        if not self.activo:
+            return
+        with self._candado:
+            histograma = self.histogramas.get(nombre)
+            if histograma is None:
+                histograma = self.histogramas[nombre] = Histograma()
+            histograma.registrar(segundos)
+
+    def medir(self, nombre):
+        """Contexto que registra lo que tarda el bloque: `with metricas.medir("x"): ...`"""
+        if not self.activo:
+            return _SIN_MEDIR
+        return _Cronometro(self, nombre)
+
+    def cronometrar(self, nombre):
+        """Decorador que registra lo que tarda cada llamada a la función"""
+        def decorador(funcion):
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                if not self.activo:
+                    return funcion(*args, **kwargs)
+                inicio = time.perf_counter()
+                try:
+                    return funcion(*args, **kwargs)
+                finally:
+                    self.registrar(nombre, time.perf_counter() - inicio)
+            return envoltura
+        return decorador
+
+    def como_dict(self):
+        with self._candado:
+            return {
+                "contadores": dict(sorted(self.contadores.items())),
+                "histogramas": {nombre: histograma.como_dict()
+                                for nombre, histograma in sorted(self.histogramas.items())},
+            }
+
+    def volcar(self, ruta=None):
+        """Escribir las métricas en JSON en la ruta, o en stderr si no se indica"""
+        texto = json.dumps(self.como_dict(), indent=2, ensure_ascii=False)
+        if ruta is None:
+            print(texto, file=sys.stderr)
+            return
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write(texto + "\n")
+
+
+def _desde_entorno():
+    valor = os.environ.get(VARIABLE_ENTORNO, "")
+    resultado = Metricas(activo=bool(valor) and valor != "0")
+    if resultado.activo:
+        atexit.register(resultado.volcar, None if valor == "1" else valor)
+    return resultado
+
+
+# Métricas únicas para todo el proceso
+metricas = _desde_entorno()
@@ -0,0 +1,143 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from statistics import NormalDist
+
+import numpy as np
+
+from simulacionMontyHall import jugar_lote
+
+# Partidas por bloque: cada bloque es la unidad de trabajo que recibe un proceso
+TAMANO_BLOQUE = 1 << 20
+
+
+def _jugar_bloque(semilla, indice, n_juegos):
+    """Jugar un bloque con su propio flujo aleatorio y devolver las victorias de mantener
+
+    El flujo depende solo de la semilla y del índice del bloque, nunca del proceso que lo
+    ejecuta, por eso el resultado no cambia con el número de procesos.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(semilla, spawn_key=(indice,)))
+    gana = jugar_lote(rng, n_juegos, 'mantener')[4]
+    return indice, n_juegos, int(np.count_nonzero(gana))
+
+
+def intervalo_confianza(ganadas, partidas, z):
+    """Intervalo de Wilson para la tasa de victorias"""
+    if partidas == 0:
+        return 0.0, 1.0
+    p = ganadas / partidas
+    denominador = 1 + z * z / partidas
+    centro = (p + z * z / (2 * partidas)) / denominador
+    radio = z * ((p * (1 - p) / partidas + z * z / (4 * partidas * partidas)) ** 0.5) / denominador
+    return centro - radio, centro + radio
+
+
+class ResultadoMonteCarlo:
+    """Conteos combinados de una corrida Monte Carlo de mantener contra cambiar"""
+
+    def __init__(self, partidas, ganadas_mantener, bloques, segundos, confianza, detenido_por_precision):
+        self.partidas = partidas
+        self.ganadas_mantener = ganadas_mantener
+        # Con tres puertas, cambiar gana exactamente cuando mantener pierde
+        self.ganadas_cambiar = partidas - ganadas_mantener
+        self.bloques = bloques
+        self.segundos = segundos
+        self.confianza = confianza
+        self.detenido_por_precision = detenido_por_precision
+
+        z = NormalDist().inv_cdf(0.5 + confianza / 2)
+        self.intervalo_mantener = intervalo_confianza(self.ganadas_mantener, partidas, z)
+        self.intervalo_cambiar = intervalo_confianza(self.ganadas_cambiar, partidas, z)
+
+    @property
+    def tasa_mantener(self):
+        return self.ganadas_mantener / self.partidas if self.partidas else 0.0
+
+    @property
+    def tasa_cambiar(self):
+        return self.ganadas_cambiar / self.partidas if self.partidas else 0.0
+
+    @property
+    def partidas_por_segundo(self):
+        return self.partidas / self.segundos if self.segundos > 0 else float('inf')
+
+    def __repr__(self):
+        return (f"ResultadoMonteCarlo(partidas={self.partidas}, bloques={self.bloques}, "
+                f"mantener={self.tasa_mantener:.5f} [{self.intervalo_mantener[0]:.5f}, "
+                f"{self.intervalo_mantener[1]:.5f}], cambiar={self.tasa_cambiar:.5f} "
+                f"[{self.intervalo_cambiar[0]:.5f}, {self.intervalo_cambiar[1]:.5f}], "
+                f"detenido_por_precision={self.detenido_por_precision}, "
+                f"partidas_por_segundo={self.partidas_por_segundo:,.0f})")
+
+
+def ejecutar(ancho_intervalo=0.001, confianza=0.95, semilla=0, max_partidas=10 ** 10,
+             procesos=None, tamano_bloque=TAMANO_BLOQUE):
+    """Repartir la simulación entre procesos hasta que el intervalo sea más angosto que ancho_intervalo
+
+    Los bloques se combinan en orden de índice aunque lleguen desordenados, y la condición de
+    parada se evalúa después de cada bloque combinado. Así, con la misma semilla, el resultado
+    es idéntico bit a bit sin importar cuántos procesos se usen.
+    """
+    if not 0 < confianza < 1:
+        raise ValueError("La confianza debe estar entre 0 y 1")
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+
+    inicio = time.perf_counter()
+    partidas = 0
+    ganadas_mantener = 0
+    bloques = 0
+    detenido = False
+
+    # Bloques terminados que aún esperan a que se combinen los anteriores
+    pendientes = {}
+    siguiente_envio = 0
+    enviadas = 0
+
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        en_curso = set()
+
+        def enviar():
+            nonlocal siguiente_envio, enviadas
+            # Mantener unos pocos bloques por proceso en vuelo para no dejar núcleos ociosos
+            while len(en_curso) < 2 * procesos and enviadas < max_partidas:
+                n = min(tamano_bloque, max_partidas - enviadas)
+                en_curso.add(ejecutor.submit(_jugar_bloque, semilla, siguiente_envio, n))
+                siguiente_envio += 1
+                enviadas += n
+
+        enviar()
+        while en_curso and not detenido:
+            hechos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in hechos:
+                en_curso.discard(futuro)
+                indice, n, ganadas = futuro.result()
+                pendientes[indice] = (n, ganadas)
+
+            # Combinar en orden los bloques contiguos disponibles
+            while bloques in pendientes:
+                n, ganadas = pendientes.pop(bloques)
+                partidas += n
+                ganadas_mantener += ganadas
+                bloques += 1
+
+                bajo, alto = intervalo_confianza(ganadas_mantener, partidas, z)
+                # El intervalo de cambiar es el reflejo del de mantener, tiene el mismo ancho
+                if alto - bajo < ancho_intervalo:
+                    detenido = True
+                    break
+
+            if not detenido:
+                enviar()
+
+        for futuro in en_curso:
+            futuro.cancel()
+
+    segundos = time.perf_counter() - inicio
+    return ResultadoMonteCarlo(partidas, ganadas_mantener, bloques, segundos, confianza, detenido)
+
+
+if __name__ == "__main__":
+    print(ejecutar(ancho_intervalo=0.0005))
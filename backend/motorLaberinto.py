@@ -0,0 +1,429 @@
+import random
+import struct
+import time
+from array import array
+
+import numpy as np
+
+# Cada celda guarda en 2 bits qué paredes propias están abiertas; las de oeste y norte
+# son las de este y sur de la celda vecina
+ABIERTO_ESTE = 1
+ABIERTO_SUR = 2
+
+# Códigos de la cuadrícula expandida que usa laberinto.html
+CAMINO = 0
+PARED = 1
+INICIO = 2
+META = 3
+
+# Formato binario: cabecera y después 2 bits por celda (4 celdas por byte); con pistas,
+# otros 2 bits por celda con la dirección que acerca a la meta
+MAGICO = b"LAB1"
+VERSION_FORMATO = 1
+CABECERA = struct.Struct("<4sBBHIIII")
+CON_PISTAS = 1
+
+# Direcciones de las pistas, en el orden de los 2 bits: este, oeste, sur, norte. El bit
+# 1 << índice de la máscara de movimientos dice si se puede ir en esa dirección
+DIRECCIONES = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+# Con fronteras más chicas el BFS avanza en Python: en pasillos largos el costo fijo de
+# cada operación de NumPy supera al del bucle
+FRONTERA_MINIMA_VECTORIZADA = 32
+
+
+class Laberinto:
+    """Laberinto de filas x columnas celdas sobre un arreglo uint8 de paredes abiertas"""
+
+    def __init__(self, abiertos, inicio=None, meta=None, distancias=None):
+        self.abiertos = np.ascontiguousarray(abiertos, dtype=np.uint8)
+        self.filas, self.columnas = self.abiertos.shape
+        self.inicio = inicio if inicio is not None else (0, 0)
+        self.meta = meta if meta is not None else (self.filas - 1, self.columnas - 1)
+        # Campo de distancias a la meta si el generador ya lo conoce (el backtracker)
+        self._distancias = distancias
+        self._movimientos = None
+
+    def __repr__(self):
+        return f"Laberinto({self.filas}x{self.columnas}, inicio={self.inicio}, meta={self.meta})"
+
+    def puede_mover(self, fila, columna, df, dc):
+        """Si se puede pasar de la celda a su vecina en la dirección (df, dc)"""
+        if (df, dc) == (0, 1):
+            return columna + 1 < self.columnas and bool(self.abiertos[fila, columna] & ABIERTO_ESTE)
+        if (df, dc) == (0, -1):
+            return columna > 0 and bool(self.abiertos[fila, columna - 1] & ABIERTO_ESTE)
+        if (df, dc) == (1, 0):
+            return fila + 1 < self.filas and bool(self.abiertos[fila, columna] & ABIERTO_SUR)
+        if (df, dc) == (-1, 0):
+            return fila > 0 and bool(self.abiertos[fila - 1, columna] & ABIERTO_SUR)
+        return False
+
+    # --- Distancias ---
+
+    def _mascara_movimientos(self):
+        """Máscara plana uint8: bit 1 << i si la celda puede ir en DIRECCIONES[i]
+
+        Se calcula una vez y la comparten el BFS y las pistas.
+        """
+        if self._movimientos is None:
+            este = (self.abiertos & ABIERTO_ESTE).astype(bool)
+            sur = (self.abiertos & ABIERTO_SUR).astype(bool)
+            este[:, -1] = False
+            sur[-1, :] = False
+            movimientos = este.view(np.uint8).copy()
+            movimientos[:, 1:] |= este[:, :-1].view(np.uint8) << 1
+            movimientos |= sur.view(np.uint8) << 2
+            movimientos[1:, :] |= sur[:-1, :].view(np.uint8) << 3
+            self._movimientos = movimientos.ravel()
+        return self._movimientos
+
+    def _tabla_vecinas(self):
+        """Índice plano de la vecina en cada dirección, o filas * columnas si hay pared"""
+        movimientos = self._mascara_movimientos()
+        total = movimientos.size
+        tabla = np.empty((total, 4), dtype=np.int32)
+        celdas = np.arange(total, dtype=np.int32)
+        for indice, desplazamiento in enumerate((1, -1, self.columnas, -self.columnas)):
+            columna = tabla[:, indice]
+            np.add(celdas, desplazamiento, out=columna)
+            columna[(movimientos & (1 << indice)) == 0] = total
+        return tabla
+
+    def campo_distancias(self, desde=None):
+        """Distancia en pasos de cada celda a `desde` (la meta por defecto); -1 si no se llega
+
+        BFS por niveles: cada nivel toma de una tabla las vecinas de toda la frontera con
+        una sola indexación de NumPy. Si la frontera es chica (pasillos) se expande en Python.
+        """
+        fila, columna = self.meta if desde is None else desde
+        total = self.filas * self.columnas
+        movimientos = self._mascara_movimientos()
+        tabla = self._tabla_vecinas()
+        # Una celda extra con distancia 0 recibe los pasos bloqueados por paredes
+        distancias = np.full(total + 1, -1, dtype=np.int32)
+        distancias[total] = 0
+        vista = memoryview(distancias)
+        bytes_movimientos = movimientos.tobytes()
+        desplazamientos = tuple((1 << indice, desplazamiento) for indice, desplazamiento
+                                in enumerate((1, -1, self.columnas, -self.columnas)))
+        marca = np.empty(total + 1, dtype=np.int32)
+
+        origen = fila * self.columnas + columna
+        vista[origen] = 0
+        frontera = [origen]
+        nivel = 0
+        while len(frontera):
+            nivel += 1
+            if len(frontera) < FRONTERA_MINIMA_VECTORIZADA:
+                siguiente = []
+                for celda in (frontera.tolist() if isinstance(frontera, np.ndarray) else frontera):
+                    puede = bytes_movimientos[celda]
+                    for bit, desplazamiento in desplazamientos:
+                        if puede & bit:
+                            vecina = celda + desplazamiento
+                            if vista[vecina] < 0:
+                                vista[vecina] = nivel
+                                siguiente.append(vecina)
+                frontera = siguiente
+            else:
+                candidatas = tabla[frontera].ravel()
+                candidatas = candidatas[distancias[candidatas] < 0]
+                # Con ciclos una celda puede llegar por dos lados en el mismo nivel; las repetidas
+                # se quitan sin ordenar: de cada celda sobrevive la última posición escrita
+                posiciones = np.arange(candidatas.size, dtype=np.int32)
+                marca[candidatas] = posiciones
+                candidatas = candidatas[marca[candidatas] == posiciones]
+                distancias[candidatas] = nivel
+                frontera = candidatas
+        return distancias[:total].reshape(self.filas, self.columnas)
+
+    @property
+    def distancias(self):
+        """Campo de distancias a la meta, calculado una sola vez"""
+        if self._distancias is None:
+            self._distancias = self.campo_distancias()
+        return self._distancias
+
+    def resoluble(self):
+        return bool(self.distancias[self.inicio] >= 0)
+
+    def es_perfecto(self):
+        """Árbol de expansión: todas las celdas conectadas y sin ciclos"""
+        aristas = int(np.count_nonzero(self.abiertos[:, :-1] & ABIERTO_ESTE)
+                      + np.count_nonzero(self.abiertos[:-1, :] & ABIERTO_SUR))
+        return aristas == self.filas * self.columnas - 1 and bool((self.distancias >= 0).all())
+
+    def campo_pistas(self):
+        """Índice en DIRECCIONES del paso que acerca a la meta desde cada celda (0 en la meta)"""
+        distancias = self.distancias
+        movimientos = self._mascara_movimientos().reshape(self.filas, self.columnas)
+        pistas = np.zeros((self.filas, self.columnas), dtype=np.uint8)
+        objetivo = distancias - 1
+        # En orden inverso, para que con dos pasos posibles gane el primero, como en pista()
+        for indice in reversed(range(len(DIRECCIONES))):
+            mascara = (movimientos & (1 << indice)) != 0
+            vecinas = np.full_like(distancias, -2)
+            df, dc = DIRECCIONES[indice]
+            if dc == 1:
+                vecinas[:, :-1] = distancias[:, 1:]
+            elif dc == -1:
+                vecinas[:, 1:] = distancias[:, :-1]
+            elif df == 1:
+                vecinas[:-1, :] = distancias[1:, :]
+            else:
+                vecinas[1:, :] = distancias[:-1, :]
+            pistas[mascara & (vecinas == objetivo) & (distancias > 0)] = indice
+        return pistas
+
+    def pista(self, fila, columna):
+        """Dirección (df, dc) del siguiente paso hacia la meta; None en la meta o sin salida"""
+        distancia = self.distancias[fila, columna]
+        if distancia <= 0:
+            return None
+        for df, dc in DIRECCIONES:
+            if self.puede_mover(fila, columna, df, dc) and self.distancias[fila + df, columna + dc] == distancia - 1:
+                return df, dc
+        return None
+
+    # --- Representaciones ---
+
+    def cuadricula(self):
+        """Cuadrícula de (2*filas+1) x (2*columnas+1) con CAMINO, PARED, INICIO y META"""
+        cuadricula = np.full((2 * self.filas + 1, 2 * self.columnas + 1), PARED, dtype=np.uint8)
+        cuadricula[1::2, 1::2] = CAMINO
+        cuadricula[1::2, 2:-1:2][(self.abiertos[:, :-1] & ABIERTO_ESTE) > 0] = CAMINO
+        cuadricula[2:-1:2, 1::2][(self.abiertos[:-1, :] & ABIERTO_SUR) > 0] = CAMINO
+        cuadricula[2 * self.inicio[0] + 1, 2 * self.inicio[1] + 1] = INICIO
+        cuadricula[2 * self.meta[0] + 1, 2 * self.meta[1] + 1] = META
+        return cuadricula
+
+    def codificar(self, pistas=False):
+        """Bytes del laberinto: cabecera + 2 bits por celda (+ 2 bits de pista por celda)"""
+        banderas = CON_PISTAS if pistas else 0
+        cabecera = CABECERA.pack(MAGICO, VERSION_FORMATO, banderas, 0, self.filas, self.columnas,
+                                 self.inicio[0] * self.columnas + self.inicio[1],
+                                 self.meta[0] * self.columnas + self.meta[1])
+        capas = [_empaquetar_2bits(self.abiertos)]
+        if pistas:
+            capas.append(_empaquetar_2bits(self.campo_pistas()))
+        return cabecera + b"".join(capas)
+
+    @classmethod
+    def decodificar(cls, datos):
+        """Reconstruir un laberinto desde codificar(); las pistas se recalculan si hacen falta"""
+        magico, version, _, _, filas, columnas, inicio, meta = CABECERA.unpack_from(datos)
+        if magico != MAGICO or version != VERSION_FORMATO:
+            raise ValueError("No es un laberinto codificado compatible")
+        total = filas * columnas
+        empaquetado = np.frombuffer(datos, dtype=np.uint8, count=(total + 3) // 4, offset=CABECERA.size)
+        abiertos = _desempaquetar_2bits(empaquetado, total).reshape(filas, columnas)
+        return cls(abiertos, divmod(inicio, columnas), divmod(meta, columnas))
+
+
+def _empaquetar_2bits(valores):
+    plano = valores.ravel().astype(np.uint8)
+    relleno = (-plano.size) % 4
+    if relleno:
+        plano = np.concatenate([plano, np.zeros(relleno, dtype=np.uint8)])
+    grupos = plano.reshape(-1, 4)
+    return (grupos[:, 0] | (grupos[:, 1] << 2) | (grupos[:, 2] << 4) | (grupos[:, 3] << 6)).tobytes()
+
+
+def _desempaquetar_2bits(empaquetado, total):
+    grupos = np.empty((empaquetado.size, 4), dtype=np.uint8)
+    for indice in range(4):
+        grupos[:, indice] = (empaquetado >> (2 * indice)) & 3
+    return grupos.ravel()[:total]
+
+
+# --- Generadores ---
+
+def generar_backtracker(filas, columnas, semilla=None):
+    """Backtracker recursivo (DFS con pila explícita): pasillos largos y pocas bifurcaciones
+
+    Es secuencial por naturaleza, así que recorre un bytearray en Python; sirve para
+    laberintos de juego, pero no escala como generar_kruskal. La búsqueda parte de la meta,
+    así que la altura de la pila al visitar cada celda es su distancia a ella y el campo de
+    distancias sale gratis, sin BFS.
+    """
+    rng = random.Random(semilla)
+    aleatorio = rng.random
+    # Cuadrícula con un borde de celdas ya visitadas: las vecinas no necesitan revisar límites
+    ancho = columnas + 2
+    visitadas = bytearray(b"\1") * ((filas + 2) * ancho)
+    for fila in range(1, filas + 1):
+        visitadas[fila * ancho + 1:fila * ancho + 1 + columnas] = bytes(columnas)
+    abiertos = bytearray(len(visitadas))
+    distancias = array("i", bytes(4 * len(visitadas)))
+    celda = filas * ancho + columnas
+    visitadas[celda] = 1
+    pila = [celda]
+    vecinas = []
+    agregar = vecinas.append
+    while pila:
+        celda = pila[-1]
+        vecinas.clear()
+        if not visitadas[celda + 1]:
+            agregar(celda + 1)
+        if not visitadas[celda - 1]:
+            agregar(celda - 1)
+        if not visitadas[celda + ancho]:
+            agregar(celda + ancho)
+        if not visitadas[celda - ancho]:
+            agregar(celda - ancho)
+        if not vecinas:
+            pila.pop()
+            continue
+        vecina = vecinas[int(aleatorio() * len(vecinas))]
+        diferencia = vecina - celda
+        if diferencia == ancho:
+            abiertos[celda] |= ABIERTO_SUR
+        elif diferencia == -ancho:
+            abiertos[vecina] |= ABIERTO_SUR
+        elif diferencia == 1:
+            abiertos[celda] |= ABIERTO_ESTE
+        else:
+            abiertos[vecina] |= ABIERTO_ESTE
+        visitadas[vecina] = 1
+        distancias[vecina] = len(pila)
+        pila.append(vecina)
+    interior = (slice(1, -1), slice(1, -1))
+    return Laberinto(np.frombuffer(abiertos, dtype=np.uint8).reshape(filas + 2, ancho)[interior].copy(),
+                     distancias=np.frombuffer(distancias, dtype=np.int32).reshape(filas + 2, ancho)[interior].copy())
+
+
+def _paredes_livianas_celdas(pesos, filas, columnas, centinela):
+    """Para cada pared, si es la más liviana de la celda de origen y de la de destino"""
+    n_horizontales = filas * (columnas - 1)
+    horizontales = pesos[:n_horizontales].reshape(filas, columnas - 1)
+    verticales = pesos[n_horizontales:].reshape(filas - 1, columnas)
+    mejor = np.full((filas, columnas), centinela, dtype=pesos.dtype)
+    for vista, paredes in ((mejor[:, :-1], horizontales), (mejor[:, 1:], horizontales),
+                           (mejor[:-1, :], verticales), (mejor[1:, :], verticales)):
+        np.minimum(vista, paredes, out=vista)
+    elige_origen = np.concatenate([(mejor[:, :-1] == horizontales).ravel(), (mejor[:-1, :] == verticales).ravel()])
+    elige_destino = np.concatenate([(mejor[:, 1:] == horizontales).ravel(), (mejor[1:, :] == verticales).ravel()])
+    return elige_origen, elige_destino
+
+
+def generar_kruskal(filas, columnas, semilla=None):
+    """Kruskal aleatorio: las paredes se recorren en orden aleatorio y se abren si unen regiones
+
+    La posición de cada pared en esa permutación es su peso; con pesos distintos el árbol
+    mínimo es único, así que se obtiene el mismo laberinto que con Kruskal secuencial, pero
+    por rondas de Borůvka vectorizadas: cada componente toma su pared más liviana hacia otra
+    y las componentes se unen con un union-find paralelo (enganche y saltos de puntero).
+    Son O(log n) rondas sobre arreglos int32 de NumPy, en el orden de la cuadrícula para
+    que las lecturas indexadas recorran la memoria casi en secuencia.
+    """
+    rng = np.random.default_rng(semilla)
+    total = filas * columnas
+    tipo = np.int32 if 2 * total < 2 ** 31 else np.int64
+    celdas = np.arange(total, dtype=tipo).reshape(filas, columnas)
+    # Paredes horizontales (celda, celda + 1) y verticales (celda, celda + columnas); comp_*
+    # son las componentes de los extremos
+    n_horizontales = filas * (columnas - 1)
+    comp_origen = np.concatenate([celdas[:, :-1].ravel(), celdas[:-1, :].ravel()])
+    comp_destino = comp_origen + 1
+    comp_destino[n_horizontales:] += columnas - 1
+    n_aristas = comp_origen.size
+
+    pesos = np.arange(n_aristas, dtype=tipo)
+    rng.shuffle(pesos)
+    paredes = np.arange(n_aristas, dtype=tipo)
+    en_arbol = np.zeros(n_aristas, dtype=bool)
+    padre = np.arange(total, dtype=tipo)
+    mejor = np.empty(total, dtype=tipo)
+    centinela = np.iinfo(tipo).max
+
+    # En la primera ronda cada componente es una celda: la pared más liviana sale de
+    # comparar las cuatro vecinas sobre la cuadrícula, sin dispersar por índices
+    elige_origen, elige_destino = _paredes_livianas_celdas(pesos, filas, columnas, centinela)
+    while pesos.size:
+        if elige_origen is None:
+            # Pared más liviana de cada componente: la que iguala el mínimo de alguno de sus extremos
+            mejor.fill(centinela)
+            np.minimum.at(mejor, comp_origen, pesos)
+            np.minimum.at(mejor, comp_destino, pesos)
+            elige_origen = mejor[comp_origen] == pesos
+            elige_destino = mejor[comp_destino] == pesos
+        elegidas = np.flatnonzero(elige_origen | elige_destino)
+        en_arbol[paredes[elegidas]] = True
+
+        # Enganchar cada componente a la del otro lado; los pares que se eligen mutuamente
+        # forman el único ciclo posible y se rompen dejando como raíz al menor
+        a, b = comp_origen[elegidas], comp_destino[elegidas]
+        elige_origen, elige_destino = elige_origen[elegidas], elige_destino[elegidas]
+        enganchadas = np.concatenate([a[elige_origen], b[elige_destino]])
+        padre[enganchadas] = np.concatenate([b[elige_origen], a[elige_destino]])
+        mutuas = elige_origen & elige_destino
+        raices = np.minimum(a[mutuas], b[mutuas])
+        padre[raices] = raices
+
+        # Saltos de puntero solo sobre las componentes que todavía no apuntan a su raíz
+        ancestros = padre[enganchadas]
+        while enganchadas.size:
+            abuelos = padre[ancestros]
+            padre[enganchadas] = abuelos
+            pendientes = abuelos != ancestros
+            enganchadas = enganchadas[pendientes]
+            ancestros = abuelos[pendientes]
+
+        comp_origen = padre[comp_origen]
+        comp_destino = padre[comp_destino]
+        cruzan = np.flatnonzero(comp_origen != comp_destino)
+        pesos, paredes = pesos[cruzan], paredes[cruzan]
+        comp_origen, comp_destino = comp_origen[cruzan], comp_destino[cruzan]
+        elige_origen = elige_destino = None
+
+    abiertos = np.zeros((filas, columnas), dtype=np.uint8)
+    abiertos[:, :-1] |= en_arbol[:n_horizontales].reshape(filas, columnas - 1).astype(np.uint8) * ABIERTO_ESTE
+    abiertos[:-1, :] |= en_arbol[n_horizontales:].reshape(filas - 1, columnas).astype(np.uint8) * ABIERTO_SUR
+    return Laberinto(abiertos)
+
+
+GENERADORES = {
+    "backtracker": generar_backtracker,
+    "kruskal": generar_kruskal,
+}
+
+
+def generar(filas, columnas, algoritmo="kruskal", semilla=None, ciclos=0.0):
+    """Generar un laberinto; `ciclos` es la proporción de paredes internas extra que se abren"""
+    if filas < 1 or columnas < 1:
+        raise ValueError("El laberinto necesita al menos una fila y una columna")
+    try:
+        generador = GENERADORES[algoritmo]
+    except KeyError:
+        raise ValueError(f"Algoritmo desconocido: {algoritmo!r}") from None
+    laberinto = generador(filas, columnas, semilla)
+    if ciclos > 0:
+        # Abrir paredes al azar crea caminos alternativos, como hacía generateMaze
+        rng = np.random.default_rng(None if semilla is None else semilla + 1)
+        abiertos = laberinto.abiertos
+        abiertos[:, :-1] |= (rng.random((filas, columnas - 1)) < ciclos).astype(np.uint8) * ABIERTO_ESTE
+        abiertos[:-1, :] |= (rng.random((filas - 1, columnas)) < ciclos).astype(np.uint8) * ABIERTO_SUR
+        # Las distancias del generador ya no valen con los caminos nuevos
+        laberinto = Laberinto(abiertos, laberinto.inicio, laberinto.meta)
+    return laberinto
+
+
+def medir(tamanos=(100, 500, 1000, 2000), semilla=0):
+    """Tiempos de generación, distancias y codificación por algoritmo y tamaño"""
+    for lado in tamanos:
+        for algoritmo in GENERADORES:
+            inicio = time.perf_counter()
+            laberinto = generar(lado, lado, algoritmo, semilla)
+            generado = time.perf_counter()
+            resoluble = laberinto.resoluble()
+            distancias = time.perf_counter()
+            datos = laberinto.codificar()
+            codificado = time.perf_counter()
+            print(f"{lado:>5}x{lado:<5} {algoritmo:<12} generar {generado - inicio:7.3f} s | "
+                  f"distancias {distancias - generado:7.3f} s | codificar {codificado - distancias:6.3f} s | "
+                  f"{len(datos) / 1024:9.1f} KiB | resoluble: {resoluble}")
+
+
+if __name__ == "__main__":
+    medir()
@@ -0,0 +1,229 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+
+from PIL import Image, ImageOps
+
+from manifiestoRecursos import DIRECTORIO_VARIANTES, DURACION_POR_DEFECTO, NOMBRE_MANIFIESTO
+
+# Versión del proceso: cambiarla obliga a regenerar todas las variantes
+VERSION = 2
+
+# Recursos lógicos y las variantes que necesitan los clientes. Una variante solo se guarda si
+# no agranda la fuente y pesa menos que ella; si no, el cliente usa el archivo original.
+# - "estirar": tamaño exacto, como hace MontyHall_interfaz con resize()
+# - "contener": cabe dentro del tamaño sin deformarse ni agrandarse (object-fit: contain en juego.html)
+# - "cubrir": llena el tamaño recortando (object-fit: cover en juego.html)
+RECURSOS = {
+    "puerta_estatica": ("Puerta_estatica.png", [
+        ((133, 266), "estirar", ("png",)),
+        ((133, 266), "contener", ("webp", "png")),
+    ]),
+    "puerta_abierta": ("Puerta_abierta.png", [
+        ((133, 266), "estirar", ("png",)),
+        ((133, 266), "contener", ("webp", "png")),
+    ]),
+    "presentador1": ("Presentador1.jpeg", [
+        ((100, 150), "estirar", ("jpeg",)),
+        ((100, 150), "cubrir", ("webp", "jpeg")),
+    ]),
+    "presentador2": ("Presentador2.jpeg", [
+        ((100, 150), "estirar", ("jpeg",)),
+        ((100, 150), "cubrir", ("webp", "jpeg")),
+    ]),
+    "fondo": ("Fondo.jpg", [
+        ((800, 600), "estirar", ("jpeg",)),
+    ]),
+    "cabra": ("Cabra.gif", [
+        ((133, 266), "estirar", ("gif",)),
+        ((133, 266), "contener", ("gif",)),
+    ]),
+    "carro": ("carro.gif", [
+        ((133, 266), "estirar", ("gif",)),
+        ((133, 266), "contener", ("gif",)),
+    ]),
+}
+
+EXTENSIONES = {"png": "png", "jpeg": "jpg", "webp": "webp", "gif": "gif"}
+
+
+def _hash_archivo(ruta):
+    digesto = hashlib.sha1()
+    with open(ruta, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(1 << 16), b""):
+            digesto.update(bloque)
+    return digesto.hexdigest()
+
+
+def _ajustar(imagen, tamano, ajuste):
+    """Redimensionar un fotograma RGBA según el modo de ajuste"""
+    if ajuste == "estirar":
+        return imagen.resize(tamano, Image.Resampling.LANCZOS)
+    if ajuste == "contener":
+        # Agrandar no aporta detalle: el navegador escala igual y el archivo pesa más
+        if imagen.width <= tamano[0] and imagen.height <= tamano[1]:
+            return imagen
+        return ImageOps.contain(imagen, tamano, Image.Resampling.LANCZOS)
+    if ajuste == "cubrir":
+        return ImageOps.fit(imagen, tamano, Image.Resampling.LANCZOS)
+    raise ValueError(f"Ajuste desconocido: {ajuste!r}")
+
+
+def _agranda(tamano_fuente, tamano, ajuste):
+    """True si la variante tendría que inventar píxeles que la fuente no tiene"""
+    if ajuste == "contener":
+        # _ajustar nunca agranda al contener: como mucho deja la fuente a su tamaño
+        return False
+    return tamano[0] > tamano_fuente[0] or tamano[1] > tamano_fuente[1]
+
+
+def _codificar_estatica(imagen, formato):
+    """Codificar una imagen fija en el formato pedido con las opciones que más reducen bytes"""
+    salida = io.BytesIO()
+    if formato == "png":
+        # Paleta adaptativa con transparencia: suele reducir a menos de la mitad sin pérdida visible
+        imagen.quantize(256, method=Image.Quantize.FASTOCTREE).save(salida, "PNG", optimize=True)
+    elif formato == "jpeg":
+        imagen.convert("RGB").save(salida, "JPEG", quality=85, optimize=True, progressive=True)
+    elif formato == "webp":
+        imagen.save(salida, "WEBP", quality=80, method=6)
+    else:
+        raise ValueError(f"Formato desconocido para imagen fija: {formato!r}")
+    return salida.getvalue()
+
+
+def _codificar_gif(fuente, tamano, ajuste):
+    """Redimensionar cada fotograma de un GIF y guardarlo con paleta optimizada"""
+    fotogramas = []
+    duraciones = []
+    for indice in range(getattr(fuente, "n_frames", 1)):
+        fuente.seek(indice)
+        fotogramas.append(_ajustar(fuente.convert("RGBA"), tamano, ajuste))
+        duraciones.append(fuente.info.get("duration") or DURACION_POR_DEFECTO)
+    salida = io.BytesIO()
+    fotogramas[0].save(salida, "GIF", save_all=True, append_images=fotogramas[1:], duration=duraciones,
+                       loop=fuente.info.get("loop", 0), disposal=2, optimize=True)
+    return salida.getvalue()
+
+
+def _firma_variante(tamano, ajuste, formatos):
+    return f"v{VERSION}|{tamano[0]}x{tamano[1]}|{ajuste}|{','.join(formatos)}"
+
+
+def procesar(directorio_recursos, forzar=False):
+    """Generar las variantes que falten o cuyas fuentes cambiaron y actualizar el manifiesto
+
+    Devuelve una lista de (nombre, bytes fuente, variantes, usos servidos por la fuente,
+    regenerado).
+    """
+    directorio_salida = os.path.join(directorio_recursos, DIRECTORIO_VARIANTES)
+    os.makedirs(directorio_salida, exist_ok=True)
+    ruta_manifiesto = os.path.join(directorio_salida, NOMBRE_MANIFIESTO)
+    try:
+        with open(ruta_manifiesto, encoding="utf-8") as archivo:
+            anterior = json.load(archivo).get("recursos", {})
+    except (OSError, ValueError):
+        anterior = {}
+
+    manifiesto = {}
+    informe = []
+    for nombre, (archivo_fuente, variantes) in RECURSOS.items():
+        ruta_fuente = os.path.join(directorio_recursos, archivo_fuente)
+        if not os.path.exists(ruta_fuente):
+            print(f"Aviso: no existe {ruta_fuente}, se omite {nombre}")
+            continue
+        hash_fuente = _hash_archivo(ruta_fuente)
+        firmas = [_firma_variante(*variante) for variante in variantes]
+        previo = anterior.get(nombre)
+
+        # Solo se reprocesa si cambió el contenido de la fuente o la lista de variantes
+        vigente = (not forzar and previo is not None and previo.get("hash_fuente") == hash_fuente
+                   and previo.get("firmas") == firmas
+                   and all(os.path.exists(os.path.join(directorio_salida, v["archivo"]))
+                           for v in previo["variantes"]))
+        if vigente:
+            entrada = previo
+        else:
+            entrada = {"fuente": archivo_fuente, "hash_fuente": hash_fuente, "firmas": firmas,
+                       "bytes_fuente": os.path.getsize(ruta_fuente), "variantes": [], "usa_fuente": []}
+            with Image.open(ruta_fuente) as fuente:
+                animado = getattr(fuente, "is_animated", False)
+                for tamano, ajuste, formatos in variantes:
+                    uso = {"tamano": list(tamano), "ajuste": ajuste}
+                    if _agranda(fuente.size, tamano, ajuste):
+                        entrada["usa_fuente"].append({**uso, "motivo": "agrandaría la fuente"})
+                        continue
+                    if animado or formatos == ("gif",):
+                        candidatos = [("gif", _codificar_gif(fuente, tamano, ajuste))]
+                    else:
+                        imagen = _ajustar(fuente.convert("RGBA"), tamano, ajuste)
+                        candidatos = [(formato, _codificar_estatica(imagen, formato)) for formato in formatos]
+                    candidatos = [(formato, datos) for formato, datos in candidatos
+                                  if len(datos) < entrada["bytes_fuente"]]
+                    if not candidatos:
+                        entrada["usa_fuente"].append({**uso, "motivo": "no pesa menos que la fuente"})
+                        continue
+                    for formato, datos in candidatos:
+                        archivo = f"{nombre}_{tamano[0]}x{tamano[1]}_{ajuste}.{EXTENSIONES[formato]}"
+                        with open(os.path.join(directorio_salida, archivo), "wb") as salida:
+                            salida.write(datos)
+                        entrada["variantes"].append({"archivo": archivo, "formato": formato, "ajuste": ajuste,
+                                                     "tamano": list(tamano), "bytes": len(datos)})
+            # Las variantes que ya no se generan se borran para no servirlas desactualizadas
+            actuales = {variante["archivo"] for variante in entrada["variantes"]}
+            for variante in (previo or {}).get("variantes", []):
+                if variante["archivo"] not in actuales:
+                    try:
+                        os.remove(os.path.join(directorio_salida, variante["archivo"]))
+                    except OSError:
+                        pass
+        manifiesto[nombre] = entrada
+        informe.append((nombre, entrada["bytes_fuente"], entrada["variantes"], entrada.get("usa_fuente", []),
+                        not vigente))
+
+    with open(ruta_manifiesto, "w", encoding="utf-8") as archivo:
+        json.dump({"version": VERSION, "recursos": manifiesto}, archivo, indent=2, sort_keys=True)
+        archivo.write("\n")
+    return informe
+
+
+def imprimir_informe(informe):
+    """Bytes de cada fuente contra su variante más liviana para cada uso
+
+    Cada fuente se cuenta una sola vez, contra el uso que más pesa: ningún cliente descarga
+    más que eso por ese recurso, así que el ahorro no se infla con los usos repetidos.
+    """
+    total_fuente = 0
+    total_variantes = 0
+    for nombre, bytes_fuente, variantes, usa_fuente, regenerado in informe:
+        estado = "regenerado" if regenerado else "sin cambios"
+        print(f"{nombre} ({estado}): fuente {bytes_fuente:,} bytes")
+        usos = {}
+        for variante in variantes:
+            clave = (tuple(variante["tamano"]), variante["ajuste"])
+            usos[clave] = min(usos.get(clave, variante["bytes"]), variante["bytes"])
+            print(f"    {variante['archivo']:<40} {variante['bytes']:>9,} bytes "
+                  f"({variante['bytes'] / bytes_fuente * 100:5.1f}% de la fuente)")
+        for uso in usa_fuente:
+            clave = (tuple(uso["tamano"]), uso["ajuste"])
+            usos[clave] = bytes_fuente
+            descripcion = f"{clave[0][0]}x{clave[0][1]} {uso['ajuste']}"
+            print(f"    {descripcion:<40} sin cambios: se usa la fuente ({uso['motivo']})")
+        total_fuente += bytes_fuente
+        total_variantes += max(usos.values(), default=bytes_fuente)
+    if total_fuente:
+        ahorro = total_fuente - total_variantes
+        print(f"Total: {total_fuente:,} bytes de fuentes -> {total_variantes:,} bytes de variantes "
+              f"(ahorro de {ahorro:,} bytes, {ahorro / total_fuente * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generar variantes optimizadas de frontend/resources")
+    parser.add_argument("directorio", nargs="?",
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend",
+                                             "resources"))
+    parser.add_argument("--forzar", action="store_true", help="regenerar aunque las fuentes no cambiaran")
+    argumentos = parser.parse_args()
+    imprimir_informe(procesar(os.path.normpath(argumentos.directorio), argumentos.forzar))
@@ -0,0 +1,102 @@
+import base64
+import hashlib
+import os
+import struct
+
+# Constante del RFC 6455 para calcular Sec-WebSocket-Accept
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Códigos de operación de las tramas
+CONTINUACION = 0x0
+TEXTO = 0x1
+BINARIO = 0x2
+CIERRE = 0x8
+PING = 0x9
+PONG = 0xA
+
+# Tamaño máximo aceptado para un mensaje entrante
+MAX_MENSAJE = 1 << 20
+
+
+class ErrorProtocolo(Exception):
+    """Trama WebSocket mal formada o demasiado grande"""
+
+
+def clave_aceptacion(clave):
+    """Valor de Sec-WebSocket-Accept para la Sec-WebSocket-Key del cliente"""
+    digesto = hashlib.sha1((clave + GUID).encode("ascii")).digest()
+    return base64.b64encode(digesto).decode("ascii")
+
+
+def nueva_clave():
+    """Sec-WebSocket-Key aleatoria para un cliente"""
+    return base64.b64encode(os.urandom(16)).decode("ascii")
+
+
+def _aplicar_mascara(datos, mascara):
+    # XOR con la máscara repetida, hecho sobre enteros grandes para no iterar byte a byte
+    repetida = (mascara * (len(datos) // 4 + 1))[:len(datos)]
+    valor = int.from_bytes(datos, "big") ^ int.from_bytes(repetida, "big")
+    return valor.to_bytes(len(datos), "big")
+
+
+def codificar_trama(datos, opcode=TEXTO, enmascarar=False):
+    """Armar una trama final; los clientes deben enmascarar, el servidor no"""
+    if isinstance(datos, str):
+        datos = datos.encode("utf-8")
+    largo = len(datos)
+    bit_mascara = 0x80 if enmascarar else 0
+    if largo < 126:
+        cabecera = struct.pack("!BB", 0x80 | opcode, bit_mascara | largo)
+    elif largo < 1 << 16:
+        cabecera = struct.pack("!BBH", 0x80 | opcode, bit_mascara | 126, largo)
+    else:
+        cabecera = struct.pack("!BBQ", 0x80 | opcode, bit_mascara | 127, largo)
+    if enmascarar:
+        mascara = os.urandom(4)
+        return cabecera + mascara + _aplicar_mascara(datos, mascara)
+    return cabecera + datos
+
+
+async def leer_trama(lector):
+    """Leer una trama de un asyncio.StreamReader; devuelve (final, opcode, datos)"""
+    b1, b2 = await lector.readexactly(2)
+    final = bool(b1 & 0x80)
+    opcode = b1 & 0x0F
+    largo = b2 & 0x7F
+    if largo == 126:
+        (largo,) = struct.unpack("!H", await lector.readexactly(2))
+    elif largo == 127:
+        (largo,) = struct.unpack("!Q", await lector.readexactly(8))
+    if largo > MAX_MENSAJE:
+        raise ErrorProtocolo(f"Mensaje demasiado grande: {largo} bytes")
+    mascara = await lector.readexactly(4) if b2 & 0x80 else None
+    datos = await lector.readexactly(largo) if largo else b""
+    if mascara is not None and datos:
+        datos = _aplicar_mascara(datos, mascara)
+    return final, opcode, datos
+
+
+async def leer_mensaje(lector, escritor, enmascarar=False):
+    """Leer un mensaje completo, respondiendo pings y uniendo fragmentos
+
+    Devuelve (opcode, datos); opcode es CIERRE cuando el otro extremo cierra.
+    """
+    partes = []
+    opcode_mensaje = None
+    while True:
+        final, opcode, datos = await leer_trama(lector)
+        if opcode == PING:
+            escritor.write(codificar_trama(datos, PONG, enmascarar))
+            continue
+        if opcode == PONG:
+            continue
+        if opcode == CIERRE:
+            return CIERRE, datos
+        if opcode != CONTINUACION:
+            opcode_mensaje = opcode
+        partes.append(datos)
+        if sum(len(p) for p in partes) > MAX_MENSAJE:
+            raise ErrorProtocolo("Mensaje fragmentado demasiado grande")
+        if final:
+            return opcode_mensaje, b"".join(partes)
@@ -0,0 +1,406 @@
+import atexit
+import functools
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+# Archivo común a todas las interfaces; MONTYHALL_REGISTRO permite usar otro
+RUTA_REGISTRO = os.environ.get("MONTYHALL_REGISTRO") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datos", "partidas.registro")
+
+# Cabecera: firma, versión y tamaño de registro, rellenada a 16 bytes
+FIRMA = b"MHPR"
+VERSION = 1
+CABECERA = struct.Struct("<4sHH8x")
+# Registro de ancho fijo: marca de tiempo (µs desde epoch), puerta elegida, puerta abierta,
+# puerta final, banderas y origen. 16 bytes para que cada registro quede alineado.
+REGISTRO = struct.Struct("<qbbbBB3x")
+
+# Banderas: banderas & 3 == 2 * cambió + ganó; con el origen, conteos[origen * 4 + (banderas & 3)]
+GANA = 1
+CAMBIO = 2
+
+# Interfaz que jugó la partida
+ORIGEN_TK = 0
+ORIGEN_WEB = 1
+ORIGEN_LABERINTO = 2
+NOMBRES_ORIGENES = ("tk", "web", "laberinto")
+CELDAS_CONTEOS = len(NOMBRES_ORIGENES) * 4
+
+# Se escribe y se hace fsync cada tantos registros o cada tantos segundos, lo que llegue antes
+LOTE_REGISTROS = 64
+INTERVALO_FSYNC = 1.0
+# Registros por bloque al recorrer el archivo, para acotar la memoria temporal
+BLOQUE_ESCANEO = 1 << 20
+# Hasta tantos registros sin contar se recorren con struct; más allá conviene importar NumPy
+MAX_ESCANEO_STRUCT = 4096
+
+
+class ErrorRegistro(ValueError):
+    pass
+
+
+class Resumen:
+    """Conteos de partidas por origen, estrategia y resultado
+
+    `conteos[origen * 4 + 2 * cambió + ganó]`; los filtros que se omiten suman todos los valores.
+    """
+
+    def __init__(self, conteos):
+        self.conteos = conteos
+
+    def _sumar(self, origen, cambio, resultados):
+        origenes = range(len(NOMBRES_ORIGENES)) if origen is None else (origen,)
+        cambios = (0, 1) if cambio is None else (int(cambio),)
+        return sum(self.conteos[o * 4 + c * 2 + g] for o in origenes for c in cambios for g in resultados)
+
+    def partidas(self, origen=None, cambio=None):
+        return self._sumar(origen, cambio, (0, 1))
+
+    def ganadas(self, origen=None, cambio=None):
+        return self._sumar(origen, cambio, (1,))
+
+    def perdidas(self, origen=None, cambio=None):
+        return self._sumar(origen, cambio, (0,))
+
+    def porcentaje(self, origen=None, cambio=None):
+        partidas = self.partidas(origen, cambio)
+        return self.ganadas(origen, cambio) / partidas * 100 if partidas else 0.0
+
+    def como_dict(self):
+        return {
+            "partidas": self.partidas(),
+            "ganadas": self.ganadas(),
+            "mantener": {"ganadas": self.ganadas(cambio=False), "partidas": self.partidas(cambio=False)},
+            "cambiar": {"ganadas": self.ganadas(cambio=True), "partidas": self.partidas(cambio=True)},
+            "origenes": {nombre: self.partidas(origen) for origen, nombre in enumerate(NOMBRES_ORIGENES)},
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def tipo_registro():
+    """dtype de NumPy de un registro; NumPy se importa recién aquí para no demorar la ventana de Tk"""
+    import numpy as np
+    return np.dtype([("marca", "<i8"), ("eleccion", "i1"), ("abierta", "i1"), ("final", "i1"),
+                     ("banderas", "u1"), ("origen", "u1"), ("relleno", "V3")])
+
+
+def _contar(vista):
+    """Conteos de un arreglo de registros"""
+    import numpy as np
+    # Los orígenes desconocidos van a una fila extra que se descarta
+    origenes = np.minimum(vista["origen"], len(NOMBRES_ORIGENES)).astype(np.intp)
+    indices = origenes * 4 + (vista["banderas"] & 3)
+    return np.bincount(indices, minlength=CELDAS_CONTEOS + 4)[:CELDAS_CONTEOS]
+
+
+def _sumar_conteos(a, b):
+    return [x + y for x, y in zip(a, b)]
+
+
+class RegistroPartidas:
+    """Registro binario de partidas, solo de agregado, compartido por Tk, la web y el laberinto
+
+    Los registros se acumulan en memoria y se escriben en lote con un único write y fsync.
+    Los conteos por origen y estrategia se mantienen al agregar; al abrir se parte del
+    resumen guardado junto al archivo y solo se recorren (con mmap) los registros que no
+    cubre, así que las consultas no releen todo el historial. Varios procesos pueden
+    agregar al mismo archivo: los registros ajenos se cuentan al consultar.
+
+    Con vaciado_automatico=False, agregar() nunca escribe: quien lo usa llama a
+    vaciar(solo_vencido=True) periódicamente, por ejemplo desde un hilo para que el fsync no
+    frene un bucle de eventos. Agregar y consultar mientras otro hilo vacía es seguro.
+    """
+
+    def __init__(self, ruta=RUTA_REGISTRO, lote=LOTE_REGISTROS, intervalo=INTERVALO_FSYNC,
+                 vaciado_automatico=True):
+        self.ruta = ruta
+        self.ruta_resumen = ruta + ".resumen"
+        self.lote = lote
+        self.intervalo = intervalo
+        self.vaciado_automatico = vaciado_automatico
+        # _candado protege el estado en memoria y la posición del archivo; _candado_escritura
+        # ordena los vaciados, cuyo fsync va fuera de _candado para no frenar a agregar()
+        self._candado = threading.RLock()
+        self._candado_escritura = threading.Lock()
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        # O_BINARY evita que Windows traduzca los saltos de línea de los datos binarios
+        self._fd = os.open(ruta, os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            self._preparar()
+        except Exception:
+            os.close(self._fd)
+            raise
+        self._pendiente = bytearray()
+        self._conteos_pendientes = [0] * CELDAS_CONTEOS
+        self._primer_pendiente = None
+        atexit.register(self.cerrar)
+
+    def _preparar(self):
+        tamano = os.fstat(self._fd).st_size
+        if tamano == 0:
+            os.write(self._fd, CABECERA.pack(FIRMA, VERSION, REGISTRO.size))
+            os.fsync(self._fd)
+            tamano = CABECERA.size
+        firma, version, tamano_registro = CABECERA.unpack(self._leer(0, CABECERA.size))
+        if firma != FIRMA or version != VERSION or tamano_registro != REGISTRO.size:
+            raise ErrorRegistro(f"{self.ruta} no es un registro de partidas compatible")
+        sobrante = (tamano - CABECERA.size) % REGISTRO.size
+        if sobrante:
+            # Un lote cortado por un corte de energía: se descarta el registro incompleto
+            os.ftruncate(self._fd, tamano - sobrante)
+        self._conteos = [0] * CELDAS_CONTEOS
+        self._cubiertos = 0
+        self._cargar_resumen()
+        self._ponerse_al_dia()
+
+    def _leer(self, posicion, cantidad):
+        """Leer desde una posición del archivo
+
+        Con lseek y read en vez de pread, que no existe en Windows. Mover la posición no afecta
+        a las escrituras: con O_APPEND cada write va al final del archivo.
+        """
+        os.lseek(self._fd, posicion, os.SEEK_SET)
+        partes = []
+        while cantidad > 0:
+            parte = os.read(self._fd, cantidad)
+            if not parte:
+                break
+            partes.append(parte)
+            cantidad -= len(parte)
+        return b"".join(partes)
+
+    # --- Resumen incremental ---
+
+    def _marca(self, indice):
+        return REGISTRO.unpack(self._leer(CABECERA.size + indice * REGISTRO.size, REGISTRO.size))[0]
+
+    def _cargar_resumen(self):
+        """Partir de los conteos guardados si corresponden a un prefijo de este archivo"""
+        try:
+            with open(self.ruta_resumen, encoding="utf-8") as archivo:
+                guardado = json.load(archivo)
+            registros = int(guardado["registros"])
+            conteos = [int(conteo) for conteo in guardado["conteos"]]
+            if len(conteos) != CELDAS_CONTEOS:
+                return
+            if not 0 < registros <= self._total() or self._marca(registros - 1) != guardado["ultima_marca"]:
+                return
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            return
+        self._conteos = conteos
+        self._cubiertos = registros
+
+    def _guardar_resumen(self):
+        if not self._cubiertos:
+            return
+        datos = {"registros": self._cubiertos, "ultima_marca": self._marca(self._cubiertos - 1),
+                 "conteos": self._conteos}
+        temporal = self.ruta_resumen + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(datos, archivo)
+        os.replace(temporal, self.ruta_resumen)
+
+    def _total(self):
+        return (os.fstat(self._fd).st_size - CABECERA.size) // REGISTRO.size
+
+    def _ponerse_al_dia(self):
+        """Contar los registros del archivo que todavía no están en los conteos"""
+        total = self._total()
+        if total > self._cubiertos:
+            self._conteos = _sumar_conteos(self._conteos, self.contar(self._cubiertos, total))
+            self._cubiertos = total
+
+    def contar(self, desde=0, hasta=None):
+        """Conteos de los registros [desde, hasta)
+
+        Pocos registros se leen y desempaquetan con struct; muchos, con mmap y NumPy.
+        """
+        hasta = self._total() if hasta is None else hasta
+        conteos = [0] * CELDAS_CONTEOS
+        if hasta <= desde:
+            return conteos
+        if hasta - desde <= MAX_ESCANEO_STRUCT:
+            datos = self._leer(CABECERA.size + desde * REGISTRO.size, (hasta - desde) * REGISTRO.size)
+            for _, _, _, _, banderas, origen in REGISTRO.iter_unpack(datos):
+                if origen < len(NOMBRES_ORIGENES):
+                    conteos[origen * 4 + (banderas & 3)] += 1
+            return conteos
+        import numpy as np
+        with mmap.mmap(self._fd, CABECERA.size + hasta * REGISTRO.size, access=mmap.ACCESS_READ) as mapa:
+            for inicio in range(desde, hasta, BLOQUE_ESCANEO):
+                cantidad = min(BLOQUE_ESCANEO, hasta - inicio)
+                # La vista no copia: debe desaparecer antes de cerrar el mapa
+                conteos = _sumar_conteos(conteos, _contar(np.frombuffer(
+                    mapa, tipo_registro(), cantidad, CABECERA.size + inicio * REGISTRO.size)).tolist())
+        return conteos
+
+    # --- Escritura ---
+
+    def agregar(self, eleccion, abierta, final, cambio, gana, origen, marca=None):
+        """Agregar una partida terminada; se escribe en el próximo lote"""
+        if not 0 <= origen < len(NOMBRES_ORIGENES):
+            raise ErrorRegistro(f"Origen desconocido: {origen!r}")
+        if marca is None:
+            marca = time.time_ns() // 1000
+        with self._candado:
+            self._pendiente += REGISTRO.pack(marca, eleccion, abierta, final,
+                                             (CAMBIO if cambio else 0) | (GANA if gana else 0), origen)
+            self._conteos_pendientes[origen * 4 + (2 if cambio else 0) + (1 if gana else 0)] += 1
+            if self._primer_pendiente is None:
+                self._primer_pendiente = time.monotonic()
+            vencido = self._vencido()
+        if vencido and self.vaciado_automatico:
+            self.vaciar()
+
+    def _vencido(self):
+        """True si ya se juntó un lote o el registro pendiente más viejo cumplió el intervalo"""
+        return bool(self._pendiente) and (len(self._pendiente) >= self.lote * REGISTRO.size
+                                          or time.monotonic() - self._primer_pendiente >= self.intervalo)
+
+    def vaciar(self, solo_vencido=False):
+        """Escribir los registros pendientes con un único write y fsync
+
+        Con solo_vencido no se escribe nada hasta que se junte un lote o el registro pendiente
+        más viejo cumpla el intervalo (para llamarlo periódicamente sin perder el agrupamiento).
+        """
+        with self._candado_escritura:
+            with self._candado:
+                if not self._pendiente or self._fd is None:
+                    return
+                if solo_vencido and not self._vencido():
+                    return
+                datos = bytes(self._pendiente)
+                escritos = os.write(self._fd, datos)
+                while escritos < len(datos):
+                    escritos += os.write(self._fd, datos[escritos:])
+                # Con O_APPEND la posición queda al final de lo escrito: si el lote empezó justo
+                # donde terminaban los registros ya contados, no hubo escrituras ajenas en medio
+                fin = os.lseek(self._fd, 0, os.SEEK_CUR)
+                if fin - len(datos) == CABECERA.size + self._cubiertos * REGISTRO.size:
+                    self._conteos = _sumar_conteos(self._conteos, self._conteos_pendientes)
+                    self._cubiertos += len(datos) // REGISTRO.size
+                self._pendiente.clear()
+                self._conteos_pendientes = [0] * CELDAS_CONTEOS
+                self._primer_pendiente = None
+            os.fsync(self._fd)
+
+    def cerrar(self):
+        if self._fd is None:
+            return
+        self.vaciar()
+        with self._candado_escritura, self._candado:
+            if self._fd is None:
+                return
+            self._ponerse_al_dia()
+            self._guardar_resumen()
+            os.close(self._fd)
+            self._fd = None
+        atexit.unregister(self.cerrar)
+
+    def abandonar(self):
+        """Cerrar sin escribir lo pendiente, tras un error de disco que impide seguir"""
+        with self._candado_escritura, self._candado:
+            if self._fd is None:
+                return
+            self._pendiente.clear()
+            self._conteos_pendientes = [0] * CELDAS_CONTEOS
+            self._primer_pendiente = None
+            os.close(self._fd)
+            self._fd = None
+        atexit.unregister(self.cerrar)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    # --- Consultas ---
+
+    def __len__(self):
+        with self._candado:
+            return self._total() + len(self._pendiente) // REGISTRO.size
+
+    def resumen(self):
+        """Conteos de toda la historia, incluidos los registros todavía sin escribir"""
+        with self._candado:
+            self._ponerse_al_dia()
+            return Resumen(_sumar_conteos(self._conteos, self._conteos_pendientes))
+
+
+def abrir_registro(ruta=RUTA_REGISTRO, **opciones):
+    """Registro de partidas, o None si no se puede abrir (el juego sigue sin historial)
+
+    Cualquier error queda aquí: el historial es opcional y no debe impedir abrir la ventana.
+    """
+    try:
+        return RegistroPartidas(ruta, **opciones)
+    except Exception as e:
+        print(f"Aviso: sin registro de partidas ({e})")
+        return None
+
+
+def medir(cantidad=5_000_000, semilla=0):
+    """Comparar el resumen incremental con releer el archivo completo"""
+    import numpy as np
+    rng = np.random.default_rng(semilla)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "partidas.registro")
+        registros = np.zeros(cantidad, tipo_registro())
+        registros["marca"] = time.time_ns() // 1000 + np.arange(cantidad)
+        premio = rng.integers(0, 3, cantidad)
+        registros["eleccion"] = rng.integers(0, 3, cantidad)
+        # El presentador abre una cabra que no es la elegida
+        registros["abierta"] = np.where(registros["eleccion"] == premio,
+                                        (registros["eleccion"] + rng.integers(1, 3, cantidad)) % 3,
+                                        3 - registros["eleccion"] - premio)
+        cambio = rng.random(cantidad) < 0.5
+        registros["final"] = np.where(cambio, 3 - registros["eleccion"] - registros["abierta"],
+                                      registros["eleccion"])
+        registros["banderas"] = cambio * CAMBIO + (registros["final"] == premio) * GANA
+        registros["origen"] = rng.integers(0, len(NOMBRES_ORIGENES), cantidad)
+        with open(ruta, "wb") as archivo:
+            archivo.write(CABECERA.pack(FIRMA, VERSION, REGISTRO.size))
+            archivo.write(registros.tobytes())
+        print(f"{cantidad:,} partidas, {os.path.getsize(ruta) / 2 ** 20:.1f} MiB")
+
+        inicio = time.perf_counter()
+        with open(ruta, "rb") as archivo:
+            datos = archivo.read()
+        conteos = [0] * CELDAS_CONTEOS
+        for _, _, _, _, banderas, origen in REGISTRO.iter_unpack(memoryview(datos)[CABECERA.size:]):
+            conteos[origen * 4 + (banderas & 3)] += 1
+        print(f"Relectura con struct:           {time.perf_counter() - inicio:8.3f} s")
+
+        inicio = time.perf_counter()
+        with RegistroPartidas(ruta) as registro:
+            frio = registro.resumen()
+        print(f"Apertura sin resumen (mmap):    {time.perf_counter() - inicio:8.3f} s")
+        assert frio.conteos == conteos
+
+        inicio = time.perf_counter()
+        registro = RegistroPartidas(ruta)
+        print(f"Apertura con resumen guardado:  {(time.perf_counter() - inicio) * 1000:8.3f} ms")
+        tiempos = []
+        for indice in range(10_000):
+            registro.agregar(0, 1, 2, True, indice % 3 != 0, ORIGEN_TK)
+            inicio = time.perf_counter()
+            resumen = registro.resumen()
+            tiempos.append(time.perf_counter() - inicio)
+        registro.cerrar()
+        tiempos.sort()
+        print(f"Consulta tras cada partida:     media {sum(tiempos) / len(tiempos) * 1e6:.1f} µs, "
+              f"p99 {tiempos[int(len(tiempos) * 0.99)] * 1e6:.1f} µs")
+        print(f"Mantener {resumen.porcentaje(cambio=False):.2f}% | Cambiar {resumen.porcentaje(cambio=True):.2f}% "
+              f"| {resumen.partidas():,} partidas")
+
+
+if __name__ == "__main__":
+    medir()
@@ -0,0 +1,43 @@
+import random
+
+# Puertas del juego y contenido posible detrás de cada una
+PUERTAS = ['A', 'B', 'C']
+CABRA = 'Cabra'
+CARRO = 'Carro'
+
+
+def colocar_premio(rng=random):
+    """Elegir al azar el índice de la puerta que esconde el carro"""
+    return rng.randint(0, 2)
+
+
+def contenido_puertas(premio):
+    """Lista con el contenido de cada puerta según el índice del premio"""
+    back = [CABRA, CABRA, CABRA]
+    back[premio] = CARRO
+    return back
+
+
+def puerta_a_abrir(seleccionada, premio, rng=random):
+    """Índice de la puerta que abre el presentador: ni la elegida ni la del premio"""
+    return cabra_a_abrir(seleccionada, premio, rng.randint(1, 2))
+
+
+def cabra_a_abrir(seleccionada, premio, desplazamiento):
+    """Puerta que abre el presentador dado un desplazamiento de 1 o 2
+
+    Si el jugador acertó quedan dos cabras y el desplazamiento elige una; si no, la única
+    restante es 3 - seleccionada - premio. Solo usa aritmética, así que acepta enteros o
+    arreglos de NumPy.
+    """
+    acierto = seleccionada == premio
+    return acierto * ((seleccionada + desplazamiento) % 3) + (1 - acierto) * (3 - seleccionada - premio)
+
+
+def puerta_final(seleccionada, abierta, cambiar):
+    """Índice de la puerta con la que se queda el jugador
+
+    La suma de los índices 0 + 1 + 2 es 3, así que la restante es 3 - seleccionada - abierta.
+    cambiar puede ser un booleano o un arreglo de NumPy de booleanos.
+    """
+    return seleccionada + cambiar * (3 - 2 * seleccionada - abierta)
@@ -0,0 +1,219 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+
+# Tipos que vale la pena comprimir; imágenes, GIF, MP3 y MP4 ya vienen comprimidos
+TIPOS_COMPRIMIBLES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+# Archivos más chicos no se comprimen: la cabecera gzip se come la ganancia
+MIN_COMPRIMIR = 512
+# Memoria máxima para variantes gzip generadas al vuelo
+MAX_BYTES_COMPRIMIDOS = 16 * 1024 * 1024
+
+# Los recursos pesados casi nunca cambian; páginas, JS y CSS se revalidan siempre con el ETag
+CACHE_RECURSOS = "public, max-age=86400"
+CACHE_REVALIDAR = "no-cache"
+
+
+class RespuestaEstatica:
+    """Respuesta ya resuelta: estado, cabeceras y de dónde sale el cuerpo
+
+    El cuerpo es un bytes en memoria (variantes comprimidas) o un tramo de archivo
+    (ruta_archivo, desde, cantidad) pensado para enviarse con sendfile.
+    """
+
+    def __init__(self, estado, cabeceras, cuerpo=b"", ruta_archivo=None, desde=0, cantidad=0):
+        self.estado = estado
+        self.cabeceras = cabeceras
+        self.cuerpo = cuerpo
+        self.ruta_archivo = ruta_archivo
+        self.desde = desde
+        self.cantidad = cantidad
+
+
+class _InfoArchivo:
+    """Metadatos de un archivo servido, válidos mientras no cambien su tamaño ni su mtime"""
+
+    __slots__ = ("tamano", "mtime_ns", "etag", "tipo", "ultima_modificacion", "comprimible", "gzip")
+
+    def __init__(self, ruta, estado):
+        self.tamano = estado.st_size
+        self.mtime_ns = estado.st_mtime_ns
+        digesto = hashlib.sha1()
+        with open(ruta, "rb") as archivo:
+            for bloque in iter(lambda: archivo.read(1 << 16), b""):
+                digesto.update(bloque)
+        digesto = digesto.hexdigest()
+        # ETag fuerte: depende del contenido, no de la fecha
+        self.etag = f'"{digesto[:20]}"'
+        tipo = mimetypes.guess_type(ruta)[0] or "application/octet-stream"
+        if tipo.startswith("text/") or tipo == "application/javascript":
+            tipo += "; charset=utf-8"
+        self.tipo = tipo
+        self.ultima_modificacion = formatdate(estado.st_mtime, usegmt=True)
+        self.comprimible = self.tamano >= MIN_COMPRIMIR and tipo.startswith(TIPOS_COMPRIMIBLES)
+        self.gzip = None
+
+
+def _etags(valor):
+    """Lista de ETags de una cabecera If-None-Match, sin el prefijo débil (comparación débil)"""
+    return [parte.strip().removeprefix("W/") for parte in valor.split(",") if parte.strip()]
+
+
+def parsear_rango(valor, tamano):
+    """Rango de bytes pedido como (desde, hasta) inclusivo
+
+    Devuelve None si la cabecera no se entiende o pide varios rangos (se responde entero) y
+    False si el rango no se puede satisfacer.
+    """
+    if not valor.startswith("bytes=") or "," in valor:
+        return None
+    inicio, _, fin = valor[6:].strip().partition("-")
+    try:
+        if inicio == "":
+            # bytes=-N: los últimos N bytes
+            sufijo = int(fin)
+            if sufijo <= 0:
+                return False
+            return max(0, tamano - sufijo), tamano - 1
+        desde = int(inicio)
+        hasta = int(fin) if fin else tamano - 1
+    except ValueError:
+        return None
+    if desde >= tamano or hasta < desde:
+        return False
+    return desde, min(hasta, tamano - 1)
+
+
+class ServidorEstaticos:
+    """Resolver peticiones GET/HEAD de archivos bajo un directorio con caché HTTP completa
+
+    ETags fuertes, 304 condicionales, rangos de bytes para audio y video, variantes gzip
+    precomprimidas y cuerpos que se envían desde el archivo con sendfile.
+    """
+
+    def __init__(self, directorio, prefijo_url, prefijos_recursos=()):
+        self.directorio = os.path.realpath(directorio)
+        self.prefijo_url = prefijo_url.rstrip("/") + "/"
+        self.prefijos_recursos = tuple(prefijos_recursos)
+        self._infos = {}
+        self._bytes_comprimidos = 0
+        self._candado = threading.Lock()
+
+    def resolver(self, ruta_url):
+        """Ruta en disco para una URL; None si no corresponde o sale del directorio"""
+        if not ruta_url.startswith(self.prefijo_url):
+            return None
+        relativa = ruta_url[len(self.prefijo_url):]
+        if "\0" in relativa:
+            # Un %00 en la URL: ningún archivo puede tener ese nombre y el sistema lo rechaza
+            return None
+        candidato = os.path.realpath(os.path.join(self.directorio, relativa))
+        if os.path.commonpath([candidato, self.directorio]) != self.directorio:
+            return None
+        return candidato
+
+    def _info(self, ruta):
+        try:
+            estado = os.stat(ruta)
+        except (OSError, ValueError):
+            return None
+        if not os.path.isfile(ruta):
+            return None
+        info = self._infos.get(ruta)
+        if info is None or info.tamano != estado.st_size or info.mtime_ns != estado.st_mtime_ns:
+            info = _InfoArchivo(ruta, estado)
+            self._infos[ruta] = info
+        return info
+
+    def _variante_gzip(self, ruta, info):
+        """Cuerpo gzip del archivo: el .gz precomprimido si existe, si no se comprime una vez"""
+        if info.gzip is not None:
+            return info.gzip
+        ruta_gz = ruta + ".gz"
+        try:
+            if os.stat(ruta_gz).st_mtime_ns >= info.mtime_ns:
+                with open(ruta_gz, "rb") as archivo:
+                    datos = archivo.read()
+            else:
+                datos = None
+        except OSError:
+            datos = None
+        if datos is None:
+            with open(ruta, "rb") as archivo:
+                datos = gzip.compress(archivo.read(), compresslevel=9, mtime=0)
+        if len(datos) >= info.tamano:
+            # No vale la pena: se marca para no volver a intentarlo
+            info.comprimible = False
+            return None
+        with self._candado:
+            if self._bytes_comprimidos + len(datos) > MAX_BYTES_COMPRIMIDOS:
+                return datos
+            self._bytes_comprimidos += len(datos)
+        info.gzip = datos
+        return datos
+
+    def responder(self, metodo, ruta_url, cabeceras):
+        """Resolver la petición; None si la URL no es de este directorio o no existe"""
+        ruta = self.resolver(ruta_url)
+        if ruta is None:
+            return None
+        info = self._info(ruta)
+        if info is None:
+            return None
+
+        base = {
+            "Content-Type": info.tipo,
+            "Last-Modified": info.ultima_modificacion,
+            "Accept-Ranges": "bytes",
+            "Cache-Control": CACHE_RECURSOS if ruta_url.startswith(self.prefijos_recursos) else CACHE_REVALIDAR,
+        }
+
+        acepta_gzip = info.comprimible and "gzip" in cabeceras.get("accept-encoding", "")
+        etag = info.etag[:-1] + '-gz"' if acepta_gzip else info.etag
+        base["ETag"] = etag
+        if info.comprimible:
+            base["Vary"] = "Accept-Encoding"
+
+        # Petición condicional: el navegador ya tiene esta versión
+        if_none_match = cabeceras.get("if-none-match")
+        if if_none_match is not None:
+            etags = _etags(if_none_match)
+            if "*" in etags or etag in etags:
+                return RespuestaEstatica(304, {**base, "Content-Length": None, "Content-Type": None})
+        elif "if-modified-since" in cabeceras:
+            try:
+                fecha = parsedate_to_datetime(cabeceras["if-modified-since"])
+                if int(info.mtime_ns // 1_000_000_000) <= int(fecha.timestamp()):
+                    return RespuestaEstatica(304, {**base, "Content-Length": None, "Content-Type": None})
+            except (TypeError, ValueError):
+                pass
+
+        # Rango de bytes (por ejemplo, al adelantar el audio); solo sobre el archivo sin comprimir
+        rango = None
+        if "range" in cabeceras and metodo == "GET":
+            if_range = cabeceras.get("if-range")
+            # If-Range exige comparación fuerte: un ETag débil (W/...) o una fecha nunca dan 206
+            if if_range is None or if_range.strip() == info.etag:
+                rango = parsear_rango(cabeceras["range"], info.tamano)
+        if rango is False:
+            return RespuestaEstatica(416, {**base, "Content-Range": f"bytes */{info.tamano}",
+                                           "Content-Length": "0"})
+        if rango is not None:
+            desde, hasta = rango
+            cantidad = hasta - desde + 1
+            cabeceras_rango = {**base, "ETag": info.etag, "Content-Range": f"bytes {desde}-{hasta}/{info.tamano}",
+                               "Content-Length": str(cantidad)}
+            return RespuestaEstatica(206, cabeceras_rango, ruta_archivo=ruta, desde=desde, cantidad=cantidad)
+
+        if acepta_gzip:
+            datos = self._variante_gzip(ruta, info)
+            if datos is not None:
+                cabeceras_gzip = {**base, "Content-Encoding": "gzip", "Content-Length": str(len(datos))}
+                return RespuestaEstatica(200, cabeceras_gzip, b"" if metodo == "HEAD" else datos)
+            base["ETag"] = info.etag
+
+        return RespuestaEstatica(200, {**base, "Content-Length": str(info.tamano)},
+                                 ruta_archivo=None if metodo == "HEAD" else ruta, cantidad=info.tamano)
@@ -0,0 +1,257 @@
+import random
+import time
+from array import array
+
+from reglasMontyHall import CABRA, CARRO, colocar_premio, puerta_a_abrir, puerta_final
+
+# Estados de una sesión, codificados como enteros pequeños
+LIBRE = -1
+ESPERANDO_ELECCION = 0
+PUERTA_ABIERTA = 1
+ESPERANDO_CAMBIO = 2
+REVELADA = 3
+
+NOMBRES_ESTADOS = {
+    LIBRE: "libre",
+    ESPERANDO_ELECCION: "esperando elección",
+    PUERTA_ABIERTA: "puerta abierta",
+    ESPERANDO_CAMBIO: "esperando cambio",
+    REVELADA: "revelada",
+}
+
+# Valor usado en las columnas de puertas cuando todavía no hay puerta
+SIN_PUERTA = -1
+
+
+class TransicionInvalida(ValueError):
+    """Se pidió una acción que no corresponde al estado actual de la sesión"""
+
+
+class RegistroSesiones:
+    """Sesiones de Monty Hall independientes de la interfaz, guardadas en columnas compactas
+
+    Cada sesión es un índice en arreglos de enteros (array), así que cientos de miles de
+    jugadores ocupan unos pocos bytes cada uno. Las transiciones siguen el orden
+    esperando elección -> puerta abierta -> esperando cambio -> revelada.
+    """
+
+    def __init__(self, semilla=None):
+        self.rng = random.Random(semilla)
+        self._estado = array('b')
+        self._premio = array('b')
+        self._eleccion = array('b')
+        self._abierta = array('b')
+        self._final = array('b')
+        self._ganadas = array('I')
+        self._perdidas = array('I')
+        self._libres = []
+        self._activas = 0
+
+    def __len__(self):
+        return self._activas
+
+    # --- Ciclo de vida ---
+
+    def crear(self):
+        """Crear una sesión nueva y devolver su identificador"""
+        if self._libres:
+            id_sesion = self._libres.pop()
+            self._ganadas[id_sesion] = 0
+            self._perdidas[id_sesion] = 0
+        else:
+            id_sesion = len(self._estado)
+            for columna in (self._estado, self._premio, self._eleccion, self._abierta, self._final):
+                columna.append(SIN_PUERTA)
+            self._ganadas.append(0)
+            self._perdidas.append(0)
+        self._activas += 1
+        self._estado[id_sesion] = ESPERANDO_ELECCION
+        self.reiniciar(id_sesion)
+        return id_sesion
+
+    def eliminar(self, id_sesion):
+        """Liberar una sesión; su lugar se reutiliza en la próxima creación"""
+        self._verificar(id_sesion)
+        self._estado[id_sesion] = LIBRE
+        self._libres.append(id_sesion)
+        self._activas -= 1
+
+    def sesion(self, id_sesion):
+        """Objeto liviano para manejar una sesión como si fuera independiente"""
+        self._verificar(id_sesion)
+        return SesionMontyHall(self, id_sesion)
+
+    def _verificar(self, id_sesion, *estados):
+        # Un índice negativo de array contaría desde el final: se rechaza igual que uno libre
+        if not 0 <= id_sesion < len(self._estado):
+            raise KeyError(f"La sesión {id_sesion} no existe")
+        estado = self._estado[id_sesion]
+        if estado == LIBRE:
+            raise KeyError(f"La sesión {id_sesion} no existe")
+        if estados and estado not in estados:
+            raise TransicionInvalida(
+                f"La sesión {id_sesion} está en estado '{NOMBRES_ESTADOS[estado]}'")
+
+    # --- Transiciones ---
+
+    def reiniciar(self, id_sesion):
+        """Colocar un premio nuevo y volver a esperar la elección; conserva las estadísticas"""
+        self._verificar(id_sesion)
+        self._estado[id_sesion] = ESPERANDO_ELECCION
+        self._premio[id_sesion] = colocar_premio(self.rng)
+        self._eleccion[id_sesion] = SIN_PUERTA
+        self._abierta[id_sesion] = SIN_PUERTA
+        self._final[id_sesion] = SIN_PUERTA
+
+    def elegir(self, id_sesion, puerta):
+        """El jugador elige una puerta (0, 1 o 2) y el presentador abre una cabra; devuelve cuál"""
+        self._verificar(id_sesion, ESPERANDO_ELECCION)
+        # Solo enteros: True, 1.0 o numpy.int64(1) son iguales a 1 pero no son una puerta
+        if type(puerta) is not int or not 0 <= puerta <= 2:
+            raise ValueError(f"Puerta inválida: {puerta!r}")
+        abierta = puerta_a_abrir(puerta, self._premio[id_sesion], self.rng)
+        self._eleccion[id_sesion] = puerta
+        self._abierta[id_sesion] = abierta
+        self._estado[id_sesion] = PUERTA_ABIERTA
+        return abierta
+
+    def anunciar_apertura(self, id_sesion):
+        """El presentador ya mostró la cabra: ahora se espera la decisión de cambiar"""
+        self._verificar(id_sesion, PUERTA_ABIERTA)
+        self._estado[id_sesion] = ESPERANDO_CAMBIO
+
+    def decidir(self, id_sesion, cambiar):
+        """Mantener o cambiar de puerta y revelar; devuelve (puerta final, ganó)"""
+        self._verificar(id_sesion, ESPERANDO_CAMBIO)
+        final = puerta_final(self._eleccion[id_sesion], self._abierta[id_sesion], cambiar)
+        gana = final == self._premio[id_sesion]
+        self._final[id_sesion] = final
+        self._estado[id_sesion] = REVELADA
+        if gana:
+            self._ganadas[id_sesion] += 1
+        else:
+            self._perdidas[id_sesion] += 1
+        return final, gana
+
+    # --- Consultas ---
+
+    def estado(self, id_sesion):
+        self._verificar(id_sesion)
+        return self._estado[id_sesion]
+
+    def contenido(self, id_sesion, puerta):
+        """Lo que hay detrás de una puerta de la sesión"""
+        self._verificar(id_sesion)
+        return CARRO if puerta == self._premio[id_sesion] else CABRA
+
+    def bytes_por_sesion(self):
+        """Memoria de las columnas dividida entre las sesiones guardadas"""
+        columnas = (self._estado, self._premio, self._eleccion, self._abierta, self._final,
+                    self._ganadas, self._perdidas)
+        total = sum(columna.buffer_info()[1] * columna.itemsize for columna in columnas)
+        return total / len(self._estado) if len(self._estado) else 0
+
+
+class SesionMontyHall:
+    """Vista de una sesión dentro de un RegistroSesiones"""
+
+    __slots__ = ("registro", "id")
+
+    def __init__(self, registro, id_sesion):
+        self.registro = registro
+        self.id = id_sesion
+
+    @classmethod
+    def nueva(cls, semilla=None):
+        """Sesión con su propio registro, para un único jugador"""
+        registro = RegistroSesiones(semilla)
+        return cls(registro, registro.crear())
+
+    # Transiciones
+    def reiniciar(self):
+        self.registro.reiniciar(self.id)
+
+    def elegir(self, puerta):
+        return self.registro.elegir(self.id, puerta)
+
+    def anunciar_apertura(self):
+        self.registro.anunciar_apertura(self.id)
+
+    def decidir(self, cambiar):
+        return self.registro.decidir(self.id, cambiar)
+
+    # Estado
+    @property
+    def estado(self):
+        return self.registro._estado[self.id]
+
+    @property
+    def terminado(self):
+        return self.estado == REVELADA
+
+    @property
+    def premio(self):
+        return self.registro._premio[self.id]
+
+    @property
+    def eleccion(self):
+        return self.registro._eleccion[self.id]
+
+    @property
+    def abierta(self):
+        return self.registro._abierta[self.id]
+
+    @property
+    def final(self):
+        return self.registro._final[self.id]
+
+    @property
+    def ganadas(self):
+        return self.registro._ganadas[self.id]
+
+    @property
+    def perdidas(self):
+        return self.registro._perdidas[self.id]
+
+    @property
+    def porcentaje(self):
+        """Porcentaje de victorias de la sesión"""
+        total_juegos = self.ganadas + self.perdidas
+        return (self.ganadas / total_juegos * 100) if total_juegos > 0 else 0
+
+    def contenido(self, puerta):
+        return self.registro.contenido(self.id, puerta)
+
+    def __repr__(self):
+        return (f"SesionMontyHall(id={self.id}, estado='{NOMBRES_ESTADOS[self.estado]}', "
+                f"ganadas={self.ganadas}, perdidas={self.perdidas})")
+
+
+def medir(n_sesiones=200_000, rondas=5, semilla=0):
+    """Medir memoria por sesión y transiciones por segundo con n_sesiones vivas"""
+    registro = RegistroSesiones(semilla)
+    ids = [registro.crear() for _ in range(n_sesiones)]
+    rng = random.Random(semilla)
+
+    inicio = time.perf_counter()
+    for _ in range(rondas):
+        for id_sesion in ids:
+            registro.elegir(id_sesion, rng.randrange(3))
+            registro.anunciar_apertura(id_sesion)
+            registro.decidir(id_sesion, True)
+            registro.reiniciar(id_sesion)
+    segundos = time.perf_counter() - inicio
+
+    transiciones = 4 * rondas * n_sesiones
+    return {
+        "sesiones": len(registro),
+        "bytes_por_sesion": registro.bytes_por_sesion(),
+        "transiciones_por_segundo": transiciones / segundos,
+    }
+
+
+if __name__ == "__main__":
+    resultado = medir()
+    print(f"Sesiones vivas: {resultado['sesiones']:,} | "
+          f"memoria por sesión: {resultado['bytes_por_sesion']:.1f} bytes | "
+          f"transiciones por segundo: {resultado['transiciones_por_segundo']:,.0f}")
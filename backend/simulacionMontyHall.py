@@ -0,0 +1,117 @@
+import time
+
+import numpy as np
+
+from reglasMontyHall import cabra_a_abrir, puerta_final
+
+# Estrategias que puede seguir el jugador después de que el presentador abre una puerta
+ESTRATEGIAS = ('mantener', 'cambiar', 'aleatoria')
+
+# Tamaño de lote por defecto: acota la memoria temporal cuando se piden muchas partidas
+TAMANO_LOTE = 1 << 22
+
+
+class ResultadoSimulacion:
+    """Resultado de un lote de partidas simuladas sin interfaz"""
+
+    def __init__(self, estrategia, ganadas, partidas, segundos, premio=None, eleccion=None,
+                 abierta=None, final=None, gana=None):
+        self.estrategia = estrategia
+        self.ganadas = ganadas
+        self.perdidas = partidas - ganadas
+        self.partidas = partidas
+        self.segundos = segundos
+        # Arreglos por partida (None si no se pidió guardarlos)
+        self.premio = premio
+        self.eleccion = eleccion
+        self.abierta = abierta
+        self.final = final
+        self.gana = gana
+
+    @property
+    def porcentaje(self):
+        """Porcentaje de victorias"""
+        return (self.ganadas / self.partidas * 100) if self.partidas > 0 else 0
+
+    @property
+    def partidas_por_segundo(self):
+        """Rendimiento de la simulación, útil para dimensionar corridas"""
+        return self.partidas / self.segundos if self.segundos > 0 else float('inf')
+
+    def __repr__(self):
+        return (f"ResultadoSimulacion(estrategia={self.estrategia!r}, ganadas={self.ganadas}, "
+                f"perdidas={self.perdidas}, porcentaje={self.porcentaje:.2f}%, "
+                f"partidas_por_segundo={self.partidas_por_segundo:,.0f})")
+
+
+def _validar_estrategia(estrategia):
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estrategia desconocida: {estrategia!r}. Usa una de {ESTRATEGIAS}")
+
+
+def jugar_lote(rng, n_juegos, estrategia):
+    """Jugar n_juegos con las reglas de reglasMontyHall usando arreglos de NumPy
+
+    Devuelve los arreglos (premio, eleccion, abierta, final, gana) con una entrada por partida.
+    """
+    _validar_estrategia(estrategia)
+
+    # Colocar el premio y la elección inicial del jugador
+    premio = rng.integers(0, 3, size=n_juegos, dtype=np.int8)
+    eleccion = rng.integers(0, 3, size=n_juegos, dtype=np.int8)
+
+    # El presentador abre una cabra que no sea la elegida
+    desplazamiento = rng.integers(1, 3, size=n_juegos, dtype=np.int8)
+    abierta = cabra_a_abrir(eleccion, premio, desplazamiento).astype(np.int8)
+
+    # Puerta final según la estrategia
+    if estrategia == 'aleatoria':
+        cambiar = rng.random(n_juegos) < 0.5
+    else:
+        cambiar = estrategia == 'cambiar'
+    final = puerta_final(eleccion, abierta, cambiar).astype(np.int8)
+
+    gana = final == premio
+    return premio, eleccion, abierta, final, gana
+
+
+def simular(n_juegos, estrategia='cambiar', semilla=None, guardar_partidas=True, tamano_lote=TAMANO_LOTE):
+    """Simular n_juegos partidas de Monty Hall con la estrategia dada
+
+    Con la misma semilla el resultado es idéntico. Si guardar_partidas es False solo se
+    cuentan las victorias, lo que permite corridas muy grandes con memoria acotada.
+    """
+    if n_juegos < 0:
+        raise ValueError("El número de juegos no puede ser negativo")
+    _validar_estrategia(estrategia)
+
+    rng = np.random.default_rng(semilla)
+    inicio = time.perf_counter()
+
+    ganadas = 0
+    partes = []
+    restantes = n_juegos
+    while restantes > 0:
+        n = min(restantes, tamano_lote)
+        lote = jugar_lote(rng, n, estrategia)
+        ganadas += int(np.count_nonzero(lote[4]))
+        if guardar_partidas:
+            partes.append(lote)
+        restantes -= n
+
+    segundos = time.perf_counter() - inicio
+
+    if not guardar_partidas:
+        return ResultadoSimulacion(estrategia, ganadas, n_juegos, segundos)
+
+    if partes:
+        arreglos = [np.concatenate(columna) for columna in zip(*partes)]
+    else:
+        arreglos = [np.empty(0, dtype=np.int8)] * 4 + [np.empty(0, dtype=bool)]
+    return ResultadoSimulacion(estrategia, ganadas, n_juegos, segundos, *arreglos)
+
+
+if __name__ == "__main__":
+    # Medir el rendimiento de cada estrategia para dimensionar corridas
+    for estrategia in ESTRATEGIAS:
+        print(simular(10_000_000, estrategia, semilla=0, guardar_partidas=False))
@@ -0,0 +1,117 @@
+import time
+
+import pygame
+
+# Parámetros del mezclador: un búfer pequeño reduce la espera entre el clic y el sonido
+FRECUENCIA = 44100
+TAMANO_BUFFER = 256
+CANALES = 4
+# Búfer que usa pygame 2 cuando el mezclador se inicia sin pre_init
+BUFFER_PYGAME = 512
+
+
+class BancoSonidos:
+    """Efectos de sonido decodificados una sola vez en memoria
+
+    Cada efecto es un pygame.mixer.Sound y se reproduce en un grupo reservado de canales, de
+    modo que varios efectos pueden sonar a la vez sin cortar la música de pygame.mixer.music.
+    """
+
+    def __init__(self, rutas, canales=CANALES, frecuencia=FRECUENCIA, tamano_buffer=TAMANO_BUFFER):
+        self.rutas = dict(rutas)
+        self.canales = canales
+        self.frecuencia = frecuencia
+        self.tamano_buffer = tamano_buffer
+        self._sonidos = {}
+        self._canales = []
+        self._siguiente_canal = 0
+        self.cargado = False
+
+    @property
+    def latencia_buffer(self):
+        """Latencia teórica que añade el búfer del mezclador, en segundos"""
+        return self.tamano_buffer / self.frecuencia
+
+    def cargar(self):
+        """Iniciar el mezclador con búfer pequeño y decodificar todos los efectos
+
+        Si otro módulo (la intro) ya inició el mezclador con los valores por defecto, se
+        reinicia con los del banco; si la música sigue sonando no se interrumpe y el banco
+        adopta la frecuencia y el búfer con que quedó el mezclador. Sin dispositivo de audio
+        el banco queda cargado pero vacío: reproducir() no hace nada.
+        """
+        if self.cargado:
+            return
+        try:
+            if pygame.mixer.get_init():
+                if pygame.mixer.music.get_busy():
+                    self.tamano_buffer = BUFFER_PYGAME
+                else:
+                    pygame.mixer.quit()
+            if not pygame.mixer.get_init():
+                pygame.mixer.pre_init(self.frecuencia, -16, 2, self.tamano_buffer)
+                pygame.mixer.init()
+            # La latencia se calcula con la frecuencia real, que el dispositivo puede cambiar
+            self.frecuencia = pygame.mixer.get_init()[0]
+
+            # Reservar los primeros canales para que Sound.play() automático no los use
+            if pygame.mixer.get_num_channels() < self.canales:
+                pygame.mixer.set_num_channels(self.canales)
+            pygame.mixer.set_reserved(self.canales)
+            self._canales = [pygame.mixer.Channel(i) for i in range(self.canales)]
+        except pygame.error as e:
+            print(f"Aviso: sin sonido ({e})")
+            self._canales = []
+            self.cargado = True
+            return
+
+        for nombre, ruta in self.rutas.items():
+            try:
+                self._sonidos[nombre] = pygame.mixer.Sound(ruta)
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"Error al cargar el sonido {ruta}: {e}")
+        self.cargado = True
+
+    def _canal_libre(self):
+        """Primer canal libre del grupo; si todos suenan se reutiliza el más antiguo"""
+        for canal in self._canales:
+            if not canal.get_busy():
+                return canal
+        canal = self._canales[self._siguiente_canal]
+        self._siguiente_canal = (self._siguiente_canal + 1) % len(self._canales)
+        return canal
+
+    def reproducir(self, nombre):
+        """Reproducir un efecto ya decodificado; devuelve el canal usado o None"""
+        if not self.cargado:
+            self.cargar()
+        sonido = self._sonidos.get(nombre)
+        if sonido is None:
+            return None
+        canal = self._canal_libre()
+        canal.play(sonido)
+        return canal
+
+    def detener(self):
+        """Silenciar todos los efectos del banco"""
+        for canal in self._canales:
+            canal.stop()
+
+    def medir_latencia(self, nombre, repeticiones=10):
+        """Medir el tiempo desde que se pide un efecto hasta que su canal empieza a sonar
+
+        Devuelve la lista de mediciones en segundos, ya sumada la latencia del búfer, que el
+        mezclador no informa.
+        """
+        mediciones = []
+        for _ in range(repeticiones):
+            self.detener()
+            inicio = time.perf_counter()
+            canal = self.reproducir(nombre)
+            if canal is None:
+                break
+            while not canal.get_busy() and time.perf_counter() - inicio < 1:
+                time.sleep(0.0001)
+            mediciones.append(time.perf_counter() - inicio + self.latencia_buffer)
+        self.detener()
+        return mediciones
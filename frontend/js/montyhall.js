@@ -4,6 +4,16 @@
 const audioOpenDoor = new Audio('../resources/OpenDoor.mp3');
 const audioWin = new Audio('../resources/Win.mp3');
 const audioFail = new Audio('../resources/Fail.mp3');
+// Imágenes ya redimensionadas por backend/optimizarRecursos.py (ver resources/optimizados/manifiesto.json);
+// la cabra ya es más chica que la puerta y pesa menos sin recodificar, así que se usa la original
+const IMAGENES = {
+    puertaEstatica: '/frontend/resources/optimizados/puerta_estatica_133x266_contener.webp',
+    puertaAbierta: '/frontend/resources/optimizados/puerta_abierta_133x266_contener.webp',
+    presentador: '/frontend/resources/optimizados/presentador1_100x150_cubrir.webp',
+    presentadorPerdida: '/frontend/resources/optimizados/presentador2_100x150_cubrir.webp',
+    cabra: '/frontend/resources/Cabra.gif',
+    carro: '/frontend/resources/optimizados/carro_133x266_contener.gif'
+};
 
 const doors = ['A', 'B', 'C'];
 let premio = 0;
@@ -22,13 +32,74 @@ const doorImgs = {
 };
 const messageDiv = document.getElementById('message');
 const statsDiv = document.getElementById('stats');
+const globalStatsDiv = document.getElementById('global-stats');
 const restartBtn = document.getElementById('restart');
 
+// Conexión con el servidor del juego (app.py). Si la página no se sirve desde él,
+// toda la lógica se ejecuta en el navegador como antes.
+const ESPERANDO_CAMBIO = 2;
+const REVELADA = 3;
+let servidor = null;
+let siguienteId = 0;
+// Indica si la partida en curso la lleva el servidor o el navegador
+let partidaEnServidor = false;
+
+function conectarServidor() {
+    if (!location.protocol.startsWith('http')) return;
+    const protocolo = location.protocol === 'https:' ? 'wss' : 'ws';
+    const ws = new WebSocket(`${protocolo}://${location.host}/ws`);
+    ws.onopen = () => {
+        servidor = ws;
+        // Si todavía no se eligió puerta, la partida pasa a jugarse en el servidor
+        if (!selectedDoor) inicializarJuego();
+    };
+    ws.onclose = () => {
+        servidor = null;
+        // Una partida del servidor no puede terminarse sin él: se empieza una local
+        if (partidaEnServidor) inicializarJuego();
+    };
+    ws.onmessage = (evento) => manejarMensaje(JSON.parse(evento.data));
+}
+
+function enviar(accion, datos = {}) {
+    servidor.send(JSON.stringify({ accion, id: ++siguienteId, ...datos }));
+}
+
+function manejarMensaje(mensaje) {
+    if (mensaje.tipo === 'global') {
+        mostrarGlobal(mensaje);
+        return;
+    }
+    if (mensaje.tipo !== 'estado' || mensaje.id === null) return;
+    if (mensaje.estado === ESPERANDO_CAMBIO && selectedDoor && !openedDoor) {
+        mostrarPuertaAbierta(doors[mensaje.abierta]);
+    } else if (mensaje.estado === REVELADA && !gameEnded) {
+        picks = { 'A': mensaje.contenido[0], 'B': mensaje.contenido[1], 'C': mensaje.contenido[2] };
+        ganadas = mensaje.ganadas;
+        perdidas = mensaje.perdidas;
+        mostrarResultado(doors[mensaje.final]);
+    }
+}
+
+function mostrarGlobal(mensaje) {
+    if (!globalStatsDiv) return;
+    const tasa = (e) => e.partidas > 0 ? (e.ganadas / e.partidas * 100).toFixed(2) : '0.00';
+    globalStatsDiv.textContent = `Jugadores conectados: ${mensaje.jugadores} | ` +
+        `Global cambiar: ${tasa(mensaje.cambiar)}% | Global mantener: ${tasa(mensaje.mantener)}%`;
+}
+
 function inicializarJuego() {
-    premio = Math.floor(Math.random() * 3);
-    const back = ['Cabra', 'Cabra', 'Cabra'];
-    back[premio] = 'Carro';
-    picks = { 'A': back[0], 'B': back[1], 'C': back[2] };
+    partidaEnServidor = servidor !== null;
+    if (partidaEnServidor) {
+        // El premio lo coloca el servidor y no se conoce hasta revelar
+        enviar('reiniciar');
+        picks = {};
+    } else {
+        premio = Math.floor(Math.random() * 3);
+        const back = ['Cabra', 'Cabra', 'Cabra'];
+        back[premio] = 'Carro';
+        picks = { 'A': back[0], 'B': back[1], 'C': back[2] };
+    }
     selectedDoor = null;
     openedDoor = null;
     gameEnded = false;
@@ -38,9 +109,9 @@ function inicializarJuego() {
     txtContainer.className = 'txt-puerta';
     txtContainer.textContent = 'Selecciona una puerta.';
     messageDiv.appendChild(txtContainer);
-    presenterImg.src = '../resources/Presentador1.jpeg';
+    presenterImg.src = IMAGENES.presentador;
     for (const d of doors) {
-        doorImgs[d].src = '/frontend/resources/Puerta_estatica.png';
+        doorImgs[d].src = IMAGENES.puertaEstatica;
         doorImgs[d].classList.remove('selected');
         doorImgs[d].style.pointerEvents = 'auto';
     }
@@ -58,18 +129,27 @@ function seleccionarPuerta(door) {
     selectedDoor = door;
     doorImgs[door].classList.add('selected');
     messageDiv.textContent = `Has seleccionado la puerta ${door}. El presentador abrirá una puerta...`;
+    if (partidaEnServidor) {
+        // El servidor decide qué puerta abre el presentador
+        enviar('elegir', { puerta: doors.indexOf(door) });
+        return;
+    }
     // Buscar una puerta para abrir (que no sea la seleccionada y no tenga el premio)
     const disponibles = doors.filter(d => d !== door && picks[d] === 'Cabra');
-    openedDoor = disponibles[Math.floor(Math.random() * disponibles.length)];
+    mostrarPuertaAbierta(disponibles[Math.floor(Math.random() * disponibles.length)]);
+}
+
+function mostrarPuertaAbierta(door) {
+    openedDoor = door;
     // Mostrar animación de abrir puerta antes de mostrar la cabra
-    doorImgs[openedDoor].src = '/frontend/resources/Puerta_abierta.png';
+    doorImgs[openedDoor].src = IMAGENES.puertaAbierta;
     audioOpenDoor.currentTime = 0;
     audioOpenDoor.play();
     setTimeout(() => abrirPuerta(openedDoor), 900);
 }
 
 function abrirPuerta(door) {
-    doorImgs[door].src = '../resources/Cabra.gif';
+    doorImgs[door].src = IMAGENES.cabra;
     doorImgs[door].classList.remove('selected');
     doorImgs[door].style.pointerEvents = 'none';
     messageDiv.textContent = `El presentador abrió la puerta ${door} y mostró una cabra. ¿Deseas cambiar de puerta?`;
@@ -95,32 +175,45 @@ function mostrarBotonesCambio() {
 function finalizarJuego(cambiar) {
     // Limpiar botones
     messageDiv.innerHTML = '';
+    if (partidaEnServidor) {
+        enviar('decidir', { cambiar });
+        return;
+    }
     let finalDoor = selectedDoor;
     if (cambiar) {
         finalDoor = doors.find(d => d !== selectedDoor && d !== openedDoor);
+    }
+    if (picks[finalDoor] === 'Carro') {
+        ganadas++;
+    } else {
+        perdidas++;
+    }
+    mostrarResultado(finalDoor);
+}
+
+function mostrarResultado(finalDoor) {
+    if (finalDoor !== selectedDoor) {
         doorImgs[selectedDoor].classList.remove('selected');
         doorImgs[finalDoor].classList.add('selected');
     }
     // Mostrar premios
     for (const d of doors) {
         if (picks[d] === 'Carro') {
-            doorImgs[d].src = '../resources/carro.gif';
+            doorImgs[d].src = IMAGENES.carro;
         } else {
-            doorImgs[d].src = '../resources/Cabra.gif';
+            doorImgs[d].src = IMAGENES.cabra;
         }
         doorImgs[d].style.pointerEvents = 'none';
     }
     // Resultado
     if (picks[finalDoor] === 'Carro') {
-        presenterImg.src = '../resources/Presentador1.jpeg';
+        presenterImg.src = IMAGENES.presentador;
         messageDiv.textContent = `¡Felicidades! Ganaste el carro en la puerta ${finalDoor}.`;
-        ganadas++;
         audioWin.currentTime = 0;
         audioWin.play();
     } else {
-        presenterImg.src = '../resources/Presentador2.jpeg';
+        presenterImg.src = IMAGENES.presentadorPerdida;
         messageDiv.textContent = `Lo siento, encontraste una cabra en la puerta ${finalDoor}.`;
-        perdidas++;
         audioFail.currentTime = 0;
         audioFail.play();
     }
@@ -139,3 +232,4 @@ restartBtn.addEventListener('click', () => {
 // Inicializar
 inicializarJuego();
 actualizarStats();
+conectarServidor();
@@ -0,0 +1,181 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(RAIZ, "backend"))
+
+from protocoloWebSocket import CIERRE, codificar_trama, leer_mensaje, nueva_clave
+
+ACCIONES = ("elegir", "decidir", "reiniciar")
+
+
+def subir_limite_archivos():
+    """Permitir tantos sockets abiertos como deje el sistema"""
+    blando, duro = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if blando < duro:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (duro, duro))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+def percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return 0.0
+    indice = min(len(valores_ordenados) - 1, int(round(p / 100 * (len(valores_ordenados) - 1))))
+    return valores_ordenados[indice]
+
+
+async def conectar_websocket(host, puerto):
+    """Abrir un WebSocket contra /ws y leer el estado inicial de la sesión"""
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    escritor.write((
+        f"GET /ws HTTP/1.1\r\nHost: {host}:{puerto}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {nueva_clave()}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    ).encode("latin-1"))
+    respuesta = await lector.readuntil(b"\r\n\r\n")
+    if not respuesta.startswith(b"HTTP/1.1 101"):
+        raise ConnectionError(respuesta.split(b"\r\n", 1)[0].decode("latin-1"))
+    await leer_mensaje(lector, escritor, enmascarar=True)
+    return lector, escritor
+
+
+async def esperar_respuesta(lector, escritor, id_mensaje):
+    """Leer mensajes hasta la respuesta con el id dado, ignorando las difusiones globales"""
+    while True:
+        opcode, datos = await leer_mensaje(lector, escritor, enmascarar=True)
+        if opcode == CIERRE:
+            raise ConnectionError("El servidor cerró la conexión")
+        mensaje = json.loads(datos)
+        if mensaje.get("id") == id_mensaje:
+            return mensaje
+
+
+async def cliente(host, puerto, partidas, latencias, errores, limite_conexiones, listos, arranque, rng):
+    """Un jugador simulado: juega partidas completas midiendo la latencia de cada jugada"""
+    async with limite_conexiones:
+        try:
+            lector, escritor = await conectar_websocket(host, puerto)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError) as e:
+            errores.append(f"conexión: {e}")
+            listos.release()
+            return
+    listos.release()
+    # Todos los clientes empiezan a jugar a la vez, con las conexiones ya abiertas
+    await arranque.wait()
+
+    id_mensaje = 0
+    try:
+        for _ in range(partidas):
+            for accion in ACCIONES:
+                id_mensaje += 1
+                mensaje = {"accion": accion, "id": id_mensaje}
+                if accion == "elegir":
+                    mensaje["puerta"] = rng.randrange(3)
+                elif accion == "decidir":
+                    mensaje["cambiar"] = rng.random() < 0.5
+                inicio = time.perf_counter()
+                escritor.write(codificar_trama(json.dumps(mensaje), enmascarar=True))
+                respuesta = await esperar_respuesta(lector, escritor, id_mensaje)
+                latencias[accion].append(time.perf_counter() - inicio)
+                if respuesta["tipo"] == "error":
+                    errores.append(respuesta["mensaje"])
+        escritor.write(codificar_trama(b"\x03\xe8", CIERRE, enmascarar=True))
+        await escritor.drain()
+    except (OSError, ConnectionError, asyncio.IncompleteReadError) as e:
+        errores.append(f"juego: {e}")
+    finally:
+        escritor.close()
+
+
+async def prueba_carga(host, puerto, clientes, partidas, conexiones_simultaneas, semilla):
+    latencias = {accion: [] for accion in ACCIONES}
+    errores = []
+    limite_conexiones = asyncio.Semaphore(conexiones_simultaneas)
+    listos = asyncio.Semaphore(0)
+    arranque = asyncio.Event()
+    rng = random.Random(semilla)
+
+    tareas = [asyncio.create_task(cliente(host, puerto, partidas, latencias, errores, limite_conexiones,
+                                          listos, arranque, random.Random(rng.random())))
+              for _ in range(clientes)]
+    for _ in range(clientes):
+        await listos.acquire()
+
+    inicio = time.perf_counter()
+    arranque.set()
+    await asyncio.gather(*tareas)
+    segundos = time.perf_counter() - inicio
+    return latencias, errores, segundos
+
+
+def esperar_servidor(host, puerto, proceso, tiempo_maximo=10):
+    """Esperar a que el servidor lanzado acepte conexiones"""
+    import socket
+    limite = time.monotonic() + tiempo_maximo
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError("El servidor terminó antes de aceptar conexiones")
+        try:
+            with socket.create_connection((host, puerto), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("El servidor no respondió a tiempo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del servidor Monty Hall por WebSocket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--clientes", type=int, default=2000, help="jugadores simultáneos")
+    parser.add_argument("--partidas", type=int, default=5, help="partidas por jugador")
+    parser.add_argument("--conexiones-simultaneas", type=int, default=200,
+                        help="conexiones abiertas a la vez durante el arranque")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--iniciar-servidor", action="store_true",
+                        help="lanzar app.py en un proceso aparte antes de la prueba")
+    argumentos = parser.parse_args()
+
+    limite = subir_limite_archivos()
+    if argumentos.clientes + 64 > limite:
+        print(f"Aviso: el límite de archivos abiertos es {limite}, puede no alcanzar para "
+              f"{argumentos.clientes} clientes")
+
+    proceso = None
+    if argumentos.iniciar_servidor:
+        # Las partidas de la prueba no deben mezclarse con el historial real
+        entorno = dict(os.environ, MONTYHALL_REGISTRO=os.path.join(tempfile.mkdtemp(), "partidas.registro"))
+        proceso = subprocess.Popen([sys.executable, os.path.join(RAIZ, "app.py"),
+                                    "--host", argumentos.host, "--puerto", str(argumentos.puerto)],
+                                   stdout=subprocess.DEVNULL, env=entorno)
+        esperar_servidor(argumentos.host, argumentos.puerto, proceso)
+
+    try:
+        latencias, errores, segundos = asyncio.run(prueba_carga(
+            argumentos.host, argumentos.puerto, argumentos.clientes, argumentos.partidas,
+            argumentos.conexiones_simultaneas, argumentos.semilla))
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+
+    jugadas = sum(len(valores) for valores in latencias.values())
+    print(f"Clientes: {argumentos.clientes} | jugadas: {jugadas} | {jugadas / segundos:,.0f} jugadas/s | "
+          f"errores: {len(errores)}")
+    for accion in ACCIONES:
+        valores = sorted(latencias[accion])
+        print(f"  {accion:<10} n={len(valores):>7}  p50={percentil(valores, 50) * 1000:7.2f} ms  "
+              f"p99={percentil(valores, 99) * 1000:7.2f} ms")
+    for error in errores[:5]:
+        print(f"  error: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from pruebaCarga import esperar_servidor, subir_limite_archivos
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+# Archivos que pide el navegador al abrir juego.html y jugar una partida
+RECURSOS_PAGINA = [
+    "/frontend/templates/juego.html",
+    "/frontend/style/style.css",
+    "/frontend/style/montyhall.css",
+    "/frontend/js/montyhall.js",
+    "/frontend/resources/optimizados/presentador1_100x150_cubrir.webp",
+    "/frontend/resources/optimizados/presentador2_100x150_cubrir.webp",
+    "/frontend/resources/optimizados/puerta_estatica_133x266_contener.webp",
+    "/frontend/resources/optimizados/puerta_abierta_133x266_contener.webp",
+    "/frontend/resources/Cabra.gif",
+    "/frontend/resources/optimizados/carro_133x266_contener.gif",
+    "/frontend/resources/monty_hall_fondo.gif",
+]
+AUDIO = "/frontend/resources/TrailerMontyGameAudio.MP3"
+# Tamaño de cada salto al adelantar el audio
+TAMANO_SALTO = 64 * 1024
+
+
+async def pedir(lector, escritor, host, ruta, cabeceras):
+    """Hacer un GET por una conexión keep-alive; devuelve (estado, cabeceras, bytes recibidos)"""
+    extra = "".join(f"{nombre}: {valor}\r\n" for nombre, valor in cabeceras.items())
+    escritor.write(f"GET {ruta} HTTP/1.1\r\nHost: {host}\r\n{extra}\r\n".encode("latin-1"))
+    cabecera = await lector.readuntil(b"\r\n\r\n")
+    lineas = cabecera.decode("latin-1").split("\r\n")
+    estado = int(lineas[0].split(" ", 2)[1])
+    respuesta = {}
+    for linea in lineas[1:]:
+        if ":" in linea:
+            nombre, valor = linea.split(":", 1)
+            respuesta[nombre.strip().lower()] = valor.strip()
+    largo = int(respuesta.get("content-length", 0)) if estado != 304 else 0
+    if largo:
+        await lector.readexactly(largo)
+    return estado, respuesta, len(cabecera) + largo
+
+
+async def visitante(host, puerto, visitas, con_cache, saltos_audio, totales, rng):
+    """Un navegador que vuelve varias veces a la página y adelanta el audio"""
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    # Caché del navegador simulado: ruta -> ETag
+    etags = {}
+    tamano_audio = None
+    try:
+        for _ in range(visitas):
+            for ruta in RECURSOS_PAGINA:
+                cabeceras = {}
+                if con_cache:
+                    cabeceras["Accept-Encoding"] = "gzip"
+                    if ruta in etags:
+                        cabeceras["If-None-Match"] = etags[ruta]
+                estado, respuesta, recibidos = await pedir(lector, escritor, host, ruta, cabeceras)
+                totales["peticiones"] += 1
+                totales["bytes"] += recibidos
+                totales["304"] += estado == 304
+                if con_cache and "etag" in respuesta:
+                    etags[ruta] = respuesta["etag"]
+
+            # Adelantar el audio: con rangos solo se baja el tramo pedido, sin ellos el archivo entero
+            for _ in range(saltos_audio):
+                cabeceras = {}
+                if con_cache and tamano_audio:
+                    desde = rng.randrange(max(1, tamano_audio - TAMANO_SALTO))
+                    cabeceras["Range"] = f"bytes={desde}-{desde + TAMANO_SALTO - 1}"
+                estado, respuesta, recibidos = await pedir(lector, escritor, host, AUDIO, cabeceras)
+                totales["peticiones"] += 1
+                totales["bytes"] += recibidos
+                if estado == 200:
+                    tamano_audio = int(respuesta.get("content-length", 0))
+    finally:
+        escritor.close()
+
+
+async def medir(host, puerto, clientes, visitas, con_cache, saltos_audio, semilla):
+    totales = {"peticiones": 0, "bytes": 0, "304": 0}
+    rng = random.Random(semilla)
+    inicio = time.perf_counter()
+    await asyncio.gather(*(visitante(host, puerto, visitas, con_cache, saltos_audio, totales,
+                                     random.Random(rng.random()))
+                           for _ in range(clientes)))
+    totales["segundos"] = time.perf_counter() - inicio
+    return totales
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparar el servidor de archivos con y sin cabeceras de caché")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--visitas", type=int, default=10, help="visitas a la página por cliente")
+    parser.add_argument("--saltos-audio", type=int, default=3, help="saltos en el audio por visita")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--iniciar-servidor", action="store_true",
+                        help="lanzar app.py en un proceso aparte antes de medir")
+    argumentos = parser.parse_args()
+    subir_limite_archivos()
+
+    proceso = None
+    if argumentos.iniciar_servidor:
+        # Las partidas de la prueba no deben mezclarse con el historial real
+        entorno = dict(os.environ, MONTYHALL_REGISTRO=os.path.join(tempfile.mkdtemp(), "partidas.registro"))
+        proceso = subprocess.Popen([sys.executable, os.path.join(RAIZ, "app.py"),
+                                    "--host", argumentos.host, "--puerto", str(argumentos.puerto)],
+                                   stdout=subprocess.DEVNULL, env=entorno)
+        esperar_servidor(argumentos.host, argumentos.puerto, proceso)
+
+    try:
+        for con_cache in (False, True):
+            totales = asyncio.run(medir(argumentos.host, argumentos.puerto, argumentos.clientes,
+                                        argumentos.visitas, con_cache, argumentos.saltos_audio,
+                                        argumentos.semilla))
+            nombre = "con caché" if con_cache else "sin caché"
+            print(f"{nombre:<10} peticiones: {totales['peticiones']:>7} | "
+                  f"{totales['peticiones'] / totales['segundos']:>9,.0f} pet/s | "
+                  f"recibido: {totales['bytes'] / 1024 / 1024:>9.2f} MiB | 304: {totales['304']}")
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == "__main__":
+    main()
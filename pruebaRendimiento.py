@@ -0,0 +1,331 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(RAIZ, "backend"))
+# Sin pantalla ni tarjeta de sonido: pygame usa los controladores nulos de SDL
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from PIL import Image
+
+from metricas import metricas
+from pruebaCarga import percentil
+
+# Medios sintéticos con los nombres que usa MontyHall_interfaz, más grandes que los destinos
+# para que el redimensionado cueste lo mismo que con los originales
+IMAGENES = {
+    "Puerta_estatica.png": (400, 800),
+    "Puerta_abierta.png": (400, 800),
+    "Presentador1.jpeg": (600, 900),
+    "Presentador2.jpeg": (600, 900),
+    "Fondo.jpg": (1600, 1200),
+}
+GIFS = {"Cabra.gif": 24, "carro.gif": 24}
+TAMANO_GIF = (400, 800)
+SONIDOS = ("OpenDoor.MP3", "Win.MP3", "Fail.MP3", "TrailerMontyGameAudio.MP3")
+VIDEO = "TrailerMontyGameVideo.mp4"
+TAMANO_VIDEO = (1280, 720)
+FPS_VIDEO = 30
+# Métricas que se comparan con la corrida anterior del historial
+CLAVES_COMPARADAS = (
+    ("decodificacion", "total_ms"),
+    ("ventana", "lista_p50_ms"),
+    ("ventana", "primer_cuadro_p50_ms"),
+    ("animacion", "cpu_pct"),
+    ("animacion", "retraso_tick_p99_ms"),
+    ("video", "intervalo_p50_ms"),
+    ("video", "jitter_ms"),
+)
+
+
+def _ruido(rng, ancho, alto, canales):
+    """Imagen con gradiente y ruido: ni trivial de comprimir ni de escalar"""
+    y, x = np.mgrid[0:alto, 0:ancho]
+    base = np.stack([(x * 255 // ancho), (y * 255 // alto), ((x + y) * 127 // (ancho + alto))] +
+                    [np.full_like(x, 255)] * (canales - 3), axis=-1)
+    return np.clip(base + rng.integers(-24, 24, base.shape), 0, 255).astype(np.uint8)
+
+
+def _escribir_wav(ruta, segundos, frecuencia=22050):
+    """Tono en WAV; SDL_mixer reconoce el formato por el contenido, no por la extensión"""
+    t = np.arange(int(segundos * frecuencia)) / frecuencia
+    muestras = (np.sin(2 * np.pi * 440 * t) * 8000).astype("<i2")
+    with wave.open(ruta, "wb") as archivo:
+        archivo.setnchannels(1)
+        archivo.setsampwidth(2)
+        archivo.setframerate(frecuencia)
+        archivo.writeframes(muestras.tobytes())
+
+
+def preparar_medios(directorio, segundos_video, semilla=0):
+    """Crear directorio/files con imágenes, GIFs, sonidos y video sintéticos"""
+    rng = np.random.default_rng(semilla)
+    archivos = os.path.join(directorio, "files")
+    os.makedirs(archivos, exist_ok=True)
+    for nombre, (ancho, alto) in IMAGENES.items():
+        modo = "RGBA" if nombre.endswith(".png") else "RGB"
+        Image.fromarray(_ruido(rng, ancho, alto, len(modo)), modo).save(os.path.join(archivos, nombre))
+    for nombre, cantidad in GIFS.items():
+        fotogramas = [Image.fromarray(_ruido(rng, *TAMANO_GIF, 3), "RGB").quantize(64) for _ in range(cantidad)]
+        fotogramas[0].save(os.path.join(archivos, nombre), save_all=True, append_images=fotogramas[1:],
+                           duration=80, loop=0)
+    for nombre in SONIDOS:
+        _escribir_wav(os.path.join(archivos, nombre), segundos_video if "Trailer" in nombre else 0.5)
+    try:
+        import cv2
+    except ImportError:
+        return
+    escritor = cv2.VideoWriter(os.path.join(archivos, VIDEO), cv2.VideoWriter_fourcc(*"mp4v"), FPS_VIDEO,
+                               TAMANO_VIDEO)
+    fondo = _ruido(rng, *TAMANO_VIDEO, 3)
+    for indice in range(int(segundos_video * FPS_VIDEO)):
+        # Un fotograma distinto cada vez para que el decodificador trabaje de verdad
+        escritor.write(np.roll(fondo, indice * 8, axis=1))
+    escritor.release()
+
+
+def _ms(histograma, clave):
+    return round(histograma[clave] / 1000, 3) if histograma else None
+
+
+def _histograma(nombre):
+    return metricas.como_dict()["histogramas"].get(nombre)
+
+
+# --- Secciones ---
+
+def medir_decodificacion(repeticiones):
+    """Decodificar y redimensionar imágenes y GIFs como en abrir_ventana, sin Tkinter"""
+    from cacheImagenes import cache_imagenes
+    from fotogramasGif import FotogramasGif
+    usos = [("files/Fondo.jpg", (800, 600)), ("files/Presentador1.jpeg", (100, 150)),
+            ("files/Puerta_estatica.png", (133, 266))]
+    totales = []
+    for _ in range(repeticiones):
+        cache_imagenes.limpiar()
+        inicio = time.perf_counter()
+        for ruta, tamano in usos:
+            cache_imagenes.obtener_pil(ruta, tamano)
+        for nombre in GIFS:
+            # len() espera a que el hilo de fondo decodifique todos los fotogramas
+            len(FotogramasGif(f"files/{nombre}", (133, 266)))
+        totales.append(time.perf_counter() - inicio)
+    totales.sort()
+    return {"total_ms": round(percentil(totales, 50) * 1000, 3),
+            "imagen_decodificar_p50_ms": _ms(_histograma("imagen.decodificar"), "p50_us"),
+            "imagen_redimensionar_p50_ms": _ms(_histograma("imagen.redimensionar"), "p50_us"),
+            "gif_fotograma_p50_ms": _ms(_histograma("gif.redimensionar"), "p50_us")}
+
+
+def medir_ventana(raiz, repeticiones):
+    """Tiempo hasta el primer cuadro y hasta la ventana lista; la primera vez sin cachés en disco"""
+    from tkinter import messagebox
+    import MontyHall_interfaz
+    # Los diálogos modales no se pueden cerrar sin alguien delante
+    messagebox.showinfo = lambda *args, **kwargs: "ok"
+    try:
+        import pygame  # noqa: F401
+        hay_sonido = True
+    except ImportError:
+        hay_sonido = False
+
+    listas = []
+    primeros = []
+    for repeticion in range(repeticiones):
+        if repeticion == 0:
+            shutil.rmtree("files/.cache", ignore_errors=True)
+        MontyHall_interfaz.cache_imagenes.limpiar()
+        interfaz = MontyHall_interfaz.MontyHall_interfaz(raiz)
+        interfaz.abrir_ventana()
+        if not hay_sonido:
+            interfaz._pasos_carga.remove(interfaz._cargar_sonidos)
+        limite = time.monotonic() + 30
+        while "ventana_lista" not in interfaz.tiempos_inicio and time.monotonic() < limite:
+            raiz.update()
+        listas.append(interfaz.tiempos_inicio.get("ventana_lista", float("nan")))
+        primeros.append(interfaz.tiempos_inicio.get("primer_cuadro", float("nan")))
+        interfaz.v1.destroy()
+        raiz.update()
+    calientes = sorted(listas[1:]) or listas
+    return {"lista_fria_ms": round(listas[0] * 1000, 3),
+            "lista_p50_ms": round(percentil(calientes, 50) * 1000, 3),
+            "lista_p90_ms": round(percentil(calientes, 90) * 1000, 3),
+            "primer_cuadro_p50_ms": round(percentil(sorted(primeros), 50) * 1000, 3),
+            "sonidos": hay_sonido}
+
+
+def medir_animacion(raiz, segundos, puertas):
+    """CPU del proceso por segundo de animación y retraso de cada tick del planificador"""
+    from tkinter import Label, Toplevel
+    from animaciones import PlanificadorAnimaciones
+    from fotogramasGif import FotogramasGif
+    ventana = Toplevel(raiz)
+    planificador = PlanificadorAnimaciones(ventana)
+    fotogramas = [FotogramasGif(f"files/{nombre}", (133, 266)) for nombre in GIFS]
+    for secuencia in fotogramas:
+        len(secuencia)  # decodificación fuera de la medición
+    for indice in range(puertas):
+        label = Label(ventana)
+        label.grid(row=indice // 3, column=indice % 3)
+        planificador.animar(label, fotogramas[indice % len(fotogramas)])
+    raiz.update()
+    metricas.reiniciar()
+    cpu = time.process_time()
+    pared = time.perf_counter()
+    raiz.after(int(segundos * 1000), raiz.quit)
+    raiz.mainloop()
+    cpu = time.process_time() - cpu
+    pared = time.perf_counter() - pared
+    ventana.destroy()
+    raiz.update()
+    tick = _histograma("animacion.tick")
+    retraso = _histograma("animacion.retraso_tick")
+    return {"puertas": puertas,
+            "cpu_pct": round(cpu / pared * 100, 2),
+            "ticks_por_segundo": round(tick["cantidad"] / pared, 1) if tick else 0,
+            "tick_p50_ms": _ms(tick, "p50_us"),
+            "tick_p99_ms": _ms(tick, "p99_us"),
+            "retraso_tick_p99_ms": _ms(retraso, "p99_us")}
+
+
+def medir_video(segundos):
+    """Reproducir el video sintético decodificando y luego desde la caché de fotogramas"""
+    from introMontyHall import reproducir_video
+    resultado = {}
+    for modo, ruta_cache in (("decodificando", None), ("cache", "files/.cache/video.fotogramas")):
+        if ruta_cache is not None:
+            # Hornear antes, para medir solo la reproducción desde el archivo mapeado
+            from cacheIntro import cargar_o_hornear
+            cargar_o_hornear(f"files/{VIDEO}", ruta_cache, 800, 600, segundos)
+        metricas.reiniciar()
+        estadisticas = reproducir_video(f"files/{VIDEO}", f"files/{SONIDOS[-1]}", duracion=segundos,
+                                        ruta_cache=ruta_cache)
+        intervalo = _histograma("video.intervalo")
+        resultado[modo] = {
+            "mostrados": estadisticas.mostrados if estadisticas else 0,
+            "descartados": estadisticas.descartados if estadisticas else 0,
+            "intervalo_p50_ms": _ms(intervalo, "p50_us"),
+            "jitter_ms": round((intervalo["p99_us"] - intervalo["p50_us"]) / 1000, 3) if intervalo else None,
+            "exceso_espera_p99_ms": _ms(_histograma("video.exceso_espera"), "p99_us"),
+            "metricas": metricas.como_dict(),
+        }
+    # El modo de caché es el que usa la ventana después de la primera reproducción
+    resultado.update({clave: resultado["cache"][clave] for clave in ("intervalo_p50_ms", "jitter_ms")})
+    return resultado
+
+
+# --- Entorno ---
+
+def iniciar_pantalla_virtual():
+    """Lanzar Xvfb si no hay DISPLAY; devuelve el proceso o None"""
+    if os.environ.get("DISPLAY") or not shutil.which("Xvfb"):
+        return None
+    pantalla = ":97"
+    proceso = subprocess.Popen(["Xvfb", pantalla, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    os.environ["DISPLAY"] = pantalla
+    return proceso
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _seccion(resultados, nombre, funcion, *args):
+    metricas.reiniciar()
+    try:
+        resultado = funcion(*args)
+    except Exception as e:
+        print(f"  {nombre}: omitida ({type(e).__name__}: {e})")
+        resultados[nombre] = {"omitida": f"{type(e).__name__}: {e}"}
+        return
+    resultado.setdefault("metricas", metricas.como_dict())
+    resultados[nombre] = resultado
+    resumen = ", ".join(f"{clave}={valor}" for clave, valor in resultado.items()
+                        if not isinstance(valor, dict))
+    print(f"  {nombre}: {resumen}")
+
+
+def comparar(anterior, actual):
+    """Diferencias con la corrida anterior en las métricas principales"""
+    for seccion, clave in CLAVES_COMPARADAS:
+        antes = anterior.get("secciones", {}).get(seccion, {}).get(clave)
+        ahora = actual["secciones"].get(seccion, {}).get(clave)
+        if isinstance(antes, (int, float)) and isinstance(ahora, (int, float)) and antes:
+            print(f"  {seccion}.{clave}: {antes} -> {ahora} ({(ahora - antes) / antes * 100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento sin pantalla de la ventana y los medios")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--segundos-animacion", type=float, default=5)
+    parser.add_argument("--puertas", type=int, default=3, help="etiquetas animadas a la vez")
+    parser.add_argument("--segundos-video", type=float, default=4)
+    parser.add_argument("--historial", default=os.path.join(RAIZ, "rendimiento.jsonl"),
+                        help="archivo JSON Lines donde se agrega cada corrida, para comparar entre commits")
+    argumentos = parser.parse_args()
+
+    metricas.activar()
+    xvfb = iniciar_pantalla_virtual()
+    directorio = tempfile.mkdtemp(prefix="rendimiento_")
+    # Las partidas de la ventana de prueba no van al historial real
+    os.environ["MONTYHALL_REGISTRO"] = os.path.join(directorio, "partidas.registro")
+    anterior_cwd = os.getcwd()
+    resultados = {}
+    try:
+        preparar_medios(directorio, argumentos.segundos_video)
+        # MontyHall_interfaz usa rutas relativas a files/
+        os.chdir(directorio)
+        print(f"Medios sintéticos en {directorio}")
+        _seccion(resultados, "decodificacion", medir_decodificacion, argumentos.repeticiones)
+        try:
+            import tkinter
+            raiz = tkinter.Tk()
+            raiz.withdraw()
+        except Exception as e:
+            raiz = None
+            print(f"  Sin Tkinter ({e}): se omiten la ventana y la animación")
+        if raiz is not None:
+            _seccion(resultados, "ventana", medir_ventana, raiz, argumentos.repeticiones)
+            _seccion(resultados, "animacion", medir_animacion, raiz, argumentos.segundos_animacion,
+                     argumentos.puertas)
+            raiz.destroy()
+        _seccion(resultados, "video", medir_video, argumentos.segundos_video)
+    finally:
+        os.chdir(anterior_cwd)
+        shutil.rmtree(directorio, ignore_errors=True)
+        if xvfb is not None:
+            xvfb.terminate()
+
+    corrida = {"commit": _commit(), "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0],
+               "secciones": resultados}
+    anterior = None
+    if os.path.exists(argumentos.historial):
+        with open(argumentos.historial, encoding="utf-8") as archivo:
+            lineas = [linea for linea in archivo if linea.strip()]
+        if lineas:
+            anterior = json.loads(lineas[-1])
+    with open(argumentos.historial, "a", encoding="utf-8") as archivo:
+        archivo.write(json.dumps(corrida, ensure_ascii=False) + "\n")
+    if anterior is not None:
+        print(f"Comparación con {anterior.get('commit')} ({anterior.get('fecha')}):")
+        comparar(anterior, corrida)
+
+
+if __name__ == "__main__":
+    main()
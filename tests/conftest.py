@@ -0,0 +1,33 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "backend"))
+# Las partidas de las pruebas no deben mezclarse con el historial real
+os.environ.setdefault("MONTYHALL_REGISTRO", os.path.join(tempfile.mkdtemp(), "partidas.registro"))
+
+
+@pytest.fixture
+def pedir():
+    """GET contra un servidor levantado en un puerto libre; devuelve el código de estado"""
+    from app import iniciar_servidor
+
+    async def _pedir(ruta):
+        servidor, juego = await iniciar_servidor("127.0.0.1", 0)
+        puerto = servidor.sockets[0].getsockname()[1]
+        try:
+            lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+            escritor.write(f"GET {ruta} HTTP/1.1\r\nHost: prueba\r\nConnection: close\r\n\r\n".encode("latin-1"))
+            linea = await asyncio.wait_for(lector.readline(), 10)
+            escritor.close()
+            return int(linea.split()[1]) if linea else None
+        finally:
+            juego.tarea_difusion.cancel()
+            servidor.close()
+
+    return lambda ruta: asyncio.run(_pedir(ruta))
@@ -0,0 +1,35 @@
+from analizadorGLC import AnalizadorEarley, Gramatica
+
+
+def test_frase_vacia_es_prefijo_valido():
+    resultado = AnalizadorEarley().analizar_tokens([])
+    assert not resultado.completo
+    assert resultado.prefijo_valido
+    assert resultado.acciones == []
+
+
+def test_prefijos_de_la_gramatica_de_ordenes():
+    analizador = AnalizadorEarley()
+    assert analizador.analizar("oye").prefijo_valido
+    assert not analizador.analizar("oye").completo
+    completa = analizador.analizar("izquierda gracias")
+    assert completa.completo and completa.prefijo_valido
+    assert not analizador.analizar("gracias izquierda").prefijo_valido
+
+
+def test_prefijo_sin_salida():
+    # Tras "b" la columna tiene A completo y S esperando M, pero M no deriva ninguna palabra
+    analizador = AnalizadorEarley(Gramatica("S -> A M | c\nA -> b\nM -> M d"))
+    resultado = analizador.analizar_tokens(["b"])
+    assert not resultado.completo
+    assert not resultado.prefijo_valido
+    assert analizador.analizar_tokens([]).prefijo_valido
+    assert analizador.analizar_tokens(["c"]).completo
+
+
+def test_prefijo_completo_que_no_admite_mas_palabras():
+    # "x" ya es la orden entera: no espera nada más, pero es un prefijo válido
+    analizador = AnalizadorEarley(Gramatica("S -> A\nA -> x"))
+    resultado = analizador.analizar_tokens(["x"])
+    assert resultado.completo and resultado.prefijo_valido
+    assert not analizador.analizar_tokens(["x", "x"]).prefijo_valido
@@ -0,0 +1,13 @@
+from app import MAX_CELDAS_LABERINTO, MAX_LADO_LABERINTO
+
+
+def test_semilla_negativa_responde_400(pedir):
+    assert pedir("/laberinto?filas=5&columnas=5&semilla=-1") == 400
+    assert pedir("/laberinto?filas=5&columnas=5&semilla=3") == 200
+
+
+def test_tamano_acotado_por_algoritmo(pedir):
+    for algoritmo, celdas in MAX_CELDAS_LABERINTO.items():
+        columnas = celdas // MAX_LADO_LABERINTO + 1
+        assert pedir(f"/laberinto?filas={MAX_LADO_LABERINTO}&columnas={columnas}&algoritmo={algoritmo}") == 400
+        assert pedir(f"/laberinto?filas=10&columnas=10&algoritmo={algoritmo}") == 200
@@ -0,0 +1,15 @@
+from servidorEstaticos import ServidorEstaticos
+
+
+def test_byte_nulo_en_la_ruta_responde_404(pedir):
+    assert pedir("/%00") == 404
+    assert pedir("/frontend/%00") == 404
+    assert pedir("/frontend/templates/index.html%00.png") == 404
+
+
+def test_resolver_rechaza_byte_nulo(tmp_path):
+    (tmp_path / "a.txt").write_text("hola")
+    estaticos = ServidorEstaticos(str(tmp_path), "/f/")
+    assert estaticos.resolver("/f/a.txt\0") is None
+    assert estaticos.responder("GET", "/f/a.txt\0", {}) is None
+    assert estaticos.responder("GET", "/f/a.txt", {}).estado == 200